@@ -0,0 +1,147 @@
+# Heap allocation tracking for the frame loop.
+#
+# On MicroPython every allocation in the steady-state loop eventually
+# triggers a garbage collection pause, which shows as visible stutter.
+# AllocationTracker measures how many bytes a code section allocates,
+# including garbage that is already unreachable when the section ends.
+import array
+import sys
+
+MICROPYTHON = sys.platform == "rp2"
+
+if MICROPYTHON:
+    import gc
+
+# Bytes a measurement may allocate on CPython and still count as free of
+# allocations. CPython creates objects where MicroPython does not: a range
+# iterator for every for loop, a heap object for every int above 256, and
+# so on. They are freed right away, but still add up to a few hundred 
+# bytes at the peak of a frame. Anything that allocates on the Pico as 
+# well, e.g. a string or a list per frame, soon exceeds this. The Pico 
+# itself is checked without slack.
+CPYTHON_SLACK = 1024
+
+
+class AllocationTracker:
+    """
+    Measures heap allocations of code sections (frames, animation updates).
+
+    - MicroPython: gc.mem_alloc() delta, automatic garbage collection is
+      disabled while measuring so that no bytes are freed in between.
+    - CPython: tracemalloc peak. The peak is reset when a measurement
+      begins, and the result is the highest traced memory during the
+      measurement minus the traced memory at its start. Temporary objects
+      count as well, not only the ones still alive at the end. The
+      tracker's own bookkeeping between nested measurements is left out.
+
+    Measurements can be nested: begin() ... begin() ... end() ... end().
+    """
+
+    MAX_DEPTH = 4
+
+    def __init__(self):
+        self.totals = {}  # label -> bytes allocated since start()
+        self.counts = {}  # label -> number of measurements that allocated
+        self.peaks = {}   # label -> largest allocation of one measurement
+        self.last = 0     # Result of the last end()
+        self._depth = 0
+        # Preallocated, so that begin() and end() themselves don't allocate
+        self._starts = array.array("i", [0] * self.MAX_DEPTH)
+        if not MICROPYTHON:
+            # Highest traced memory per open measurement, and the bytes
+            # kept by the tracker itself since it began
+            self._highs = [0] * self.MAX_DEPTH
+            self._offsets = [0] * self.MAX_DEPTH
+
+    def start(self):
+        """Start tracking (starts tracemalloc on CPython)"""
+        self.totals = {}
+        self.counts = {}
+        self.peaks = {}
+        if not MICROPYTHON:
+            import tracemalloc
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+
+    def stop(self):
+        """Stop tracking (stops tracemalloc on CPython)"""
+        if MICROPYTHON:
+            gc.enable()
+        else:
+            import tracemalloc
+            tracemalloc.stop()
+        self._depth = 0
+
+    def _fold_peak(self):
+        # Record the peak since the last reset in every open measurement,
+        # returns the traced memory now
+        import tracemalloc
+        current, peak = tracemalloc.get_traced_memory()
+        for d in range(self._depth):
+            self._highs[d] = max(self._highs[d], peak - self._offsets[d])
+        return current
+
+    def _skip_bookkeeping(self, before):
+        # Exclude what the tracker allocated since before from the open
+        # measurements, then restart the peak
+        import tracemalloc
+        kept = tracemalloc.get_traced_memory()[0] - before
+        for d in range(self._depth):
+            self._offsets[d] += kept
+        tracemalloc.reset_peak()
+        return tracemalloc.get_traced_memory()[0]
+
+    def begin(self):
+        """Begin a measurement"""
+        assert self._depth < self.MAX_DEPTH, "Too many nested measurements"
+        if MICROPYTHON:
+            if self._depth == 0:
+                gc.disable()
+            self._starts[self._depth] = gc.mem_alloc()
+            self._depth += 1
+            return
+        before = self._fold_peak()
+        d = self._depth
+        self._offsets[d] = 0
+        self._depth += 1
+        current = self._skip_bookkeeping(before)
+        self._starts[d] = current
+        self._highs[d] = current
+
+    def end(self, label="frame"):
+        """
+        End the innermost measurement.
+
+        Parameters:
+        - label: Name under which the result is accumulated
+
+        Returns:
+        - Number of bytes allocated since the matching begin()
+        """
+        if MICROPYTHON:
+            self._depth -= 1
+            allocated = gc.mem_alloc() - self._starts[self._depth]
+            if self._depth == 0:
+                gc.enable()
+        else:
+            before = self._fold_peak()
+            self._depth -= 1
+            allocated = self._highs[self._depth] - self._starts[self._depth]
+        self.last = allocated
+        if allocated > 0:
+            self.totals[label] = self.totals.get(label, 0) + allocated
+            self.counts[label] = self.counts.get(label, 0) + 1
+            self.peaks[label] = max(self.peaks.get(label, 0), allocated)
+        if not MICROPYTHON:
+            self._skip_bookkeeping(before)
+        return allocated
+
+    def report(self):
+        """Print bytes allocated per label"""
+        labels = [label for label in self.totals if self.totals[label] != 0]
+        if not labels:
+            print("No allocations.")
+        for label in labels:
+            msg = "%s: %d bytes in %d measurements, at most %d at once"
+            print(msg % (label, self.totals[label], self.counts.get(label, 0),
+                         self.peaks[label]))
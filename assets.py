@@ -0,0 +1,380 @@
+# Generated by build_assets.py, do not edit.
+
+# Font6x6: glyph numbers by character code, then glyph data
+FONT6X6_INDEX = (
+    b'\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff'
+    b'\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff'
+    b'\x00\x01\xff\xff\xff\xff\xff\xff\xff\xff\xff\x02\x03\x04\x05\xff'
+    b'\x06\x07\x08\t\n\x0b\x0c\r\x0e\x0f\x10\xff\xff\xff\xff\x11'
+    b'\xff\x12\x13\x14\x15\x16\x17\x18\x19\x1a\x1b\x1c\x1d\x1e\x1f '
+    b'!"#$%&\'()*+\xff\xff\xff\xff\xff'
+    b'\xff\x12\x13\x14\x15\x16\x17\x18\x19\x1a\x1b\x1c\x1d\x1e\x1f '
+    b'!"#$%&\'()*+\xff\xff\xff\xff\xff'
+    b'\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff'
+    b'\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff'
+    b'\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff'
+    b'\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff'
+    b'\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff'
+    b'\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff'
+    b'\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff'
+    b'\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff'
+)
+FONT6X6_DATA = (
+    b'\x00\x03\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x02\x02'
+    b'\x00\x08\x00\x08\x00\x08\x00\x00\x00\x08\x00\x00\x00\x03\x00\x00'
+    b'\x00\x08\x00<\x00\x08\x00\x00\x00\x00\x01\x02\x00\x00\x00\x00'
+    b'\x00\x18\x00\x18\x00\x08\x00\x10\x00\x03\x00\x00\x00\x00\x00<'
+    b'\x00\x00\x00\x00\x00\x00\x01\x02\x00\x00\x00\x00\x00\x00\x00\x18'
+    b'\x00\x18\x00\x00\x00\x04\x00\x1c\x002\x00*\x00&\x00\x1c'
+    b'\x00\x00\x01\x03\x00\x08\x00\x18\x00\x08\x00\x08\x00\x1c\x00\x00'
+    b'\x00\x03\x00\x18\x00$\x00\x08\x00\x10\x00<\x00\x00\x00\x03'
+    b'\x008\x00\x04\x00\x18\x00\x04\x008\x00\x00\x00\x03\x00\x08'
+    b'\x00\x18\x00(\x00<\x00\x08\x00\x00\x00\x03\x00<\x00 '
+    b'\x008\x00\x04\x008\x00\x00\x00\x03\x00\x18\x00 \x008'
+    b'\x00$\x00\x18\x00\x00\x00\x03\x00<\x00\x04\x00\x08\x00\x10'
+    b'\x00\x10\x00\x00\x00\x03\x00\x18\x00$\x00\x18\x00$\x00\x18'
+    b'\x00\x00\x00\x03\x00\x18\x00$\x00\x1c\x00\x04\x00\x18\x00\x00'
+    b'\x01\x02\x00\x00\x00\x18\x00\x00\x00\x18\x00\x00\x00\x00\x00\x03'
+    b'\x00\x18\x00$\x00\x08\x00\x00\x00\x08\x00\x00\x00\x03\x00\x18'
+    b'\x00$\x00<\x00$\x00$\x00\x00\x00\x03\x008\x00$'
+    b'\x008\x00$\x008\x00\x00\x00\x03\x00\x18\x00$\x00 '
+    b'\x00$\x00\x18\x00\x00\x00\x03\x008\x00$\x00$\x00$'
+    b'\x008\x00\x00\x00\x03\x00<\x00 \x008\x00 \x00<'
+    b'\x00\x00\x00\x03\x00<\x00 \x008\x00 \x00 \x00\x00'
+    b'\x00\x03\x00\x18\x00 \x00,\x00$\x00\x18\x00\x00\x00\x03'
+    b'\x00$\x00$\x00<\x00$\x00$\x00\x00\x01\x03\x00\x1c'
+    b'\x00\x08\x00\x08\x00\x08\x00\x1c\x00\x00\x00\x03\x00\x04\x00\x04'
+    b'\x00\x04\x00$\x00\x18\x00\x00\x00\x03\x00$\x00(\x000'
+    b'\x00(\x00$\x00\x00\x00\x03\x00 \x00 \x00 \x00 '
+    b'\x00<\x00\x00\x00\x04\x00"\x006\x00*\x00"\x00"'
+    b'\x00\x00\x00\x04\x00"\x002\x00*\x00&\x00"\x00\x00'
+    b'\x00\x04\x00\x1c\x00"\x00"\x00"\x00\x1c\x00\x00\x00\x03'
+    b'\x008\x00$\x008\x00 \x00 \x00\x00\x00\x04\x00\x1c'
+    b'\x00"\x00"\x00*\x00\x1c\x00\x02\x00\x03\x008\x00$'
+    b'\x008\x00(\x00$\x00\x00\x00\x03\x00\x1c\x00 \x00\x18'
+    b'\x00\x04\x008\x00\x00\x00\x04\x00>\x00\x08\x00\x08\x00\x08'
+    b'\x00\x08\x00\x00\x00\x04\x00"\x00"\x00"\x00"\x00\x1c'
+    b'\x00\x00\x00\x04\x00"\x00"\x00"\x00\x14\x00\x08\x00\x00'
+    b'\x00\x04\x00"\x00"\x00*\x006\x00"\x00\x00\x00\x04'
+    b'\x00"\x00\x14\x00\x08\x00\x14\x00"\x00\x00\x00\x04\x00"'
+    b'\x00\x14\x00\x08\x00\x08\x00\x08\x00\x00\x00\x03\x00<\x00\x04'
+    b'\x00\x08\x00\x10\x00<\x00\x00'
+)
+
+# Font7x7: glyph numbers by character code, then glyph data
+FONT7X7_INDEX = (
+    b'\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff'
+    b'\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff'
+    b'\x00\x01\xff\xff\xff\xff\xff\xff\xff\xff\xff\x02\x03\x04\x05\xff'
+    b'\x06\x07\x08\t\n\x0b\x0c\r\x0e\x0f\x10\xff\xff\xff\xff\x11'
+    b'\xff\x12\x13\x14\x15\x16\x17\x18\x19\x1a\x1b\x1c\x1d\x1e\x1f '
+    b'!"#$%&\'()*+\xff\xff\xff\xff\xff'
+    b'\xff\x12\x13\x14\x15\x16\x17\x18\x19\x1a\x1b\x1c\x1d\x1e\x1f '
+    b'!"#$%&\'()*+\xff\xff\xff\xff\xff'
+    b'\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff'
+    b'\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff'
+    b'\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff'
+    b'\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff'
+    b'\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff'
+    b'\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff'
+    b'\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff'
+    b'\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff'
+)
+FONT7X7_DATA = (
+    b'\x00\x03\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00'
+    b'\x02\x02\x00\x10\x00\x10\x00\x10\x00\x10\x00\x00\x00\x10\x00\x00'
+    b'\x00\x04\x00\x00\x00\x10\x00\x10\x00|\x00\x10\x00\x10\x00\x00'
+    b'\x01\x02\x00\x00\x00\x00\x00\x00\x000\x000\x00\x10\x00 '
+    b'\x00\x04\x00\x00\x00\x00\x00|\x00\x00\x00\x00\x00\x00\x00\x00'
+    b'\x01\x02\x00\x00\x00\x00\x00\x00\x00\x00\x000\x000\x00\x00'
+    b'\x00\x04\x008\x00L\x00T\x00d\x00D\x008\x00\x00'
+    b'\x01\x03\x00\x10\x000\x00\x10\x00\x10\x00\x10\x008\x00\x00'
+    b'\x00\x04\x008\x00D\x00\x08\x00\x10\x00 \x00|\x00\x00'
+    b'\x00\x04\x008\x00D\x00\x18\x00\x04\x00D\x008\x00\x00'
+    b'\x00\x04\x00\x08\x00\x18\x00(\x00|\x00\x08\x00\x08\x00\x00'
+    b'\x00\x04\x00|\x00@\x00x\x00\x04\x00D\x008\x00\x00'
+    b'\x00\x04\x008\x00@\x00x\x00D\x00D\x008\x00\x00'
+    b'\x00\x04\x00|\x00\x04\x00\x08\x00\x10\x00\x10\x00\x10\x00\x00'
+    b'\x00\x04\x008\x00D\x008\x00D\x00D\x008\x00\x00'
+    b'\x00\x04\x008\x00D\x00D\x00<\x00\x04\x008\x00\x00'
+    b'\x01\x02\x00\x00\x000\x000\x00\x00\x000\x000\x00\x00'
+    b'\x00\x04\x008\x00D\x00\x08\x00\x10\x00\x00\x00\x10\x00\x00'
+    b'\x00\x04\x008\x00D\x00D\x00|\x00D\x00D\x00\x00'
+    b'\x00\x04\x00x\x00D\x00x\x00D\x00D\x00x\x00\x00'
+    b'\x00\x04\x008\x00D\x00@\x00@\x00D\x008\x00\x00'
+    b'\x00\x04\x00p\x00H\x00D\x00D\x00H\x00p\x00\x00'
+    b'\x00\x04\x00|\x00@\x00x\x00@\x00@\x00|\x00\x00'
+    b'\x00\x04\x00|\x00@\x00x\x00@\x00@\x00@\x00\x00'
+    b'\x00\x04\x008\x00D\x00@\x00\\\x00D\x008\x00\x00'
+    b'\x00\x04\x00D\x00D\x00|\x00D\x00D\x00D\x00\x00'
+    b'\x01\x03\x008\x00\x10\x00\x10\x00\x10\x00\x10\x008\x00\x00'
+    b'\x00\x03\x00\x08\x00\x08\x00\x08\x00H\x00H\x000\x00\x00'
+    b'\x00\x04\x00D\x00H\x00p\x00H\x00D\x00D\x00\x00'
+    b'\x00\x04\x00@\x00@\x00@\x00@\x00@\x00|\x00\x00'
+    b'\x00\x04\x00D\x00l\x00T\x00D\x00D\x00D\x00\x00'
+    b'\x00\x04\x00D\x00d\x00T\x00L\x00D\x00D\x00\x00'
+    b'\x00\x04\x008\x00D\x00D\x00D\x00D\x008\x00\x00'
+    b'\x00\x04\x00x\x00D\x00D\x00x\x00@\x00@\x00\x00'
+    b'\x00\x04\x008\x00D\x00D\x00T\x00H\x004\x00\x00'
+    b'\x00\x04\x00x\x00D\x00x\x00P\x00H\x00D\x00\x00'
+    b'\x00\x04\x008\x00D\x000\x00\x0c\x00D\x008\x00\x00'
+    b'\x00\x04\x00|\x00\x10\x00\x10\x00\x10\x00\x10\x00\x10\x00\x00'
+    b'\x00\x04\x00D\x00D\x00D\x00D\x00D\x008\x00\x00'
+    b'\x00\x04\x00D\x00D\x00D\x00D\x00(\x00\x10\x00\x00'
+    b'\x00\x04\x00D\x00D\x00D\x00T\x00l\x00D\x00\x00'
+    b'\x00\x04\x00D\x00D\x00(\x00\x10\x00(\x00D\x00\x00'
+    b'\x00\x04\x00D\x00D\x00(\x00\x10\x00\x10\x00\x10\x00\x00'
+    b'\x00\x04\x00|\x00\x04\x00\x08\x00\x10\x00 \x00|\x00\x00'
+)
+
+# Font8x8: glyph numbers by character code, then glyph data
+FONT8X8_INDEX = (
+    b'\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff'
+    b'\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff'
+    b'\x00\x01\xff\xff\xff\xff\xff\xff\xff\xff\xff\x02\x03\x04\x05\xff'
+    b'\x06\x07\x08\t\n\x0b\x0c\r\x0e\x0f\x10\xff\xff\xff\xff\x11'
+    b'\xff\x12\x13\x14\x15\x16\x17\x18\x19\x1a\x1b\x1c\x1d\x1e\x1f '
+    b'!"#$%&\'()*+\xff\xff\xff\xff\xff'
+    b'\xff\x12\x13\x14\x15\x16\x17\x18\x19\x1a\x1b\x1c\x1d\x1e\x1f '
+    b'!"#$%&\'()*+\xff\xff\xff\xff\xff'
+    b'\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff'
+    b'\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff'
+    b'\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff'
+    b'\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff'
+    b'\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff'
+    b'\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff'
+    b'\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff'
+    b'\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff'
+)
+FONT8X8_DATA = (
+    b'\x00\x04\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00'
+    b'\x00\x00\x03\x04\x00\x18\x00\x18\x00\x18\x00\x18\x00\x18\x00\x00'
+    b'\x00\x18\x00\x00\x02\x06\x00\x00\x00\x08\x00\x08\x00>\x00\x08'
+    b'\x00\x08\x00\x00\x00\x00\x03\x04\x00\x00\x00\x00\x00\x00\x00\x00'
+    b'\x00\x18\x00\x18\x00\x08\x00\x10\x01\x06\x00\x00\x00\x00\x00\x00'
+    b'\x00~\x00\x00\x00\x00\x00\x00\x00\x00\x03\x04\x00\x00\x00\x00'
+    b'\x00\x00\x00\x00\x00\x00\x00\x18\x00\x18\x00\x00\x01\x06\x00<'
+    b'\x00F\x00J\x00R\x00b\x00B\x00<\x00\x00\x03\x05'
+    b'\x00\x08\x00\x18\x00\x08\x00\x08\x00\x08\x00\x08\x00\x1c\x00\x00'
+    b'\x01\x06\x00<\x00B\x00\x02\x00\x0c\x000\x00@\x00~'
+    b'\x00\x00\x01\x06\x00<\x00B\x00\x02\x00\x1c\x00\x02\x00B'
+    b'\x00<\x00\x00\x01\x06\x00\x04\x00\x0c\x00\x14\x00$\x00~'
+    b'\x00\x04\x00\x04\x00\x00\x01\x06\x00~\x00@\x00|\x00\x02'
+    b'\x00\x02\x00B\x00<\x00\x00\x01\x06\x00<\x00@\x00@'
+    b'\x00|\x00B\x00B\x00<\x00\x00\x01\x06\x00~\x00\x02'
+    b'\x00\x04\x00\x08\x00\x10\x00\x10\x00\x10\x00\x00\x01\x06\x00<'
+    b'\x00B\x00B\x00<\x00B\x00B\x00<\x00\x00\x01\x06'
+    b'\x00<\x00B\x00B\x00>\x00\x02\x00\x02\x00<\x00\x00'
+    b'\x03\x04\x00\x00\x00\x18\x00\x18\x00\x00\x00\x18\x00\x18\x00\x00'
+    b'\x00\x00\x01\x06\x00<\x00B\x00\x02\x00\x0c\x00\x10\x00\x00'
+    b'\x00\x10\x00\x00\x01\x06\x00<\x00B\x00B\x00~\x00B'
+    b'\x00B\x00B\x00\x00\x01\x06\x00|\x00B\x00B\x00|'
+    b'\x00B\x00B\x00|\x00\x00\x01\x06\x00<\x00B\x00@'
+    b'\x00@\x00@\x00B\x00<\x00\x00\x01\x06\x00x\x00D'
+    b'\x00B\x00B\x00B\x00D\x00x\x00\x00\x01\x06\x00~'
+    b'\x00@\x00@\x00|\x00@\x00@\x00~\x00\x00\x01\x06'
+    b'\x00~\x00@\x00@\x00|\x00@\x00@\x00@\x00\x00'
+    b'\x01\x06\x00<\x00B\x00@\x00N\x00B\x00B\x00<'
+    b'\x00\x00\x01\x06\x00B\x00B\x00B\x00~\x00B\x00B'
+    b'\x00B\x00\x00\x02\x06\x00>\x00\x08\x00\x08\x00\x08\x00\x08'
+    b'\x00\x08\x00>\x00\x00\x01\x06\x00\x02\x00\x02\x00\x02\x00\x02'
+    b'\x00B\x00B\x00<\x00\x00\x01\x06\x00B\x00D\x00H'
+    b'\x00p\x00H\x00D\x00B\x00\x00\x01\x06\x00@\x00@'
+    b'\x00@\x00@\x00@\x00@\x00~\x00\x00\x01\x06\x00B'
+    b'\x00f\x00Z\x00B\x00B\x00B\x00B\x00\x00\x01\x06'
+    b'\x00B\x00b\x00R\x00J\x00F\x00B\x00B\x00\x00'
+    b'\x01\x06\x00<\x00B\x00B\x00B\x00B\x00B\x00<'
+    b'\x00\x00\x01\x06\x00|\x00B\x00B\x00|\x00@\x00@'
+    b'\x00@\x00\x00\x01\x06\x00<\x00B\x00B\x00B\x00R'
+    b'\x00J\x00<\x00\x06\x01\x06\x00|\x00B\x00B\x00|'
+    b'\x00H\x00D\x00B\x00\x00\x01\x06\x00<\x00B\x00@'
+    b'\x00<\x00\x02\x00B\x00<\x00\x00\x01\x06\x00~\x00\x08'
+    b'\x00\x08\x00\x08\x00\x08\x00\x08\x00\x08\x00\x00\x01\x06\x00B'
+    b'\x00B\x00B\x00B\x00B\x00B\x00<\x00\x00\x01\x06'
+    b'\x00B\x00B\x00B\x00B\x00B\x00$\x00\x18\x00\x00'
+    b'\x01\x06\x00B\x00B\x00B\x00B\x00Z\x00f\x00B'
+    b'\x00\x00\x01\x06\x00B\x00B\x00$\x00\x18\x00$\x00B'
+    b'\x00B\x00\x00\x01\x06\x00B\x00B\x00$\x00\x18\x00\x08'
+    b'\x00\x08\x00\x08\x00\x00\x01\x06\x00~\x00\x02\x00\x04\x00\x18'
+    b'\x00 \x00@\x00~\x00\x00'
+)
+
+# Font9x9: glyph numbers by character code, then glyph data
+FONT9X9_INDEX = (
+    b'\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff'
+    b'\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff'
+    b'\x00\x01\xff\xff\xff\xff\xff\xff\xff\xff\xff\x02\x03\x04\x05\xff'
+    b'\x06\x07\x08\t\n\x0b\x0c\r\x0e\x0f\x10\xff\xff\xff\xff\x11'
+    b'\xff\x12\x13\x14\x15\x16\x17\x18\x19\x1a\x1b\x1c\x1d\x1e\x1f '
+    b'!"#$%&\'()*+\xff\xff\xff\xff\xff'
+    b'\xff\x12\x13\x14\x15\x16\x17\x18\x19\x1a\x1b\x1c\x1d\x1e\x1f '
+    b'!"#$%&\'()*+\xff\xff\xff\xff\xff'
+    b'\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff'
+    b'\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff'
+    b'\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff'
+    b'\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff'
+    b'\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff'
+    b'\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff'
+    b'\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff'
+    b'\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff'
+)
+FONT9X9_DATA = (
+    b'\x00\x04\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00'
+    b'\x00\x00\x00\x00\x03\x04\x000\x000\x000\x000\x000'
+    b'\x00\x00\x000\x000\x00\x00\x01\x06\x00\x00\x000\x000'
+    b'\x00\xfc\x00\xfc\x000\x000\x00\x00\x00\x00\x02\x04\x00\x00'
+    b'\x00\x00\x00\x00\x00\x00\x00\x00\x00p\x00p\x000\x00`'
+    b'\x01\x06\x00\x00\x00\x00\x00\x00\x00\xfc\x00\xfc\x00\x00\x00\x00'
+    b'\x00\x00\x00\x00\x02\x04\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00'
+    b'\x00\x00\x00p\x00p\x00\x00\x01\x06\x00x\x00\xcc\x00\xcc'
+    b'\x00\xcc\x00\xcc\x00\xcc\x00\xcc\x00x\x00\x00\x02\x05\x000'
+    b'\x00p\x000\x000\x000\x000\x000\x00x\x00\x00'
+    b'\x01\x06\x00x\x00\xcc\x00\x0c\x00\x18\x000\x00`\x00\xc0'
+    b'\x00\xfc\x00\x00\x01\x06\x00x\x00\xcc\x00\x0c\x008\x00\x0c'
+    b'\x00\x0c\x00\xcc\x00x\x00\x00\x01\x06\x00\x18\x008\x00x'
+    b'\x00\xd8\x00\xfc\x00\x18\x00\x18\x00\x18\x00\x00\x01\x06\x00\xfc'
+    b'\x00\xc0\x00\xc0\x00\xf8\x00\x0c\x00\x0c\x00\xcc\x00x\x00\x00'
+    b'\x01\x06\x00x\x00\xcc\x00\xc0\x00\xf8\x00\xcc\x00\xcc\x00\xcc'
+    b'\x00x\x00\x00\x01\x06\x00\xfc\x00\x0c\x00\x18\x000\x00`'
+    b'\x00`\x00`\x00`\x00\x00\x01\x06\x00x\x00\xcc\x00\xcc'
+    b'\x00x\x00\xcc\x00\xcc\x00\xcc\x00x\x00\x00\x01\x06\x00x'
+    b'\x00\xcc\x00\xcc\x00\xcc\x00|\x00\x0c\x00\xcc\x00x\x00\x00'
+    b'\x02\x04\x00\x00\x00\x00\x00p\x00p\x00\x00\x00p\x00p'
+    b'\x00\x00\x00\x00\x01\x06\x00x\x00\xcc\x00\x0c\x00\x18\x000'
+    b'\x00\x00\x000\x000\x00\x00\x01\x06\x00x\x00\xcc\x00\xcc'
+    b'\x00\xcc\x00\xfc\x00\xcc\x00\xcc\x00\xcc\x00\x00\x01\x06\x00\xf8'
+    b'\x00\xcc\x00\xcc\x00\xf8\x00\xcc\x00\xcc\x00\xcc\x00\xf8\x00\x00'
+    b'\x01\x06\x00x\x00\xcc\x00\xc0\x00\xc0\x00\xc0\x00\xc0\x00\xcc'
+    b'\x00x\x00\x00\x01\x06\x00\xf0\x00\xd8\x00\xcc\x00\xcc\x00\xcc'
+    b'\x00\xcc\x00\xd8\x00\xf0\x00\x00\x01\x06\x00\xfc\x00\xc0\x00\xc0'
+    b'\x00\xf8\x00\xc0\x00\xc0\x00\xc0\x00\xfc\x00\x00\x01\x06\x00\xfc'
+    b'\x00\xc0\x00\xc0\x00\xf8\x00\xc0\x00\xc0\x00\xc0\x00\xc0\x00\x00'
+    b'\x01\x06\x00x\x00\xcc\x00\xc0\x00\xc0\x00\xdc\x00\xcc\x00\xcc'
+    b'\x00x\x00\x00\x01\x06\x00\xcc\x00\xcc\x00\xcc\x00\xfc\x00\xcc'
+    b'\x00\xcc\x00\xcc\x00\xcc\x00\x00\x02\x05\x00x\x000\x000'
+    b'\x000\x000\x000\x000\x00x\x00\x00\x01\x06\x00\x0c'
+    b'\x00\x0c\x00\x0c\x00\x0c\x00\x0c\x00\xcc\x00\xcc\x00x\x00\x00'
+    b'\x01\x06\x00\xcc\x00\xd8\x00\xf0\x00\xe0\x00\xf0\x00\xd8\x00\xcc'
+    b'\x00\xcc\x00\x00\x01\x06\x00\xc0\x00\xc0\x00\xc0\x00\xc0\x00\xc0'
+    b'\x00\xc0\x00\xc0\x00\xfc\x00\x00\x01\x07\x00\xc6\x00\xee\x00\xfe'
+    b'\x00\xd6\x00\xc6\x00\xc6\x00\xc6\x00\xc6\x00\x00\x01\x07\x00\xc6'
+    b'\x00\xe6\x00\xf6\x00\xde\x00\xce\x00\xc6\x00\xc6\x00\xc6\x00\x00'
+    b'\x01\x06\x00x\x00\xcc\x00\xcc\x00\xcc\x00\xcc\x00\xcc\x00\xcc'
+    b'\x00x\x00\x00\x01\x06\x00\xf8\x00\xcc\x00\xcc\x00\xcc\x00\xf8'
+    b'\x00\xc0\x00\xc0\x00\xc0\x00\x00\x01\x06\x00x\x00\xcc\x00\xcc'
+    b'\x00\xcc\x00\xcc\x00\xdc\x00\xcc\x00x\x00\x0c\x01\x06\x00\xf8'
+    b'\x00\xcc\x00\xcc\x00\xcc\x00\xf8\x00\xd8\x00\xcc\x00\xcc\x00\x00'
+    b'\x01\x06\x00x\x00\xcc\x00\xc0\x00p\x00\x18\x00\x0c\x00\xcc'
+    b'\x00x\x00\x00\x01\x06\x00\xfc\x000\x000\x000\x000'
+    b'\x000\x000\x000\x00\x00\x01\x06\x00\xcc\x00\xcc\x00\xcc'
+    b'\x00\xcc\x00\xcc\x00\xcc\x00\xcc\x00x\x00\x00\x01\x06\x00\xcc'
+    b'\x00\xcc\x00\xcc\x00\xcc\x00\xcc\x00\xcc\x00x\x000\x00\x00'
+    b'\x01\x07\x00\xc6\x00\xc6\x00\xc6\x00\xc6\x00\xd6\x00\xfe\x00\xee'
+    b'\x00\xc6\x00\x00\x01\x06\x00\xcc\x00\xcc\x00x\x000\x000'
+    b'\x00x\x00\xcc\x00\xcc\x00\x00\x01\x06\x00\xcc\x00\xcc\x00\xcc'
+    b'\x00x\x000\x000\x000\x000\x00\x00\x01\x06\x00\xfc'
+    b'\x00\x0c\x00\x18\x000\x00`\x00\xc0\x00\xc0\x00\xfc\x00\x00'
+)
+
+# draw_xmas_tree: row, col, g, r, b per pixel
+TREE_SPRITE = (
+    b'\x08\x0f\x01\x08\r\x01\x02\x00\x00\r\x02\x00\x02\x00\x0c\x02'
+    b'\x02\x00\x00\n\x02\x02\x00\x00\r\x03\x02\x00\x00\x0c\x03\x02'
+    b'\x00\x00\x0b\x03\x02\x00\x00\n\x03\x00\x02\x02\t\x03\x02\x00'
+    b'\x00\x0f\x04\x02\x04\x00\x0e\x04\x02\x04\x00\r\x04\x03\x00\x00'
+    b'\x0c\x04\x00\x02\x02\x0b\x04\x03\x00\x00\n\x04\x03\x00\x00\t'
+    b'\x04\x03\x00\x00\x08\x04\x03\x00\x00\x0f\x05\x02\x04\x00\x0e\x05'
+    b'\x02\x04\x00\r\x05\x03\x00\x00\x0c\x05\x03\x00\x00\x0b\x05\x03'
+    b'\x00\x00\n\x05\x03\x00\x00\t\x05\x00\x02\x00\x08\x05\x03\x00'
+    b'\x00\r\x06\x02\x00\x00\x0c\x06\x00\x02\x00\x0b\x06\x02\x00\x00'
+    b'\n\x06\x02\x00\x00\t\x06\x02\x00\x00\r\x07\x02\x00\x00\x0c'
+    b'\x07\x02\x00\x00\n\x07\x02\x00\x00\r\x08\x02\x00\x00'
+)
+
+# SIN_TABLE: fastmath.make_sin_table
+SIN_TABLE = (
+    b'\x80\x83\x86\x89\x8c\x90\x93\x96\x99\x9c\x9f\xa2\xa5\xa8\xab\xae'
+    b'\xb1\xb3\xb6\xb9\xbc\xbf\xc1\xc4\xc7\xc9\xcc\xce\xd1\xd3\xd5\xd8'
+    b'\xda\xdc\xde\xe0\xe2\xe4\xe6\xe8\xea\xeb\xed\xef\xf0\xf1\xf3\xf4'
+    b'\xf5\xf6\xf8\xf9\xfa\xfa\xfb\xfc\xfd\xfd\xfe\xfe\xfe\xff\xff\xff'
+    b'\xff\xff\xff\xff\xfe\xfe\xfe\xfd\xfd\xfc\xfb\xfa\xfa\xf9\xf8\xf6'
+    b'\xf5\xf4\xf3\xf1\xf0\xef\xed\xeb\xea\xe8\xe6\xe4\xe2\xe0\xde\xdc'
+    b'\xda\xd8\xd5\xd3\xd1\xce\xcc\xc9\xc7\xc4\xc1\xbf\xbc\xb9\xb6\xb3'
+    b'\xb1\xae\xab\xa8\xa5\xa2\x9f\x9c\x99\x96\x93\x90\x8c\x89\x86\x83'
+    b'\x80}zwtpmjgda^[XUR'
+    b'OMJGDA?<9742/-+('
+    b'&$" \x1e\x1c\x1a\x18\x16\x15\x13\x11\x10\x0f\r\x0c'
+    b'\x0b\n\x08\x07\x06\x06\x05\x04\x03\x03\x02\x02\x02\x01\x01\x01'
+    b'\x01\x01\x01\x01\x02\x02\x02\x03\x03\x04\x05\x06\x06\x07\x08\n'
+    b'\x0b\x0c\r\x0f\x10\x11\x13\x15\x16\x18\x1a\x1c\x1e "$'
+    b'&(+-/2479<?ADGJM'
+    b'ORUX[^adgjmptwz}'
+)
+
+# SQRT_TABLE: fastmath.make_sqrt_table
+SQRT_TABLE = (
+    b'\x00\x01\x01\x01\x02\x02\x02\x02\x02\x03\x03\x03\x03\x03\x03\x03'
+    b'\x04\x04\x04\x04\x04\x04\x04\x04\x04\x05\x05\x05\x05\x05\x05\x05'
+    b'\x05\x05\x05\x05\x06\x06\x06\x06\x06\x06\x06\x06\x06\x06\x06\x06'
+    b'\x06\x07\x07\x07\x07\x07\x07\x07\x07\x07\x07\x07\x07\x07\x07\x07'
+    b'\x08\x08\x08\x08\x08\x08\x08\x08\x08\x08\x08\x08\x08\x08\x08\x08'
+    b'\x08\t\t\t\t\t\t\t\t\t\t\t\t\t\t\t'
+    b'\t\t\t\t\n\n\n\n\n\n\n\n\n\n\n\n'
+    b'\n\n\n\n\n\n\n\n\n\x0b\x0b\x0b\x0b\x0b\x0b\x0b'
+    b'\x0b\x0b\x0b\x0b\x0b\x0b\x0b\x0b\x0b\x0b\x0b\x0b\x0b\x0b\x0b\x0b'
+    b'\x0c\x0c\x0c\x0c\x0c\x0c\x0c\x0c\x0c\x0c\x0c\x0c\x0c\x0c\x0c\x0c'
+    b'\x0c\x0c\x0c\x0c\x0c\x0c\x0c\x0c\x0c\r\r\r\r\r\r\r'
+    b'\r\r\r\r\r\r\r\r\r\r\r\r\r\r\r\r'
+    b'\r\r\r\r\x0e\x0e\x0e\x0e\x0e\x0e\x0e\x0e\x0e\x0e\x0e\x0e'
+    b'\x0e\x0e\x0e\x0e\x0e\x0e\x0e\x0e\x0e\x0e\x0e\x0e\x0e\x0e\x0e\x0e'
+    b'\x0e\x0f\x0f\x0f\x0f\x0f\x0f\x0f\x0f\x0f\x0f\x0f\x0f\x0f\x0f\x0f'
+    b'\x0f\x0f\x0f\x0f\x0f\x0f\x0f\x0f\x0f\x0f\x0f\x0f\x0f\x0f\x0f\x0f'
+    b'\x10\x10\x10\x10\x10\x10\x10\x10\x10\x10\x10\x10\x10\x10\x10\x10'
+    b'\x10\x10\x10\x10\x10\x10\x10\x10\x10\x10\x10\x10\x10\x10\x10\x10'
+    b'\x10\x11\x11\x11\x11\x11\x11\x11\x11\x11\x11\x11\x11\x11\x11\x11'
+    b'\x11\x11\x11\x11\x11\x11\x11\x11\x11\x11\x11\x11\x11\x11\x11\x11'
+    b'\x11\x11\x11\x11\x12\x12\x12\x12\x12\x12\x12\x12\x12\x12\x12\x12'
+    b'\x12\x12\x12\x12\x12\x12\x12\x12\x12\x12\x12\x12\x12\x12\x12\x12'
+    b'\x12\x12\x12\x12\x12\x12\x12\x12\x12\x13\x13\x13\x13\x13\x13\x13'
+    b'\x13\x13\x13\x13\x13\x13\x13\x13\x13\x13\x13\x13\x13\x13\x13\x13'
+    b'\x13\x13\x13\x13\x13\x13\x13\x13\x13\x13\x13\x13\x13\x13\x13\x13'
+    b'\x14\x14\x14\x14\x14\x14\x14\x14\x14\x14\x14\x14\x14\x14\x14\x14'
+    b'\x14\x14\x14\x14\x14\x14\x14\x14\x14\x14\x14\x14\x14\x14\x14\x14'
+    b'\x14\x14\x14\x14\x14\x14\x14\x14\x14\x15\x15\x15\x15\x15\x15\x15'
+    b'\x15\x15\x15\x15\x15\x15\x15\x15\x15\x15\x15\x15\x15\x15\x15\x15'
+    b'\x15\x15\x15\x15\x15\x15\x15\x15\x15\x15\x15\x15\x15\x15\x15\x15'
+    b'\x15\x15\x15\x15\x16\x16\x16\x16\x16\x16\x16\x16\x16\x16\x16\x16'
+    b'\x16\x16\x16\x16\x16\x16\x16\x16\x16\x16\x16\x16\x16\x16\x16\x16'
+    b'\x16\x16\x16\x16\x16\x16\x16\x16\x16\x16\x16\x16\x16\x16\x16\x16'
+    b'\x16\x17\x17\x17\x17\x17\x17\x17\x17\x17\x17\x17\x17\x17\x17\x17'
+    b'\x17\x17\x17\x17\x17\x17\x17\x17\x17\x17\x17\x17\x17\x17\x17\x17'
+    b'\x17\x17\x17\x17\x17\x17\x17\x17\x17\x17\x17\x17\x17\x17\x17\x17'
+    b'\x18\x18\x18\x18\x18\x18\x18\x18\x18\x18\x18\x18\x18\x18\x18\x18'
+    b'\x18\x18\x18\x18\x18\x18\x18\x18\x18\x18\x18\x18\x18\x18\x18\x18'
+    b'\x18\x18\x18\x18\x18\x18\x18\x18\x18\x18\x18\x18\x18\x18\x18\x18'
+    b'\x18\x19\x19\x19\x19\x19\x19\x19\x19\x19\x19\x19\x19\x19\x19\x19'
+    b'\x19\x19\x19\x19\x19\x19\x19\x19\x19\x19\x19\x19\x19\x19\x19\x19'
+    b'\x19\x19\x19\x19\x19\x19\x19\x19\x19\x19\x19\x19\x19\x19\x19\x19'
+    b'\x19\x19\x19\x19\x1a\x1a\x1a\x1a\x1a\x1a\x1a\x1a\x1a\x1a\x1a\x1a'
+    b'\x1a\x1a\x1a\x1a\x1a\x1a\x1a\x1a\x1a\x1a\x1a\x1a\x1a\x1a\x1a\x1a'
+    b'\x1a\x1a\x1a\x1a\x1a\x1a\x1a\x1a\x1a\x1a\x1a\x1a\x1a\x1a\x1a\x1a'
+    b'\x1a\x1a\x1a\x1a\x1a\x1a\x1a\x1a\x1a\x1b\x1b\x1b\x1b\x1b\x1b\x1b'
+    b'\x1b\x1b\x1b\x1b\x1b\x1b\x1b\x1b\x1b\x1b\x1b\x1b\x1b\x1b\x1b\x1b'
+    b'\x1b\x1b\x1b\x1b\x1b\x1b\x1b\x1b\x1b\x1b\x1b\x1b\x1b\x1b\x1b\x1b'
+    b'\x1b\x1b\x1b\x1b\x1b\x1b\x1b\x1b\x1b\x1b\x1b\x1b\x1b\x1b\x1b\x1b'
+    b'\x1c\x1c\x1c\x1c\x1c\x1c\x1c\x1c\x1c\x1c\x1c\x1c\x1c\x1c\x1c\x1c'
+    b'\x1c\x1c\x1c\x1c\x1c\x1c\x1c\x1c\x1c\x1c\x1c\x1c\x1c\x1c\x1c\x1c'
+    b'\x1c\x1c\x1c\x1c\x1c\x1c\x1c\x1c\x1c\x1c\x1c\x1c\x1c\x1c\x1c\x1c'
+    b'\x1c\x1c\x1c\x1c\x1c\x1c\x1c\x1c\x1c\x1d\x1d\x1d\x1d\x1d\x1d\x1d'
+    b'\x1d\x1d\x1d\x1d\x1d\x1d\x1d\x1d\x1d\x1d\x1d\x1d\x1d\x1d\x1d\x1d'
+    b'\x1d\x1d\x1d\x1d\x1d\x1d\x1d\x1d\x1d\x1d\x1d\x1d\x1d\x1d\x1d\x1d'
+    b'\x1d\x1d\x1d\x1d\x1d\x1d\x1d\x1d\x1d\x1d\x1d\x1d\x1d\x1d\x1d\x1d'
+    b'\x1d\x1d\x1d\x1d\x1e\x1e\x1e\x1e\x1e\x1e\x1e\x1e\x1e\x1e\x1e\x1e'
+    b'\x1e\x1e\x1e\x1e\x1e\x1e\x1e\x1e\x1e\x1e\x1e\x1e\x1e\x1e\x1e\x1e'
+    b'\x1e\x1e\x1e\x1e\x1e\x1e\x1e\x1e\x1e\x1e\x1e\x1e\x1e\x1e\x1e\x1e'
+    b'\x1e\x1e\x1e\x1e\x1e\x1e\x1e\x1e\x1e\x1e\x1e\x1e\x1e\x1e\x1e\x1e'
+    b'\x1e\x1f\x1f\x1f\x1f\x1f\x1f\x1f\x1f\x1f\x1f\x1f\x1f\x1f\x1f\x1f'
+    b'\x1f\x1f\x1f\x1f\x1f\x1f\x1f\x1f\x1f\x1f\x1f\x1f\x1f\x1f\x1f\x1f'
+    b'\x1f\x1f\x1f\x1f\x1f\x1f\x1f\x1f\x1f\x1f\x1f\x1f\x1f\x1f\x1f\x1f'
+    b'\x1f\x1f\x1f\x1f\x1f\x1f\x1f\x1f\x1f\x1f\x1f\x1f\x1f\x1f\x1f\x1f'
+)
@@ -0,0 +1,856 @@
+# Host-side benchmarks (CPython).
+#
+# Usage: python benchmark.py [name ...]
+# Without arguments all benchmarks are run. On the Pico, use the
+# built-in benchmarks of the individual modules (e.g. kernels.benchmark()).
+import sys
+import time
+
+import main
+
+
+################################################################################
+# region Helpers
+################################################################################
+def run_frames(manager, pixels, count):
+    """Run count frames of the manager into pixels, return seconds elapsed"""
+    start = time.perf_counter()
+    for _ in range(count):
+        pixels.clear(main.DARK_BLUE)
+        manager.update(pixels)
+    return time.perf_counter() - start
+
+
+################################################################################
+# region Benchmarks
+################################################################################
+def benchmark_geometry(sizes=((16, 10), (32, 20), (64, 40), (128, 80), (256, 160))):
+    """
+    Per-frame cost of one loop of the Christmas show against grid size.
+
+    The cost per pixel should stay flat or drop as the grid grows, i.e.
+    the frame cost scales linearly or better with the number of pixels.
+    """
+    print("Grid size   Pixels   ms/frame   us/pixel")
+    for width, height in sizes:
+        manager = main.create_xmas_manager(width, height)
+        pixels = manager.create_framebuffer()
+        frames = manager.duration + manager.frames_between_loops
+        elapsed = run_frames(manager, pixels, frames)
+        per_frame = elapsed / frames
+        print("%4dx%-4d %8d %10.3f %10.3f" % (width, height, pixels.num,
+                                             per_frame * 1e3,
+                                             per_frame * 1e6 / pixels.num))
+
+
+def benchmark_stream(width=main.WIDTH, height=main.HEIGHT, window=2):
+    """
+    Stream one loop of the Christmas show through a pty loopback.
+
+    The loopback decodes the packets like the Pico would; this measures
+    throughput and acknowledgement latency (tests/test_stream.py checks
+    the frames).
+    """
+    import stream
+    manager = main.create_xmas_manager(width, height)
+    pixels = manager.create_framebuffer()
+    loopback = stream.PtyLoopback(pixels.num)
+    renderer = main.SerialStreamRenderer(loopback.device, window=window,
+                                         width=width, height=height)
+    frames = manager.duration + manager.frames_between_loops
+    renderer.start()
+    start = time.perf_counter()
+    for _ in range(frames):
+        pixels.clear(main.DARK_BLUE)
+        manager.update(pixels)
+        renderer.render(pixels)
+    renderer.stop()
+    elapsed = time.perf_counter() - start
+    loopback.close()
+
+    stats = renderer.stats()
+    print("%dx%d, window %d: %d frames, %.0f frames/s, %.1f bytes/frame "
+          "(raw: %d), latency mean %.2f ms, max %.2f ms, %d NAKs"
+          % (width, height, window, stats["frames"], frames / elapsed,
+             stats["bytes_per_frame"], 3 * pixels.num + 8,
+             stats["latency_mean"] * 1e3, stats["latency_max"] * 1e3,
+             stats["naks"]))
+
+
+def benchmark_gif(path="/tmp/benchmark.gif"):
+    """
+    GIF encode time and size of the same frames written three ways: as
+    RGB images, which Pillow has to quantize one by one; as P-mode images
+    with the global palette; and with GIFRenderer's own delta rectangles
+    and duplicate-frame merging (what GIFRenderer.stop() uses).
+    """
+    import os
+    renderer = main.GIFRenderer(width=main.HEIGHT, height=main.WIDTH,
+                                scale=20, output_path=path)
+    manager = main.create_xmas_manager()
+    pixels = manager.create_framebuffer()
+    renderer.start()
+    for _ in range(manager.duration + manager.frames_between_loops):
+        pixels.clear(main.DARK_BLUE)
+        manager.update(pixels)
+        renderer.render(pixels)
+    frames = renderer.finish_frames()
+    rgb_frames = [img.convert("RGB") for img in frames]
+    print("Palette: %d colors" % len(renderer.palette))
+    for name, images in (("RGB", rgb_frames), ("P", frames)):
+        start = time.perf_counter()
+        images[0].save(path, save_all=True, append_images=images[1:],
+                       duration=100, loop=0)
+        elapsed = time.perf_counter() - start
+        print("%-6s encode %6.3f s, %8d bytes"
+              % (name, elapsed, os.path.getsize(path)))
+    start = time.perf_counter()
+    renderer.save_delta()
+    elapsed = time.perf_counter() - start
+    print("%-6s encode %6.3f s, %8d bytes"
+          % ("delta", elapsed, os.path.getsize(path)))
+
+
+def benchmark_smoothing(scale=20, path="/tmp/benchmark.gif"):
+    """
+    Smoothed GIF export: corner stamps on palette indices (GIFRenderer)
+    against the four OpenCV morphology passes per RGB frame used before,
+    which also leave Pillow to quantize every frame when saving. The
+    OpenCV variant only runs if cv2 is installed.
+    """
+    renderer = main.GIFRenderer(width=main.HEIGHT, height=main.WIDTH,
+                                scale=scale, smoothing=True, output_path=path)
+    manager = main.create_xmas_manager()
+    pixels = manager.create_framebuffer()
+    renderer.start()
+    for _ in range(manager.duration + manager.frames_between_loops):
+        pixels.clear(main.DARK_BLUE)
+        manager.update(pixels)
+        renderer.render(pixels)
+    count = len(renderer.frames)
+
+    start = time.perf_counter()
+    for frame in renderer.frames:
+        renderer.smooth_indices(frame)
+    stamp = time.perf_counter() - start
+    start = time.perf_counter()
+    renderer.save_delta()
+    export = time.perf_counter() - start
+    print("stamp:      %6.3f ms/frame, export %6.3f s" % (stamp / count * 1e3, export))
+
+    try:
+        import cv2
+        import numpy as np
+        from PIL import Image
+    except ImportError:
+        print("morphology: OpenCV not installed")
+        return
+    renderer.smoothing = False
+    images = [np.array(img.convert("RGB")) for img in renderer.finish_frames()]
+    kernel = cv2.getStructuringElement(cv2.MORPH_ELLIPSE,
+                                       (scale // 2, scale // 2))
+    start = time.perf_counter()
+    smoothed = []
+    for img in images:
+        cv_img = cv2.cvtColor(img, cv2.COLOR_RGB2BGR)
+        for op in (cv2.MORPH_OPEN, cv2.MORPH_CLOSE) * 2:
+            cv_img = cv2.morphologyEx(cv_img, op, kernel, iterations=1)
+        smoothed.append(Image.fromarray(cv2.cvtColor(cv_img, cv2.COLOR_BGR2RGB)))
+    morphology = time.perf_counter() - start
+    smoothed[0].save(path, save_all=True, append_images=smoothed[1:],
+                     duration=100, loop=0)
+    export_cv = time.perf_counter() - start
+    print("morphology: %6.3f ms/frame, export %6.3f s (%.0fx / %.0fx slower)"
+          % (morphology / count * 1e3, export_cv, morphology / stamp,
+             export_cv / export))
+
+
+def benchmark_gif_pipeline(width=main.WIDTH, height=main.HEIGHT, loops=4,
+                           scale=20, smoothing=True, path="/tmp/benchmark.gif"):
+    """
+    GIF export throughput (frames/s including encoding) with the encoder
+    in the main process (serial) and in a worker process (pipelined).
+    """
+    print("%dx%d, scale %d, smoothing %s" % (width, height, scale, smoothing))
+    for background in (False, True):
+        renderer = main.GIFRenderer(width=height, height=width,
+                                    scale=scale, smoothing=smoothing,
+                                    output_path=path, background=background)
+        manager = main.create_xmas_manager(width, height)
+        pixels = manager.create_framebuffer()
+        frames = loops * (manager.duration + manager.frames_between_loops)
+        start = time.perf_counter()
+        renderer.start()
+        for _ in range(frames):
+            pixels.clear(main.DARK_BLUE)
+            manager.update(pixels)
+            renderer.render(pixels)
+        renderer.stop()
+        elapsed = time.perf_counter() - start
+        print("%-9s %6d frames in %6.3f s: %8.0f frames/s"
+              % ("pipelined" if background else "serial", frames, elapsed,
+                 frames / elapsed))
+
+
+def benchmark_frames(sizes=((16, 10), (64, 40), (256, 160))):
+    """Time render_frames() for one loop of the Christmas show"""
+    for width, height in sizes:
+        manager = main.create_xmas_manager(width, height)
+        start = time.perf_counter()
+        frames = main.render_frames(manager, seed=0)
+        elapsed = time.perf_counter() - start
+        print("%4dx%-4d %s: %7.3f s (%.0f frames/s)"
+              % (width, height, frames.shape, elapsed, len(frames) / elapsed))
+
+
+def benchmark_raw_stream(scales=(1, 4, 20), loops=2):
+    """
+    RawStreamRenderer throughput into a pipe drained by a reader thread
+    (like an encoder reading stdin), in MB/s and frames/s; the show
+    itself runs at 10 frames/s.
+    """
+    import os
+    import threading
+
+    def drain(fd):
+        while os.read(fd, 1 << 16):
+            pass
+
+    for scale in scales:
+        manager = main.create_xmas_manager()
+        pixels = manager.create_framebuffer()
+        read_fd, write_fd = os.pipe()
+        reader = threading.Thread(target=drain, args=(read_fd,))
+        reader.start()
+        renderer = main.RawStreamRenderer(write_fd, scale=scale)
+        frames = loops * (manager.duration + manager.frames_between_loops)
+        renderer.start()
+        start = time.perf_counter()
+        for _ in range(frames):
+            pixels.clear(main.DARK_BLUE)
+            manager.update(pixels)
+            renderer.render(pixels)
+        elapsed = time.perf_counter() - start
+        renderer.stop()
+        os.close(write_fd)
+        reader.join()
+        os.close(read_fd)
+        print("scale %2d (%dx%d): %8.1f MB/s, %7.0f frames/s (%.0fx real time)"
+              % (scale, *renderer.frame_size,
+                 renderer.bytes_written / elapsed / 1e6, frames / elapsed,
+                 frames / elapsed / 10))
+
+
+def benchmark_culling(width=main.WIDTH, height=main.HEIGHT, frames=240):
+    """
+    Frame cost of a stack of animations below a long star explosion, with
+    and without occlusion culling (AnimationManager.cull). In the 
+    Christmas show itself nothing is left running below the explosion, so
+    there culling changes nothing.
+    """
+    for culling in (False, True):
+        manager = main.AnimationManager(loop=False, width=width, height=height)
+        manager.add_animation(main.ChristmasTreeAnimation())
+        manager.add_animation(main.SnowflakeAnimation(n=25, speed=0.5))
+        manager.add_animation(main.FireworkAnimation(background_color=main.DARK_BLUE))
+        manager.add_animation(main.TextScrollAnimation("MERRY CHRISTMAS! ", speed=1))
+        manager.add_animation(main.StarOfBethlehemAnimation(
+            wait_frames=10, growth_frames=10, explosion_frames=frames))
+        manager.culling = culling
+        pixels = manager.create_framebuffer()
+        main.random.seed(0)
+        start = time.perf_counter()
+        for _ in range(frames):
+            pixels.clear(main.DARK_BLUE)
+            manager.update(pixels)
+        elapsed = time.perf_counter() - start
+        print("culling %-5s %4d frames: %7.3f ms/frame, %4d updates culled"
+              % (culling, frames, elapsed / frames * 1e3, manager.culled))
+
+
+def benchmark_compositing(sizes=((16, 10), (64, 40))):
+    """
+    Frame cost of the Christmas show with one shared frame buffer 
+    (AnimationManager) against one layer per animation (CompositingManager),
+    and the cost of compositing a single layer per blend mode.
+    """
+    import array
+    import kernels
+    for width, height in sizes:
+        for layered in (False, True):
+            manager = main.create_xmas_manager(width, height, layered=layered)
+            pixels = manager.create_framebuffer()
+            frames = manager.duration + manager.frames_between_loops
+            main.random.seed(0)
+            start = time.perf_counter()
+            for _ in range(frames):
+                pixels.clear(main.DARK_BLUE)
+                manager.update(pixels)
+            elapsed = time.perf_counter() - start
+            if layered:
+                extra = ", %.2f layers composited/frame" % (manager.composited / frames)
+            else:
+                extra = ""
+            print("%4dx%-4d %-11s %7.3f ms/frame%s"
+                  % (width, height, "layered" if layered else "shared",
+                     elapsed / frames * 1e3, extra))
+        
+        num = width * height
+        layer = array.array("I", [main.TRANSPARENT] * num)
+        for i in range(0, num, 3):
+            layer[i] = (i * 0x030201) & 0xFFFFFF
+        buf = array.array("I", [0x000002] * num)
+        repeat = 100
+        timings = []
+        for name, op in (("copy", kernels.BLEND_COPY),
+                         ("replace", kernels.BLEND_REPLACE),
+                         ("add", kernels.BLEND_ADD),
+                         ("alpha", kernels.BLEND_ALPHA | (128 << 8)),
+                         ("mask", kernels.BLEND_MASK)):
+            start = time.perf_counter()
+            for _ in range(repeat):
+                kernels.blend(buf, layer, op, 0x000002)
+            timings.append("%s %.3f" % (name, (time.perf_counter() - start) / repeat * 1e3))
+        print("%4dx%-4d blend ms/layer: %s" % (width, height, ", ".join(timings)))
+
+
+def benchmark_layer_cache(sizes=(0, 32 * 1024, 128 * 1024, 512 * 1024), loops=3):
+    """
+    Layered Christmas show with LayerCaches of different sizes: frame cost
+    and hit/miss counters over several loops. The cache is swept in loop
+    order, so LRU only hits what fits into it (plus constant phases).
+    """
+    for cache_bytes in sizes:
+        manager = main.create_xmas_manager(layered=True, cache_bytes=cache_bytes)
+        pixels = manager.create_framebuffer()
+        frames = loops * (manager.duration + manager.frames_between_loops)
+        start = time.perf_counter()
+        for _ in range(frames):
+            pixels.clear(main.DARK_BLUE)
+            manager.update(pixels)
+        elapsed = time.perf_counter() - start
+        line = "cache %4d kB: %7.3f ms/frame" % (cache_bytes // 1024, 
+                                                elapsed / frames * 1e3)
+        if manager.cache is not None:
+            stats = manager.cache.stats()
+            line += (", %d hits, %d misses (%.0f%%), %d evictions, %d/%d entries"
+                     % (stats["hits"], stats["misses"], stats["hit_rate"] * 100,
+                        stats["evictions"], stats["entries"], stats["capacity"]))
+        print(line)
+
+
+def benchmark_lookahead(depths=(0, 1, 2, 4, 8), mean_ms=60, loops=2):
+    """
+    Deadline misses of the 10 frames/s main loop with FrameLookahead, on a
+    simulated clock. The render time of every frame of the show is 
+    measured on the host and scaled to a mean of mean_ms, so that the 
+    most expensive frames take longer than their 100 ms slot. A slot is
+    missed when the frame is shown late, or when fill() renders past the
+    end of the slot and delays the next one.
+    """
+    manager = main.create_xmas_manager()
+    pixels = manager.create_framebuffer()
+    period = manager.duration + manager.frames_between_loops
+    costs = [float("inf")] * period
+    for _ in range(3):  # Fastest of three loops, against timing noise
+        for frame in range(period):
+            start = time.perf_counter()
+            pixels.clear(main.DARK_BLUE)
+            manager.update(pixels)
+            costs[frame] = min(costs[frame], time.perf_counter() - start)
+    scale = mean_ms * period / sum(costs)
+    costs = [cost * scale for cost in costs]
+    print("Simulated render time: mean %.1f ms, max %.1f ms, %d frames over 100 ms"
+          % (sum(costs) / period, max(costs), sum(cost > 100 for cost in costs)))
+    
+    class Clock:
+        now = 0.0
+        def __call__(self):
+            return self.now
+    
+    class TimedManager:
+        # Advances the clock by the simulated render time of each frame
+        def __init__(self, manager, clock):
+            self.manager = manager
+            self.clock = clock
+        def update(self, pixels):
+            self.clock.now += costs[self.manager.get_frame() % period]
+            return self.manager.update(pixels)
+        def create_framebuffer(self):
+            return self.manager.create_framebuffer()
+        def get_frame(self):
+            return self.manager.get_frame()
+        def get_repeat_count(self):
+            return self.manager.get_repeat_count()
+    
+    for depth in depths:
+        clock = Clock()
+        timed = TimedManager(main.create_xmas_manager(), clock)
+        lookahead = main.FrameLookahead(timed, depth=depth, clock=clock,
+                                        period=period)
+        pixels = timed.create_framebuffer()
+        missed = 0
+        overruns = 0  # Slots missed by fill() alone
+        for _ in range(loops * period):
+            start = clock.now
+            if depth > 0:
+                lookahead.next_frame()
+            else:
+                pixels.clear(main.DARK_BLUE)
+                timed.update(pixels)
+            late = clock.now - start > 100
+            if depth > 0:
+                lookahead.fill(start + 100)
+                if not late and clock.now - start > 100:
+                    overruns += 1
+                    late = True
+            missed += late
+            clock.now = max(clock.now, start + 100)  # Sleep
+        usage = ""
+        if depth > 0:
+            usage = ", ring depth: " + " ".join(
+                "%d:%d" % (d, n) for d, n in enumerate(lookahead.usage) if n)
+        print("depth %d: %3d of %d slots missed (%d by fill)%s"
+              % (depth, missed, loops * period, overruns, usage))
+
+
+def benchmark_dither(rates=(100, 200, 400), frames=30):
+    """
+    DitheredRenderer on a fake strip: the time-averaged error of the dim
+    channel values, then the Christmas show in real time (10 frames/s) 
+    with the subframe rate achieved and the cost of one subframe 
+    (tests/test_dither.py checks the subframe averages).
+    """
+    import kernels
+    renderer = main.DitheredRenderer(brightness=1.8, 
+                                     state_machine=main.FakeStateMachine(record=False))
+    # Time-averaged LED value against the exact dimmed value, for the
+    # channel values of the palette
+    one = 1 << kernels.DITHER_BITS
+    plain = max(v * 1.8 - int(v * 1.8) for v in range(9))
+    dithered = max(abs(v * 1.8 - renderer.table[v] / one) for v in range(9))
+    print("Max error for channel values 0-8: %.2f LED steps plain, %.3f dithered"
+          % (plain, dithered))
+    
+    pixels = main.FrameBuffer()
+    for rate in rates:
+        manager = main.create_xmas_manager()
+        strip = main.FakeStateMachine(record=False)
+        renderer = main.DitheredRenderer(brightness=1.8, refresh_hz=rate,
+                                         state_machine=strip)
+        renderer.start()
+        start = time.perf_counter()
+        for _ in range(frames):
+            start_ms = main.ticks_ms()
+            pixels.clear(main.DARK_BLUE)
+            manager.update(pixels)
+            renderer.render(pixels)
+            renderer.wait(start_ms + 100)
+        elapsed = time.perf_counter() - start
+        achieved = renderer.subframes / elapsed
+        t0 = time.perf_counter()
+        for _ in range(100):
+            renderer.refresh()
+        per_subframe = (time.perf_counter() - t0) / 100
+        print("%3d Hz: %6.1f subframes/s achieved, %6.1f us per subframe"
+              % (rate, achieved, per_subframe * 1e6))
+
+
+def benchmark_rainbow(frames=256, num=160):
+    """
+    Rainbow frames per second: the loop of NeoPixel.rainbow_cycle before
+    the wheel table (wheel() arithmetic and pixels_set() per LED, copied
+    here since neopixel.py needs the Pico) against RainbowAnimation in an
+    AnimationManager (table rotation with kernels.gather). Both without
+    showing and sleeping.
+    """
+    import array
+    
+    def wheel(pos):
+        if pos < 0 or pos > 31:
+            return (0, 0, 0)
+        if pos < 10:
+            return (31 - pos * 3, pos * 3, 0)
+        if pos < 15:
+            pos -= 10
+            return (0, 31 - pos * 3, pos * 3)
+        pos -= 15
+        return (pos * 3, 0, 31 - pos * 3)
+    
+    ar = array.array("I", [0] * num)
+    start = time.perf_counter()
+    for j in range(frames):
+        for i in range(num):
+            color = wheel(((i * 256 // num) + j) & 31)
+            ar[i] = ((color[1] << 16) + (color[0] << 8) + color[2]) & 0xFFFFFFFF
+    legacy = time.perf_counter() - start
+    
+    manager = main.AnimationManager(loop=False, width=main.WIDTH, height=main.HEIGHT)
+    rainbow = main.RainbowAnimation(level=31)
+    manager.add_animation(rainbow)
+    pixels = manager.create_framebuffer()
+    start = time.perf_counter()
+    for j in range(frames):
+        pixels.clear(main.DARK_BLUE)
+        manager.update(pixels)
+    animation = time.perf_counter() - start
+    print("rainbow_cycle loop: %8.0f frames/s" % (frames / legacy))
+    print("RainbowAnimation:   %8.0f frames/s (%.1fx)"
+          % (frames / animation, legacy / animation))
+
+
+def benchmark_assets(repeat=20):
+    """
+    Boot-to-first-frame time (creating the show's manager and rendering
+    its first frame) and heap held by the four fonts, with the fonts and
+    sprites taken from assets.py against compiling them from the Python
+    sources (what happens without assets.py). On CPython the blobs of
+    assets.py are counted as module data, not heap, like in flash on 
+    the Pico.
+    """
+    import tracemalloc
+    saved = main.assets
+    for label, assets in (("assets.py", saved), ("compiled", None)):
+        main.assets = assets
+        start = time.perf_counter()
+        for _ in range(repeat):
+            manager = main.create_xmas_manager()
+            pixels = manager.create_framebuffer()
+            manager.update(pixels)
+        boot = (time.perf_counter() - start) / repeat
+        tracemalloc.start()
+        fonts = [main.select_font(size) for size in (6, 7, 8, 9)]
+        heap = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        del fonts
+        print("%-9s boot to first frame %6.2f ms, fonts %6d bytes heap"
+              % (label, boot * 1e3, heap))
+    main.assets = saved
+
+
+def benchmark_primitives(sizes=((16, 10), (64, 40), (256, 160)), repeat=20):
+    """
+    Time per call of every drawing primitive against setting the same
+    pixels one at a time through pixel2index (like the margin loops in 
+    FontBase.draw did). Rectangles and sprites cover a quarter of the 
+    grid and stick out over its corner, so clipping is included.
+    """
+    import primitives
+    p2i = main.p2i
+    color = main.pack_color(main.YELLOW)
+    
+    def per_pixel(pixels, row, col, rows, cols, mask=None):
+        w = pixels.width
+        for r in range(row, row + rows):
+            for c in range(col, col + cols):
+                if 0 <= r < w and 0 <= c < pixels.height:
+                    pixels.buf[p2i(r, c, w)] = color
+    
+    def timed(func, *args):
+        start = time.perf_counter()
+        for _ in range(repeat):
+            func(*args)
+        return (time.perf_counter() - start) / repeat * 1e6
+    
+    print("Grid size   Primitive      us/call   per pixel   speedup")
+    for width, height in sizes:
+        pixels = main.FrameBuffer(width, height)
+        rows, cols = width // 2, height // 2
+        row, col = width - rows // 2, height - cols // 2
+        sprite = main.FrameBuffer(rows, cols)
+        mask = bytes(i & 1 for i in range(sprite.num))
+        cases = (
+            ("fill", (primitives.fill, pixels, color), 
+             (per_pixel, pixels, 0, 0, width, height)),
+            ("fill_rect", (primitives.fill_rect, pixels, row, col, rows, cols, color),
+             (per_pixel, pixels, row, col, rows, cols)),
+            ("hline", (primitives.hline, pixels, rows, 0, height, color),
+             (per_pixel, pixels, rows, 0, 1, height)),
+            ("vline", (primitives.vline, pixels, 0, cols, width, color),
+             (per_pixel, pixels, 0, cols, width, 1)),
+            ("blit", (primitives.blit, pixels, sprite, row, col),
+             (per_pixel, pixels, row, col, rows, cols)),
+            ("blit mask", (primitives.blit, pixels, sprite, row, col, mask),
+             (per_pixel, pixels, row, col, rows, cols)),
+        )
+        for name, fast, slow in cases:
+            t_fast = timed(*fast)
+            t_slow = timed(*slow)
+            print("%4dx%-4d   %-12s %9.1f %11.1f %8.1fx"
+                  % (width, height, name, t_fast, t_slow, t_slow / t_fast))
+
+
+def benchmark_text(frames=400, repeat=2000):
+    """
+    Cost of FontBase.draw for a character on the grid, half off the grid
+    and completely off it, and ms/frame of a long scrolling text, most of
+    which is off the grid at any time.
+    """
+    font = main.select_font(9)
+    pixels = main.FrameBuffer()
+    for label, row, col in (("visible", 2, 1), ("half off", 12, 5), 
+                            ("off grid", 2, 40), ("off grid", 20, 1)):
+        start = time.perf_counter()
+        for _ in range(repeat):
+            font.draw(pixels, "M", row_offset=row, col_offset=col, color=main.WHITE)
+        elapsed = (time.perf_counter() - start) / repeat
+        print("draw %-9s (%3d, %3d) %6.2f us" % (label, row, col, elapsed * 1e6))
+    
+    text = "MERRY CHRISTMAS AND HAPPY NEW YEAR! " * 8
+    manager = main.AnimationManager(loop=False, width=main.WIDTH, height=main.HEIGHT)
+    manager.add_animation(main.TextScrollAnimation(text, speed=1))
+    pixels = manager.create_framebuffer()
+    elapsed = run_frames(manager, pixels, frames)
+    print("Scrolling %d characters: %.3f ms/frame" % (len(text), elapsed / frames * 1e3))
+
+
+def benchmark_bitplane(sizes=((16, 10), (64, 40), (256, 160)), frames=200):
+    """
+    Scrolling text drawn through TextScrollAnimation's bit plane (shift
+    the plane, draw the glyphs reaching into the new columns, composite)
+    against drawing every visible glyph with FontBase.draw each frame,
+    and the memory of a plane against a FrameBuffer layer.
+    """
+    print("Grid size   plane ms/frame   glyphs ms/frame   plane bytes   layer bytes")
+    for width, height in sizes:
+        text = "MERRY CHRISTMAS AND HAPPY NEW YEAR! " * (1 + height // 40)
+        anim = main.TextScrollAnimation(text, speed=1, font_size=9, 
+                                        offset=(width // 2 - 4, height))
+        anim.set_geometry(width, height)
+        anim.start()
+        pixels = main.FrameBuffer(width, height)
+        start = time.perf_counter()
+        for _ in range(frames):
+            anim.update(pixels)
+        plane_time = (time.perf_counter() - start) / frames
+        
+        font = anim.font
+        start = time.perf_counter()
+        for frame in range(frames):
+            for i in range(len(anim.chars)):
+                col = anim.offset[1] + anim.starts[i] - frame - anim.offsets[i]
+                if -anim.widths[i] < col < height:
+                    font.draw(pixels, anim.chars[i], row_offset=anim.offset[0],
+                              col_offset=col, color=anim.color)
+        glyph_time = (time.perf_counter() - start) / frames
+        print("%4dx%-4d %14.3f %17.3f %13d %13d"
+              % (width, height, plane_time * 1e3, glyph_time * 1e3,
+                 len(anim.plane.bits), 4 * pixels.num))
+
+
+def benchmark_effects(sizes=((16, 10), (32, 20), (64, 40), (128, 80)), frames=20):
+    """
+    Per-frame cost of the table-driven effects (PlasmaAnimation, 
+    FireAnimation, RippleAnimation) against grid size, next to a plasma
+    computed per pixel with math.sin and math.sqrt.
+    """
+    import math
+    
+    def float_plasma(pixels, t):
+        w = pixels.width
+        cr, cc = w // 2, pixels.height // 2
+        for i in range(pixels.num):
+            row, col = main.i2p(i, w)
+            value = (math.sin(row * 0.4 + t * 0.07) + math.sin(col * 0.4 - t * 0.05)
+                     + math.sin(math.sqrt((row - cr)**2 + (col - cc)**2) * 0.4 + t * 0.12))
+            pixels.buf[i] = int((value + 3) * 42.5) & 0xFF
+    
+    effects = (main.PlasmaAnimation, main.FireAnimation, main.RippleAnimation)
+    print("Grid size   " + "".join("%12s" % cls.__name__[:-9] for cls in effects)
+          + "  float plasma   (ms/frame)")
+    for width, height in sizes:
+        costs = []
+        for cls in effects:
+            manager = main.AnimationManager(loop=False, width=width, height=height)
+            manager.add_animation(cls())
+            pixels = manager.create_framebuffer()
+            costs.append(run_frames(manager, pixels, frames) / frames)
+        pixels = main.FrameBuffer(width, height)
+        start = time.perf_counter()
+        for t in range(frames):
+            float_plasma(pixels, t)
+        costs.append((time.perf_counter() - start) / frames)
+        print("%4dx%-4d " % (width, height) 
+              + "".join("%12.3f" % (cost * 1e3) for cost in costs))
+
+
+def benchmark_governor(mean_ms=90, loops=2):
+    """
+    QualityGovernor on a simulated clock: runs the Christmas show with 
+    its host render times scaled to a mean of mean_ms and counts the 
+    frames that overran their 100 ms slot, with and without the governor
+    (tests/test_governor.py checks the controller on synthetic loads).
+    """
+    class Clock:
+        now = 0
+        def __call__(self):
+            return self.now
+    
+    full = main.QUALITY_FULL
+    
+    # The show: render time of every frame at every level, measured on the
+    # host (fastest of three loops) and scaled to a mean of mean_ms at full
+    # quality
+    period = None
+    costs = []
+    for level in range(full + 1):
+        manager = main.create_xmas_manager()
+        manager.set_quality(level)
+        pixels = manager.create_framebuffer()
+        period = manager.duration + manager.frames_between_loops
+        level_costs = [float("inf")] * period
+        for _ in range(3):
+            for frame in range(period):
+                level_costs[frame] = min(level_costs[frame], 
+                                         run_frames(manager, pixels, 1))
+        costs.append(level_costs)
+    scale = mean_ms * period / sum(costs[full])
+    print("Simulated render time per level: "
+          + ", ".join("%d: mean %.1f ms" % (level, sum(costs[level]) * scale / period)
+                      for level in range(full + 1)))
+    for enabled in (False, True):
+        clock = Clock()
+        manager = main.AnimationManager(loop=False)
+        governor = main.QualityGovernor(manager, clock=clock)
+        level = full
+        missed = 0
+        for frame in range(loops * period):
+            start = clock.now
+            governor.begin()
+            clock.now += int(costs[level][frame % period] * scale)
+            if enabled:
+                level = governor.end()
+            if clock.now - start > 100:
+                missed += 1
+            clock.now = max(clock.now, start + 100)
+        print("Governor %-3s: %3d of %d frames missed their slot"
+              % ("on" if enabled else "off", missed, loops * period))
+        if enabled:
+            governor.report()
+
+
+def benchmark_multi(frames=60, slow_ms=30):
+    """
+    MultiRenderer: a sink that takes slow_ms per frame runs next to a 
+    direct sink, with both queue policies: the time render() takes per 
+    frame shows whether the slow sink stalls the loop.
+    """
+    def record(renderer):
+        manager = main.create_xmas_manager()
+        pixels = manager.create_framebuffer()
+        renderer.start()
+        start = time.perf_counter()
+        for _ in range(frames):
+            pixels.clear(main.DARK_BLUE)
+            manager.update(pixels)
+            renderer.render(pixels)
+        elapsed = time.perf_counter() - start
+        renderer.stop()
+        return elapsed
+    
+    class SlowRenderer(main.RendererBase):
+        # Takes slow_ms per frame, like an encoder on a busy host
+        def render(self, pixels):
+            time.sleep(slow_ms / 1000)
+    
+    class CountingRenderer(main.RendererBase):
+        count = 0
+        def render(self, pixels):
+            self.count += 1
+    
+    for policy in (main.SINK_DROP_OLDEST, main.SINK_BLOCK):
+        multi = main.MultiRenderer()
+        direct = multi.add_sink(CountingRenderer())
+        multi.add_sink(SlowRenderer(), threaded=True, queue_size=4, policy=policy)
+        elapsed = record(multi)
+        print("%-11s %.2f ms/frame in the loop, slow sink took %d ms/frame"
+              % (policy + ":", elapsed * 1e3 / frames, slow_ms))
+        multi.report()
+
+
+def benchmark_power(brightness=8.0, budget_ma=450):
+    """
+    PowerLimiter on a MultiStripRenderer with a fake state machine: runs
+    the Christmas show at a raised brightness and computes the current of
+    every frame from the words sent to the strip, and compares the cost 
+    of the render, which includes kernels.channel_sums, with a rescan of
+    the sums through FrameBuffer.get_word (tests/test_power.py checks
+    the sums and the budget).
+    """
+    
+    def current_ma(words, limiter):
+        total = sum(((w >> 8) & 0xFF) + ((w >> 16) & 0xFF) + (w >> 24) for w in words)
+        return limiter.idle_ma * len(words) + total * limiter.channel_ma / 255
+    
+    manager = main.create_xmas_manager()
+    pixels = manager.create_framebuffer()
+    period = manager.duration + manager.frames_between_loops
+    for budget in (None, budget_ma):
+        strip = main.FakeStateMachine()
+        renderer = main.MultiStripRenderer([(6, 0, pixels.num)], brightness=brightness,
+                                           state_machines=[strip], power_limit_ma=budget)
+        limiter = renderer.limiter or main.PowerLimiter(10**6, brightness, pixels.num)
+        renderer.start()
+        manager.reset()
+        peak = 0
+        limited = 0
+        update_us = 0
+        rescan_us = 0
+        for _ in range(period):
+            pixels.clear(main.DARK_BLUE)
+            manager.update(pixels)
+            start = time.perf_counter()
+            renderer.render(pixels)
+            update_us += (time.perf_counter() - start) * 1e6
+            peak = max(peak, current_ma(strip.frames[-1], limiter))
+            if budget is None:
+                continue
+            if limiter.level < limiter.LEVELS:
+                limited += 1
+            # Rescan through get_word for comparison
+            start = time.perf_counter()
+            sums = [0, 0, 0]
+            for i in range(pixels.num):
+                word = pixels.get_word(i)
+                sums[0] += (word >> 8) & 0xFF
+                sums[1] += (word >> 16) & 0xFF
+                sums[2] += word & 0xFF
+            rescan_us += (time.perf_counter() - start) * 1e6
+        if budget is None:
+            print("No limit:  peak %4.0f mA, render %.0f us/frame" 
+                  % (peak, update_us / period))
+        else:
+            print("%4d mA:   peak %4.0f mA, %d of %d frames dimmed, render %.0f us/frame"
+                  " (get_word rescan of the sums alone: %.0f us)"
+                  % (budget, peak, limited, period, update_us / period, rescan_us / period))
+
+
+BENCHMARKS = {
+    "geometry": benchmark_geometry,
+    "stream": benchmark_stream,
+    "gif": benchmark_gif,
+    "smoothing": benchmark_smoothing,
+    "gif_pipeline": benchmark_gif_pipeline,
+    "frames": benchmark_frames,
+    "raw_stream": benchmark_raw_stream,
+    "culling": benchmark_culling,
+    "compositing": benchmark_compositing,
+    "layer_cache": benchmark_layer_cache,
+    "lookahead": benchmark_lookahead,
+    "dither": benchmark_dither,
+    "rainbow": benchmark_rainbow,
+    "assets": benchmark_assets,
+    "primitives": benchmark_primitives,
+    "text": benchmark_text,
+    "bitplane": benchmark_bitplane,
+    "effects": benchmark_effects,
+    "governor": benchmark_governor,
+    "multi": benchmark_multi,
+    "power": benchmark_power,
+}
+
+if __name__ == "__main__":
+    names = sys.argv[1:] or list(BENCHMARKS)
+    for name in names:
+        print("== %s ==" % name)
+        BENCHMARKS[name]()
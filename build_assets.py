@@ -0,0 +1,72 @@
+# Compile fonts, sprites and math tables into assets.py (host side, CPython).
+#
+# Usage: python build_assets.py [--check]
+#
+# assets.py holds every font, sprite and fastmath table as bytes constants.
+# Frozen into the MicroPython firmware (or precompiled with mpy-cross),
+# bytes constants stay in flash, so they cost no heap and no startup time
+# on the Pico. Rerun this script after changing a font bitmap,
+# draw_xmas_tree or a fastmath table; with --check it only verifies that
+# assets.py is up to date.
+import sys
+
+import fastmath
+import main
+
+OUTPUT_PATH = "assets.py"
+
+FONTS = (main.Font6x6, main.Font7x7, main.Font8x8, main.Font9x9)
+SPRITES = (("TREE_SPRITE", main.draw_xmas_tree),)
+TABLES = (("SIN_TABLE", fastmath.make_sin_table),
+          ("SQRT_TABLE", fastmath.make_sqrt_table))
+
+
+def format_bytes(name, data, per_line=16):
+    """Python source for a bytes constant, split into lines"""
+    lines = ["%s = (" % name]
+    for i in range(0, len(data), per_line):
+        lines.append("    %r" % data[i:i + per_line])
+    lines.append(")")
+    return "\n".join(lines) + "\n"
+
+
+def build():
+    """Source of assets.py"""
+    parts = ["# Generated by build_assets.py, do not edit.\n"]
+    for font in FONTS:
+        name = font.__name__.upper()
+        index, data = main.compile_font(font().size, font.get_bitmap())
+        parts.append("\n# %s: glyph numbers by character code, then glyph data\n"
+                     % font.__name__)
+        parts.append(format_bytes(name + "_INDEX", index))
+        parts.append(format_bytes(name + "_DATA", data))
+    for name, draw in SPRITES:
+        parts.append("\n# %s: row, col, g, r, b per pixel\n" % draw.__name__)
+        parts.append(format_bytes(name, main.compile_sprite(draw)))
+    for name, make in TABLES:
+        parts.append("\n# %s: fastmath.%s\n" % (name, make.__name__))
+        parts.append(format_bytes(name, make()))
+    return "".join(parts)
+
+
+def check(path=OUTPUT_PATH):
+    """True if the file at path is what build() generates"""
+    try:
+        with open(path) as f:
+            current = f.read()
+    except OSError:
+        return False
+    return current == build()
+
+
+if __name__ == "__main__":
+    if "--check" in sys.argv[1:]:
+        if not check():
+            print("%s is out of date, run: python build_assets.py" % OUTPUT_PATH)
+            sys.exit(1)
+        print("%s is up to date." % OUTPUT_PATH)
+    else:
+        source = build()
+        with open(OUTPUT_PATH, "w") as f:
+            f.write(source)
+        print("Wrote %s (%d bytes)." % (OUTPUT_PATH, len(source)))
@@ -0,0 +1,120 @@
+# Integer lookup tables for procedural effects.
+#
+# The RP2040 has no FPU, so math.sin and math.sqrt per pixel and frame
+# are far too slow. The sine and square root tables are frozen into
+# assets.py by build_assets.py, so they are read from flash instead of
+# being computed on every boot (without assets.py, they are computed at
+# import time). Effects precompute per-pixel table indices when the grid size is set,
+# and a frame only adds offsets and looks values up (see PlasmaAnimation,
+# FireAnimation and RippleAnimation in main.py).
+#
+# Angles are in 1/256 turns, so they wrap with & 255.
+import array
+import math
+
+import kernels
+
+try:
+    import assets
+except ImportError:
+    assets = None
+
+ANGLE_STEPS = 256
+SQRT_SIZE = 1024
+
+
+def make_sin_table():
+    """128 + 127*sin(angle) for every angle: bytes, 1..255"""
+    return bytes(128 + round(127 * math.sin(2 * math.pi * a / ANGLE_STEPS))
+                 for a in range(ANGLE_STEPS))
+
+
+def make_sqrt_table():
+    """Integer square root (floor) of 0..SQRT_SIZE-1: bytes"""
+    table = bytearray(SQRT_SIZE)
+    root = 0
+    for n in range(SQRT_SIZE):
+        if (root + 1) * (root + 1) <= n:
+            root += 1
+        table[n] = root
+    return bytes(table)
+
+
+SIN_TABLE = getattr(assets, "SIN_TABLE", None) or make_sin_table()
+SQRT_TABLE = getattr(assets, "SQRT_TABLE", None) or make_sqrt_table()
+
+
+def sin8(angle):
+    """Sine of angle (1/256 turns) as 1..255, 128 = zero"""
+    return SIN_TABLE[angle & 0xFF]
+
+
+def cos8(angle):
+    """Cosine of angle (1/256 turns) as 1..255, 128 = zero"""
+    return SIN_TABLE[(angle + 64) & 0xFF]
+
+
+def isqrt(n):
+    """Integer square root (floor) of 0 <= n < 2**32, without floats"""
+    if n < SQRT_SIZE:
+        return SQRT_TABLE[n]
+    root = 0
+    bit = 1 << 30
+    while bit > n:
+        bit >>= 2
+    while bit:
+        if n >= root + bit:
+            n -= root + bit
+            root = (root >> 1) + bit
+        else:
+            root >>= 1
+        bit >>= 2
+    return root
+
+
+def distance_table(width, height, center, scale=1):
+    """
+    Distance of every pixel to a point, in buffer order.
+
+    Parameters:
+    - width: Grid width (landscape mode)
+    - height: Grid height (landscape mode)
+    - center: (row, col) in portrait mode
+    - scale: Factor applied before rounding down, e.g. 256 // wavelength
+
+    Returns:
+    - array("H") with floor(distance * scale) per buffer index (modulo
+      65536, the effects only use the lowest bits)
+    """
+    table = array.array("H", [0] * (width * height))
+    for col in range(height):
+        dc = col - center[1]
+        for row in range(width):
+            dr = row - center[0]
+            distance = isqrt((dr * dr + dc * dc) * scale * scale)
+            table[col * width + (width - 1 - row)] = distance & 0xFFFF
+    return table
+
+
+def make_gradient(stops, size=256):
+    """
+    Build a color table that runs linearly through the given colors.
+
+    Parameters:
+    - stops: Sequence of at least two (r, g, b) colors, first to last
+    - size: Number of entries
+
+    Returns:
+    - array("I") of packed colors
+    """
+    table = array.array("I", [0] * size)
+    segments = len(stops) - 1
+    for k in range(size):
+        t = k * segments * 256 // (size - 1)  # Position in 1/256 segments
+        s = min(t >> 8, segments - 1)
+        f = t - (s << 8)
+        a = stops[s]
+        b = stops[s + 1]
+        table[k] = kernels.pack_color(
+            tuple(a[c] + ((b[c] - a[c]) * f >> 8) for c in range(3)))
+    return table
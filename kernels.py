@@ -0,0 +1,1088 @@
+# Hot inner loops of the LED pipeline.
+#
+# Every kernel exists twice: a pure-Python version (suffix _py) that runs
+# everywhere, and a viper-compiled version (suffix _viper) that is only
+# defined on the Pico. The public names (fill, pack_grb, expand_grb,
+# dither_grb, gather, blend, blit_glyph, fill_runs, copy_runs,
+# copy_runs_masked, shift_bits, composite_bits, plasma, fire, fill_sphere,
+# channel_sums) are bound to the fastest variant available on the
+# platform. Both variants must leave identical buffers; check() compares
+# them on the device, and tests/test_kernels.py runs the viper source
+# against the Python versions on the host.
+import array
+import sys
+
+MICROPYTHON = sys.platform == "rp2"
+
+if MICROPYTHON:
+    import micropython
+    from micropython import const
+    from time import ticks_us, ticks_diff
+else:
+    from time import perf_counter_ns
+    def const(value):
+        return value
+    def ticks_us():
+        return perf_counter_ns() // 1000
+    def ticks_diff(end, start):
+        return end - start
+
+# Marker for pixels that were not drawn in the current frame. Colors only
+# use the lower 24 bits, so bit 24 never collides with a real color.
+TRANSPARENT = const(0x1000000)
+
+# Value for "no background color" in blit_glyph parameters.
+NO_COLOR = const(-1)
+
+# Blend modes of blend(), the op parameter is mode | (alpha << 8)
+BLEND_COPY = const(0)     # dst = src, including TRANSPARENT entries
+BLEND_REPLACE = const(1)  # Drawn src pixels replace dst
+BLEND_ADD = const(2)      # Drawn src pixels are added per channel (saturating)
+BLEND_ALPHA = const(3)    # Drawn src pixels are mixed in with alpha/256
+BLEND_MASK = const(4)     # dst is only kept where src is drawn
+
+# Fractional bits of the channel levels of expand_grb and dither_grb, and
+# the order in which a pixel steps through the 16 dither thresholds
+# (bit-reversed, so that the on-subframes are spread out evenly)
+DITHER_BITS = const(4)
+DITHER_ORDER = (0, 8, 4, 12, 2, 10, 6, 14, 1, 9, 5, 13, 3, 11, 7, 15)
+
+################################################################################
+# region Color packing
+################################################################################
+def pack_color(color):
+    """Pack an (r, g, b) tuple into a GRB word (same layout as NeoPixel.ar)"""
+    return (color[1] << 16) | (color[0] << 8) | color[2]
+
+def unpack_color(word):
+    """Unpack a GRB word into an (r, g, b) tuple"""
+    return ((word >> 8) & 0xFF, (word >> 16) & 0xFF, word & 0xFF)
+
+def make_channel_table(brightness, shift=0, table=None):
+    """
+    Build the channel lookup table used by pack_grb.
+
+    Entry 256*k + v holds channel value v dimmed by brightness and moved
+    to its position in the output word: red (k=0) at bits 16-23, green
+    (k=1) at bits 8-15 and blue (k=2) at bits 0-7, everything shifted
+    left by shift. Use shift=8 for words that go to the PIO FIFO as-is
+    (DMA or StateMachine.put without shift).
+
+    Parameters:
+    - brightness: Brightness factor applied to every channel
+    - shift: Extra left shift of the output words
+    - table: Optional array("I") of length 768 to fill in place
+
+    Returns:
+    - array("I") with 768 entries
+    """
+    if table is None:
+        table = array.array("I", [0] * 768)
+    for v in range(256):
+        dimmed = min(int(v * brightness), 255)
+        table[v] = dimmed << (16 + shift)
+        table[256 + v] = dimmed << (8 + shift)
+        table[512 + v] = dimmed << shift
+    return table
+
+def make_dither_table(brightness, table=None):
+    """
+    Build the channel lookup table used by expand_grb.
+    
+    Like make_channel_table, but entry 256*k + v holds channel value v 
+    dimmed by brightness as a fixed-point level with DITHER_BITS 
+    fractional bits (at most 255 << DITHER_BITS), so that dither_grb can
+    show the fraction over several subframes.
+    
+    Parameters:
+    - brightness: Brightness factor applied to every channel
+    - table: Optional array("H") of length 768 to fill in place
+    
+    Returns:
+    - array("H") with 768 entries
+    """
+    if table is None:
+        table = array.array("H", [0] * 768)
+    top = 255 << DITHER_BITS
+    for v in range(256):
+        level = min(int(v * brightness * (1 << DITHER_BITS) + 0.5), top)
+        table[v] = level
+        table[256 + v] = level
+        table[512 + v] = level
+    return table
+
+def make_wheel_table(size=32, level=31):
+    """
+    Build a color wheel of packed GRB words for gather.
+    
+    The colors go from red to green to blue and back to red in size 
+    steps, with linear ramps between 0 and level in every third.
+    
+    Parameters:
+    - size: Number of colors (a power of two for gather)
+    - level: Maximum channel value
+    
+    Returns:
+    - array("I") with size entries
+    """
+    table = array.array("I", [0] * size)
+    for k in range(size):
+        t = (k * 3 * level) // size
+        third = t // level
+        up = t - third * level
+        down = level - up
+        if third == 0:
+            color = (down, up, 0)
+        elif third == 1:
+            color = (0, down, up)
+        else:
+            color = (up, 0, down)
+        table[k] = pack_color(color)
+    return table
+
+
+################################################################################
+# region Pure-Python kernels
+################################################################################
+def fill_py(buf, value, n):
+    """
+    Set the first n words of buf to value.
+
+    Parameters:
+    - buf: array("I") to fill
+    - value: Word to write
+    - n: Number of words to write
+    """
+    if n <= 0:
+        return
+    # Set one word, then double the filled part with slice copies
+    buf[0] = value
+    mv = memoryview(buf)
+    done = 1
+    while done < n:
+        step = min(done, n - done)
+        mv[done:done + step] = mv[0:step]
+        done += step
+
+def pack_grb_py(src, dst, table, bg):
+    """
+    Convert GRB words into the word stream expected by the PIO program.
+
+    Each channel is dimmed and moved to its output position through
+    table (see make_channel_table), which swaps the red and green bytes.
+    TRANSPARENT source words are replaced by bg before conversion.
+
+    Parameters:
+    - src: array("I") (or memoryview of one) with GRB words, at least
+           len(dst) entries
+    - dst: array("I") receiving the output words
+    - table: array("I") with 768 entries from make_channel_table
+    - bg: GRB word used for TRANSPARENT pixels
+    """
+    for i in range(len(dst)):
+        c = src[i]
+        if c == TRANSPARENT:
+            c = bg
+        dst[i] = (table[(c >> 8) & 0xFF]
+                  | table[256 + ((c >> 16) & 0xFF)]
+                  | table[512 + (c & 0xFF)])
+
+def expand_grb_py(src, dst, table, bg):
+    """
+    Convert GRB words into fixed-point channel levels for dither_grb.
+    
+    Parameters:
+    - src: array("I") with GRB words, at least len(dst) // 3 entries
+    - dst: array("H") (or memoryview of one) receiving the levels g, r, b
+           of every pixel (3 entries per pixel)
+    - table: array("H") with 768 entries from make_dither_table
+    - bg: GRB word used for TRANSPARENT pixels
+    """
+    for i in range(len(dst) // 3):
+        c = src[i]
+        if c == TRANSPARENT:
+            c = bg
+        dst[3 * i] = table[256 + ((c >> 16) & 0xFF)]
+        dst[3 * i + 1] = table[(c >> 8) & 0xFF]
+        dst[3 * i + 2] = table[512 + (c & 0xFF)]
+
+def dither_grb_py(dst, levels, params):
+    """
+    Compute one subframe of temporally dithered output words.
+    
+    Every channel level is mixed between two frames of levels and 
+    rounded with the pixel's current dither threshold, so over 16 
+    subframes the LED shows the level including its fraction. The 
+    threshold of pixel i is thresholds[(phase + 7 * i) % 16], so that
+    neighbouring pixels do not switch at the same time.
+    
+    Parameters:
+    - dst: array("I") receiving the output words (g, r, b, then shifted)
+    - levels: array("H") with both frames of levels from expand_grb
+    - params: array("i") with (mix, phase, shift, first, second,
+              thresholds[16]): mix 0-256 is the weight of the second 
+              frame, first and second are the offsets of the two frames
+              in levels, shift is the extra left shift of the words
+    """
+    mix = params[0]
+    phase = params[1]
+    shift = params[2]
+    a = params[3]
+    b = params[4]
+    keep = 256 - mix
+    for i in range(len(dst)):
+        t = params[5 + ((phase + 7 * i) & 15)]
+        g = (((levels[a] * keep + levels[b] * mix) >> 8) + t) >> DITHER_BITS
+        r = (((levels[a + 1] * keep + levels[b + 1] * mix) >> 8) + t) >> DITHER_BITS
+        bl = (((levels[a + 2] * keep + levels[b + 2] * mix) >> 8) + t) >> DITHER_BITS
+        dst[i] = ((g << 16) | (r << 8) | bl) << shift
+        a += 3
+        b += 3
+
+def gather_py(dst, indices, table, offset):
+    """
+    Look up a color per pixel in a rotated table.
+    
+    Parameters:
+    - dst: array("I") receiving table[(indices[i] + offset) % len(table)]
+    - indices: array("H") with one table index per pixel
+    - table: array("I") whose length is a power of two
+    - offset: Rotation of the table
+    """
+    mask = len(table) - 1
+    for i in range(len(dst)):
+        dst[i] = table[(indices[i] + offset) & mask]
+
+def blend_py(dst, src, op, bg):
+    """
+    Composite a layer onto a pixel buffer.
+    
+    For BLEND_ADD and BLEND_ALPHA, TRANSPARENT dst pixels count as bg.
+    
+    Parameters:
+    - dst: array("I") pixel buffer, modified in place
+    - src: array("I") layer of the same length
+    - op: Blend mode (BLEND_*) | (alpha << 8), alpha 0-256 for BLEND_ALPHA
+    - bg: GRB word used for TRANSPARENT dst pixels
+    """
+    mode = op & 0xFF
+    alpha = op >> 8
+    for i in range(len(dst)):
+        s = src[i]
+        if mode == BLEND_COPY:
+            dst[i] = s
+            continue
+        if mode == BLEND_MASK:
+            if s == TRANSPARENT:
+                dst[i] = TRANSPARENT
+            continue
+        if s == TRANSPARENT:
+            continue
+        if mode == BLEND_REPLACE:
+            dst[i] = s
+            continue
+        d = dst[i]
+        if d == TRANSPARENT:
+            d = bg
+        if mode == BLEND_ADD:
+            g = ((d >> 16) & 0xFF) + ((s >> 16) & 0xFF)
+            r = ((d >> 8) & 0xFF) + ((s >> 8) & 0xFF)
+            b = (d & 0xFF) + (s & 0xFF)
+        else:
+            g = (((s >> 16) & 0xFF) * alpha + ((d >> 16) & 0xFF) * (256 - alpha)) >> 8
+            r = (((s >> 8) & 0xFF) * alpha + ((d >> 8) & 0xFF) * (256 - alpha)) >> 8
+            b = ((s & 0xFF) * alpha + (d & 0xFF) * (256 - alpha)) >> 8
+        if g > 255:
+            g = 255
+        if r > 255:
+            r = 255
+        if b > 255:
+            b = 255
+        dst[i] = (g << 16) | (r << 8) | b
+
+def blit_glyph_py(buf, glyphs, params):
+    """
+    Draw the visible part of a glyph bitmap into a flat pixel buffer.
+
+    The caller clips the glyph box to the buffer (see FontBase.draw), the
+    kernel only visits rows first_row..last_row and columns 
+    first_col..last_col and does no bounds checks.
+
+    Parameters:
+    - buf: array("I") pixel buffer (portrait coordinates, see pixel2index)
+    - glyphs: Font data (see main.compile_font), every glyph row is stored
+              as two bytes, big-endian (MSB = leftmost column)
+    - params: array("i") with (size, first_col, last_col, row_offset,
+              col_offset, color, bg_color, width, rows, first_row, 
+              last_row), bg_color is NO_COLOR for a transparent glyph 
+              background and rows is the position of the glyph's first
+              row in glyphs; rows and columns are relative to the glyph
+    """
+    size = params[0]
+    first_col = params[1]
+    last_col = params[2]
+    color = params[5]
+    bg = params[6]
+    width = params[7]
+    pos = params[8] + 2 * params[9]
+    start = (params[4] + first_col) * width + width - 1 - params[3]
+    for row in range(params[9], params[10] + 1):
+        bits = (glyphs[pos] << 8) | glyphs[pos + 1]
+        pos += 2
+        idx = start - row
+        for col in range(first_col, last_col + 1):
+            if (bits >> (size - 1 - col)) & 1:
+                buf[idx] = color
+            elif bg >= 0:
+                buf[idx] = bg
+            idx += width
+
+def fill_runs_py(buf, value, params):
+    """
+    Fill equally spaced runs of words, e.g. the columns of a rectangle.
+
+    Parameters:
+    - buf: array("I") pixel buffer
+    - value: Word to write
+    - params: array("i") with (first, count, stride, runs): runs runs of
+              count words, the first starting at index first, the next
+              ones stride words apart (stride >= count)
+    """
+    first = params[0]
+    count = params[1]
+    stride = params[2]
+    runs = params[3]
+    if count == 1:
+        for k in range(runs):
+            buf[first + k * stride] = value
+        return
+    # Fill the first run, then copy it to the others, one slice per run
+    for i in range(first, first + count):
+        buf[i] = value
+    mv = memoryview(buf)
+    run = mv[first:first + count]
+    for k in range(1, runs):
+        start = first + k * stride
+        mv[start:start + count] = run
+
+def copy_runs_py(dst, src, params):
+    """
+    Copy equally spaced runs of words from src to dst (a rectangle).
+
+    Parameters:
+    - dst: array("I") pixel buffer to copy into
+    - src: array("I") pixel buffer to copy from
+    - params: array("i") with (dst_first, src_first, count, runs,
+              dst_stride, src_stride)
+    """
+    d = params[0]
+    s = params[1]
+    count = params[2]
+    dst_mv = memoryview(dst)
+    src_mv = memoryview(src)
+    for _ in range(params[3]):
+        dst_mv[d:d + count] = src_mv[s:s + count]
+        d += params[4]
+        s += params[5]
+
+def copy_runs_masked_py(dst, src, mask, params):
+    """
+    Like copy_runs, but only copy the words whose mask byte is non-zero.
+
+    Parameters:
+    - dst: array("I") pixel buffer to copy into
+    - src: array("I") pixel buffer to copy from
+    - mask: Bytes with one entry per src word (same indices as src)
+    - params: array("i") as for copy_runs
+    """
+    d = params[0]
+    s = params[1]
+    count = params[2]
+    for _ in range(params[3]):
+        for i in range(count):
+            if mask[s + i]:
+                dst[d + i] = src[s + i]
+        d += params[4]
+        s += params[5]
+
+def shift_bits_py(bits, params):
+    """
+    Shift every row of a bit plane left, clearing the bits shifted in.
+
+    Parameters:
+    - bits: bytearray with the rows of the plane (MSB first)
+    - params: array("i") with (rows, stride, cols, last_mask, shift, 
+              color, first_row, last_row), stride is the number of bytes
+              per row, last_mask clears the padding bits of the last byte
+              of a row; only rows first_row..last_row are processed
+    """
+    stride = params[1]
+    last_mask = params[3]
+    skip = params[4] >> 3
+    s = params[4] & 7
+    base = params[6] * stride
+    for _ in range(params[6], params[7] + 1):
+        # Ascending, so every byte is read before it is overwritten
+        for k in range(stride):
+            i = base + k + skip
+            hi = bits[i] if k + skip < stride else 0
+            lo = bits[i + 1] if k + skip + 1 < stride else 0
+            bits[base + k] = ((hi << s) | (lo >> (8 - s))) & 0xFF
+        bits[base + stride - 1] &= last_mask
+        base += stride
+
+def composite_bits_py(buf, bits, params):
+    """
+    Draw the set pixels of a bit plane in one color.
+
+    Parameters:
+    - buf: array("I") pixel buffer (portrait coordinates, see pixel2index)
+    - bits: bytearray with the rows of the plane (MSB first)
+    - params: array("i") as for shift_bits, rows and cols must match the
+              buffer and color is the packed color to draw
+    """
+    rows = params[0]
+    stride = params[1]
+    cols = params[2]
+    color = params[5]
+    base = params[6] * stride
+    for row in range(params[6], params[7] + 1):
+        flip = rows - 1 - row
+        for k in range(stride):
+            byte = bits[base + k]
+            col = 8 * k
+            while byte:
+                if byte & 0x80 and col < cols:
+                    buf[col * rows + flip] = color
+                byte = (byte << 1) & 0xFF
+                col += 1
+        base += stride
+
+def plasma_py(buf, indices, tables, params):
+    """
+    Sum k sine waves per pixel and look the sum up in a color table.
+
+    Parameters:
+    - buf: array("I") pixel buffer
+    - indices: array("H") with k planes of len(buf) angles (1/256 turns)
+    - tables: array("I") with the sine table (256 entries, see 
+              fastmath.SIN_TABLE) followed by 256 colors
+    - params: array("i") with (k, offset_0, ..., offset_k-1), offset_j is
+              added to the angles of plane j
+    """
+    n = len(buf)
+    k = params[0]
+    for i in range(n):
+        value = 0
+        pos = i
+        for j in range(k):
+            value += tables[(indices[pos] + params[1 + j]) & 0xFF]
+            pos += n
+        buf[i] = tables[256 + (value & 0xFF)]
+
+def fire_py(buf, heat, palette, params):
+    """
+    Let the heat of a fire rise by one row and draw it.
+
+    Every pixel above the bottom row gets the average heat of the three 
+    pixels below it and the one two rows below, minus the cooling. The 
+    bottom row is left as is (the caller seeds it).
+
+    Parameters:
+    - buf: array("I") pixel buffer (portrait coordinates, see pixel2index)
+    - heat: bytearray with one heat value (0-255) per pixel, same indices
+    - palette: array("I") with 256 colors by heat
+    - params: array("i") with (width, height, cooling)
+    """
+    width = params[0]
+    height = params[1]
+    cooling = params[2]
+    # Top row first: the rows below still hold the previous frame
+    for row in range(width - 1):
+        flip = width - 1 - row
+        below2 = 2 if row < width - 2 else 1
+        for col in range(height):
+            idx = col * width + flip
+            left = idx - width if col > 0 else idx
+            right = idx + width if col < height - 1 else idx
+            value = ((heat[left - 1] + heat[idx - 1] + heat[right - 1] 
+                      + heat[idx - below2]) >> 2) - cooling
+            heat[idx] = value if value > 0 else 0
+    for i in range(len(buf)):
+        buf[i] = palette[heat[i]]
+
+def fill_sphere_py(buf, params, colors):
+    """
+    Fill a disc with concentric color rings into a flat pixel buffer.
+
+    All distances are compared squared, so the kernel only needs integer
+    arithmetic. Pixels with squared distance d2 <= radius2 are drawn with
+    colors[k], where k is the first ring with d2 < ring[k] (4 if none).
+    With a block size above 1 the bounding box is drawn in square blocks,
+    each with the color of its top left pixel: coarser rings for a
+    fraction of the distance computations.
+
+    Parameters:
+    - buf: array("I") pixel buffer (portrait coordinates, see pixel2index)
+    - params: array("i") with (width, row_min, row_max, col_min, col_max,
+              center_row, center_col, ring0, ring1, ring2, ring3, radius2,
+              block), row/col bounds are inclusive and already clipped to 
+              the grid
+    - colors: array("I") with five GRB words, innermost first
+    """
+    width = params[0]
+    row_max = params[2]
+    col_max = params[4]
+    center_row = params[5]
+    center_col = params[6]
+    ring0 = params[7]
+    ring1 = params[8]
+    ring2 = params[9]
+    ring3 = params[10]
+    radius2 = params[11]
+    block = params[12]
+    for row in range(params[1], row_max + 1, block):
+        dr2 = (row - center_row) * (row - center_row)
+        row_end = min(row + block, row_max + 1)
+        for col in range(params[3], col_max + 1, block):
+            d2 = dr2 + (col - center_col) * (col - center_col)
+            if d2 > radius2:
+                continue
+            if d2 < ring0:
+                k = 0
+            elif d2 < ring1:
+                k = 1
+            elif d2 < ring2:
+                k = 2
+            elif d2 < ring3:
+                k = 3
+            else:
+                k = 4
+            color = colors[k]
+            for c in range(col, min(col + block, col_max + 1)):
+                for r in range(row, row_end):
+                    buf[c * width + width - 1 - r] = color
+
+
+def channel_sums_py(src, sums, bg):
+    """
+    Sum the red, green and blue channels of a frame.
+
+    Parameters:
+    - src: array("I") with GRB words
+    - sums: array("i") that receives the red, green and blue sums
+    - bg: GRB word used for TRANSPARENT pixels
+    """
+    r = g = b = 0
+    for i in range(len(src)):
+        c = src[i]
+        if c == TRANSPARENT:
+            c = bg
+        r += (c >> 8) & 0xFF
+        g += (c >> 16) & 0xFF
+        b += c & 0xFF
+    sums[0] = r
+    sums[1] = g
+    sums[2] = b
+
+
+################################################################################
+# region Viper kernels (MicroPython only)
+################################################################################
+if MICROPYTHON:
+    @micropython.viper
+    def fill_viper(buf, value: int, n: int):
+        p = ptr32(buf)
+        for i in range(n):
+            p[i] = value
+
+    @micropython.viper
+    def pack_grb_viper(src, dst, table, bg: int):
+        s = ptr32(src)
+        d = ptr32(dst)
+        t = ptr32(table)
+        n = int(len(dst))
+        for i in range(n):
+            c = s[i]
+            if c == TRANSPARENT:
+                c = bg
+            d[i] = t[(c >> 8) & 0xFF] | t[256 + ((c >> 16) & 0xFF)] | t[512 + (c & 0xFF)]
+
+    @micropython.viper
+    def expand_grb_viper(src, dst, table, bg: int):
+        s = ptr32(src)
+        d = ptr16(dst)
+        t = ptr16(table)
+        n = int(len(dst)) // 3
+        for i in range(n):
+            c = s[i]
+            if c == TRANSPARENT:
+                c = bg
+            d[3 * i] = t[256 + ((c >> 16) & 0xFF)]
+            d[3 * i + 1] = t[(c >> 8) & 0xFF]
+            d[3 * i + 2] = t[512 + (c & 0xFF)]
+
+    @micropython.viper
+    def dither_grb_viper(dst, levels, params):
+        d = ptr32(dst)
+        v = ptr16(levels)
+        p = ptr32(params)
+        mix = p[0]
+        phase = p[1]
+        shift = p[2]
+        a = p[3]
+        b = p[4]
+        keep = 256 - mix
+        n = int(len(dst))
+        for i in range(n):
+            t = p[5 + ((phase + 7 * i) & 15)]
+            g = (((v[a] * keep + v[b] * mix) >> 8) + t) >> DITHER_BITS
+            r = (((v[a + 1] * keep + v[b + 1] * mix) >> 8) + t) >> DITHER_BITS
+            bl = (((v[a + 2] * keep + v[b + 2] * mix) >> 8) + t) >> DITHER_BITS
+            d[i] = ((g << 16) | (r << 8) | bl) << shift
+            a += 3
+            b += 3
+
+    @micropython.viper
+    def gather_viper(dst, indices, table, offset: int):
+        d = ptr32(dst)
+        x = ptr16(indices)
+        t = ptr32(table)
+        mask = int(len(table)) - 1
+        n = int(len(dst))
+        for i in range(n):
+            d[i] = t[(x[i] + offset) & mask]
+
+    @micropython.viper
+    def blend_viper(dst, src, op: int, bg: int):
+        d = ptr32(dst)
+        s = ptr32(src)
+        n = int(len(dst))
+        mode = op & 0xFF
+        alpha = op >> 8
+        if mode == BLEND_COPY:
+            for i in range(n):
+                d[i] = s[i]
+            return
+        for i in range(n):
+            c = s[i]
+            if mode == BLEND_MASK:
+                if c == TRANSPARENT:
+                    d[i] = TRANSPARENT
+                continue
+            if c == TRANSPARENT:
+                continue
+            if mode == BLEND_REPLACE:
+                d[i] = c
+                continue
+            e = d[i]
+            if e == TRANSPARENT:
+                e = bg
+            if mode == BLEND_ADD:
+                g = ((e >> 16) & 0xFF) + ((c >> 16) & 0xFF)
+                r = ((e >> 8) & 0xFF) + ((c >> 8) & 0xFF)
+                b = (e & 0xFF) + (c & 0xFF)
+            else:
+                g = (((c >> 16) & 0xFF) * alpha + ((e >> 16) & 0xFF) * (256 - alpha)) >> 8
+                r = (((c >> 8) & 0xFF) * alpha + ((e >> 8) & 0xFF) * (256 - alpha)) >> 8
+                b = ((c & 0xFF) * alpha + (e & 0xFF) * (256 - alpha)) >> 8
+            if g > 255:
+                g = 255
+            if r > 255:
+                r = 255
+            if b > 255:
+                b = 255
+            d[i] = (g << 16) | (r << 8) | b
+
+    @micropython.viper
+    def blit_glyph_viper(buf, glyphs, params):
+        b = ptr32(buf)
+        g = ptr8(glyphs)
+        p = ptr32(params)
+        size = p[0]
+        first_col = p[1]
+        last_col = p[2]
+        color = p[5]
+        bg = p[6]
+        width = p[7]
+        pos = p[8] + 2 * p[9]
+        start = (p[4] + first_col) * width + width - 1 - p[3]
+        for row in range(p[9], p[10] + 1):
+            bits = (g[pos] << 8) | g[pos + 1]
+            pos += 2
+            idx = start - row
+            for col in range(first_col, last_col + 1):
+                if (bits >> (size - 1 - col)) & 1:
+                    b[idx] = color
+                elif bg >= 0:
+                    b[idx] = bg
+                idx += width
+
+    @micropython.viper
+    def fill_runs_viper(buf, value: int, params):
+        b = ptr32(buf)
+        p = ptr32(params)
+        start = p[0]
+        count = p[1]
+        stride = p[2]
+        for _ in range(p[3]):
+            for i in range(start, start + count):
+                b[i] = value
+            start += stride
+
+    @micropython.viper
+    def copy_runs_viper(dst, src, params):
+        d = ptr32(dst)
+        s = ptr32(src)
+        p = ptr32(params)
+        di = p[0]
+        si = p[1]
+        count = p[2]
+        for _ in range(p[3]):
+            for i in range(count):
+                d[di + i] = s[si + i]
+            di += p[4]
+            si += p[5]
+
+    @micropython.viper
+    def copy_runs_masked_viper(dst, src, mask, params):
+        d = ptr32(dst)
+        s = ptr32(src)
+        m = ptr8(mask)
+        p = ptr32(params)
+        di = p[0]
+        si = p[1]
+        count = p[2]
+        for _ in range(p[3]):
+            for i in range(count):
+                if m[si + i]:
+                    d[di + i] = s[si + i]
+            di += p[4]
+            si += p[5]
+
+    @micropython.viper
+    def shift_bits_viper(bits, params):
+        b = ptr8(bits)
+        p = ptr32(params)
+        stride = p[1]
+        last_mask = p[3]
+        skip = p[4] >> 3
+        s = p[4] & 7
+        base = p[6] * stride
+        for _ in range(p[6], p[7] + 1):
+            for k in range(stride):
+                i = base + k + skip
+                hi = 0
+                lo = 0
+                if k + skip < stride:
+                    hi = b[i]
+                if k + skip + 1 < stride:
+                    lo = b[i + 1]
+                b[base + k] = ((hi << s) | (lo >> (8 - s))) & 0xFF
+            b[base + stride - 1] = b[base + stride - 1] & last_mask
+            base += stride
+
+    @micropython.viper
+    def composite_bits_viper(buf, bits, params):
+        d = ptr32(buf)
+        b = ptr8(bits)
+        p = ptr32(params)
+        rows = p[0]
+        stride = p[1]
+        cols = p[2]
+        color = p[5]
+        base = p[6] * stride
+        for row in range(p[6], p[7] + 1):
+            flip = rows - 1 - row
+            for k in range(stride):
+                byte = b[base + k]
+                col = 8 * k
+                while byte:
+                    if (byte & 0x80) and col < cols:
+                        d[col * rows + flip] = color
+                    byte = (byte << 1) & 0xFF
+                    col += 1
+            base += stride
+
+    @micropython.viper
+    def plasma_viper(buf, indices, tables, params):
+        b = ptr32(buf)
+        x = ptr16(indices)
+        t = ptr32(tables)
+        p = ptr32(params)
+        n = int(len(buf))
+        k = p[0]
+        for i in range(n):
+            value = 0
+            pos = i
+            for j in range(k):
+                value += t[(x[pos] + p[1 + j]) & 0xFF]
+                pos += n
+            b[i] = t[256 + (value & 0xFF)]
+
+    @micropython.viper
+    def fire_viper(buf, heat, palette, params):
+        b = ptr32(buf)
+        h = ptr8(heat)
+        c = ptr32(palette)
+        p = ptr32(params)
+        width = p[0]
+        height = p[1]
+        cooling = p[2]
+        for row in range(width - 1):
+            flip = width - 1 - row
+            below2 = 1
+            if row < width - 2:
+                below2 = 2
+            for col in range(height):
+                idx = col * width + flip
+                left = idx
+                right = idx
+                if col > 0:
+                    left = idx - width
+                if col < height - 1:
+                    right = idx + width
+                value = ((h[left - 1] + h[idx - 1] + h[right - 1] 
+                          + h[idx - below2]) >> 2) - cooling
+                if value < 0:
+                    value = 0
+                h[idx] = value
+        for i in range(int(len(buf))):
+            b[i] = c[h[i]]
+
+    @micropython.viper
+    def fill_sphere_viper(buf, params, colors):
+        b = ptr32(buf)
+        p = ptr32(params)
+        c = ptr32(colors)
+        width = p[0]
+        row_max = p[2]
+        col_max = p[4]
+        center_row = p[5]
+        center_col = p[6]
+        ring0 = p[7]
+        ring1 = p[8]
+        ring2 = p[9]
+        ring3 = p[10]
+        radius2 = p[11]
+        block = p[12]
+        row = p[1]
+        while row <= row_max:
+            dr2 = (row - center_row) * (row - center_row)
+            row_end = row + block
+            if row_end > row_max + 1:
+                row_end = row_max + 1
+            col = p[3]
+            while col <= col_max:
+                d2 = dr2 + (col - center_col) * (col - center_col)
+                if d2 <= radius2:
+                    if d2 < ring0:
+                        k = 0
+                    elif d2 < ring1:
+                        k = 1
+                    elif d2 < ring2:
+                        k = 2
+                    elif d2 < ring3:
+                        k = 3
+                    else:
+                        k = 4
+                    color = c[k]
+                    col_end = col + block
+                    if col_end > col_max + 1:
+                        col_end = col_max + 1
+                    for cc in range(col, col_end):
+                        for r in range(row, row_end):
+                            b[cc * width + width - 1 - r] = color
+                col += block
+            row += block
+
+    @micropython.viper
+    def channel_sums_viper(src, sums, bg: int):
+        s = ptr32(src)
+        t = ptr32(sums)
+        n = int(len(src))
+        r = 0
+        g = 0
+        b = 0
+        for i in range(n):
+            c = s[i]
+            if c == TRANSPARENT:
+                c = bg
+            r += (c >> 8) & 0xFF
+            g += (c >> 16) & 0xFF
+            b += c & 0xFF
+        t[0] = r
+        t[1] = g
+        t[2] = b
+
+    fill = fill_viper
+    pack_grb = pack_grb_viper
+    blend = blend_viper
+    gather = gather_viper
+    expand_grb = expand_grb_viper
+    dither_grb = dither_grb_viper
+    blit_glyph = blit_glyph_viper
+    fill_runs = fill_runs_viper
+    copy_runs = copy_runs_viper
+    copy_runs_masked = copy_runs_masked_viper
+    shift_bits = shift_bits_viper
+    composite_bits = composite_bits_viper
+    plasma = plasma_viper
+    fire = fire_viper
+    fill_sphere = fill_sphere_viper
+    channel_sums = channel_sums_viper
+else:
+    fill = fill_py
+    pack_grb = pack_grb_py
+    blend = blend_py
+    gather = gather_py
+    expand_grb = expand_grb_py
+    dither_grb = dither_grb_py
+    blit_glyph = blit_glyph_py
+    fill_runs = fill_runs_py
+    copy_runs = copy_runs_py
+    copy_runs_masked = copy_runs_masked_py
+    shift_bits = shift_bits_py
+    composite_bits = composite_bits_py
+    plasma = plasma_py
+    fire = fire_py
+    fill_sphere = fill_sphere_py
+    channel_sums = channel_sums_py
+
+
+################################################################################
+# region Micro-benchmark
+################################################################################
+def _time_us(func, args, repeat):
+    start = ticks_us()
+    for _ in range(repeat):
+        func(*args)
+    return ticks_diff(ticks_us(), start)
+
+def _cases(num=160):
+    """
+    Test inputs of every kernel: (name, python kernel, public kernel, 
+    make_args), make_args() returns fresh arguments, the buffers written 
+    by the kernel included.
+    """
+    width = 16
+    table = make_channel_table(1.8)
+    src = array.array("I", [(i * 0x010203) & 0xFFFFFF for i in range(num)])
+    for i in range(0, num, 7):
+        src[i] = TRANSPARENT
+    glyph = bytearray(2)  # Glyph rows after a 2-byte header, as in a font
+    for row in (0b001111000, 0b011001100, 0b011001100, 0b011001100,
+                0b011111100, 0b011001100, 0b011001100, 0b011001100, 0):
+        glyph += bytes((row >> 8, row & 0xFF))
+    glyph_params = array.array("i", [9, 1, 7, 2, 1, 0x000505, 0x000002, width, 2, 0, 8])
+    sphere_params = array.array("i", [width, 1, 13, 0, 9, 7, 4,
+                                      2, 4, 13, 24, 36, 1])
+    coarse_params = array.array("i", sphere_params)
+    coarse_params[12] = 2
+    sphere_colors = array.array("I", [0x000002, 0x040407, 0x080800,
+                                      0x050500, 0x020500])
+    dither_table = make_dither_table(1.8)
+    levels = array.array("H", [0] * (6 * num))
+    expand_grb_py(src, memoryview(levels)[0:3 * num], dither_table, 0x000002)
+    expand_grb_py(src[1:] + src[:1], memoryview(levels)[3 * num:], dither_table, 0x000002)
+    dither_params = array.array("i", [96, 5, 8, 0, 3 * num] + list(DITHER_ORDER))
+    wheel = make_wheel_table(32, 31)
+    wheel_indices = array.array("H", [(i * 256 // num) & 31 for i in range(num)])
+    layer = array.array("I", [TRANSPARENT] * num)
+    for i in range(0, num, 3):
+        layer[i] = (i * 0x030201) & 0xFFFFFF
+
+    rect_params = array.array("i", [2 * width + 3, 8, width, 6])
+    copy_params = array.array("i", [width + 2, 3 * width + 1, 10, 5, width, width])
+    mask = bytes(i % 3 for i in range(num))
+    plasma_indices = array.array("H", [(i * 7) & 0xFFFF for i in range(3 * num)])
+    plasma_tables = array.array("I", [(k * 0x010101) & 0xFFFFFF for k in range(512)])
+    plasma_params = array.array("i", [3, 5, 17, 200])
+    heat = bytearray((i * 97) & 0xFF for i in range(num))
+    fire_params = array.array("i", [width, num // width, 6])
+    plane = bytearray((i * 37) & 0xFF for i in range(2 * (num // 10)))
+    plane_params = array.array("i", [num // 10, 2, 10, 0xC0, 0, 0x000505, 0, num // 10 - 1])
+    shift_params = array.array("i", [num // 10, 2, 10, 0xC0, 3, 0, 1, num // 10 - 2])
+
+    def buf():
+        return array.array("I", src)
+
+    return (
+        ("fill", fill_py, fill,
+         lambda: (buf(), 0x020000, num)),
+        ("pack_grb", pack_grb_py, pack_grb,
+         lambda: (src, buf(), table, 0x000002)),
+        ("expand_grb", expand_grb_py, expand_grb,
+         lambda: (src, array.array("H", [0] * (3 * num)), dither_table, 0x000002)),
+        ("dither_grb", dither_grb_py, dither_grb,
+         lambda: (buf(), levels, dither_params)),
+        ("gather", gather_py, gather,
+         lambda: (buf(), wheel_indices, wheel, 7)),
+        ("blend add", blend_py, blend,
+         lambda: (buf(), layer, BLEND_ADD, 0x000002)),
+        ("blend alpha", blend_py, blend,
+         lambda: (buf(), layer, BLEND_ALPHA | (96 << 8), 0x000002)),
+        ("blend mask", blend_py, blend,
+         lambda: (buf(), layer, BLEND_MASK, 0x000002)),
+        ("blit_glyph", blit_glyph_py, blit_glyph,
+         lambda: (buf(), glyph, glyph_params)),
+        ("fill_runs", fill_runs_py, fill_runs,
+         lambda: (buf(), 0x000505, rect_params)),
+        ("copy_runs", copy_runs_py, copy_runs,
+         lambda: (buf(), layer, copy_params)),
+        ("copy_masked", copy_runs_masked_py, copy_runs_masked,
+         lambda: (buf(), layer, mask, copy_params)),
+        ("shift_bits", shift_bits_py, shift_bits,
+         lambda: (bytearray(plane), shift_params)),
+        ("composite", composite_bits_py, composite_bits,
+         lambda: (buf(), plane, plane_params)),
+        ("plasma", plasma_py, plasma,
+         lambda: (buf(), plasma_indices, plasma_tables, plasma_params)),
+        ("fire", fire_py, fire,
+         lambda: (buf(), bytearray(heat), plasma_tables[256:], fire_params)),
+        ("fill_sphere", fill_sphere_py, fill_sphere,
+         lambda: (buf(), sphere_params, sphere_colors)),
+        ("sphere_2x2", fill_sphere_py, fill_sphere,
+         lambda: (buf(), coarse_params, sphere_colors)),
+        ("channel_sums", channel_sums_py, channel_sums,
+         lambda: (src[1:] + src[:1], array.array("i", [0, 0, 0]), 0x000002)),
+    )
+
+def _outputs(args):
+    """Contents of the buffer arguments, to compare two kernel runs"""
+    return [bytes(arg) for arg in args
+            if isinstance(arg, (array.array, bytearray, memoryview))]
+
+def check(num=160):
+    """
+    Run every kernel and its pure-Python version on the same inputs and
+    raise an AssertionError if any buffer differs. On CPython the public
+    kernels are the pure-Python ones; tests/test_kernels.py runs the
+    viper source on the host instead.
+    """
+    for name, slow, fast, make_args in _cases(num):
+        args_slow = make_args()
+        args_fast = make_args()
+        slow(*args_slow)
+        fast(*args_fast)
+        assert _outputs(args_slow) == _outputs(args_fast), "Kernel %s: variants differ" % name
+
+def benchmark(num=160, repeat=100):
+    """
+    Time every kernel against its pure-Python version and print the speedup.
+
+    The variants are compared first (see check()); a mismatch raises an 
+    AssertionError. On CPython the public kernels are the pure-Python 
+    ones, so the speedup is 1.0.
+
+    Parameters:
+    - num: Number of pixels in the test buffers
+    - repeat: Number of calls per timing
+    """
+    check(num)
+    for name, slow, fast, make_args in _cases(num):
+        t_slow = _time_us(slow, make_args(), repeat)
+        t_fast = _time_us(fast, make_args(), repeat)
+        print("%-12s python: %7d us  compiled: %7d us  speedup: %5.1fx"
+              % (name, t_slow // repeat, t_fast // repeat,
+                 t_slow / max(t_fast, 1)))
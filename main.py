@@ -1,21 +1,39 @@
+import array
 import random
 import time
 import math
+import struct
 import sys
 
+import fastmath
+import kernels
+from alloctrack import AllocationTracker, CPYTHON_SLACK
+from stream import StreamEncoder, ACK, NAK
+from kernels import TRANSPARENT, NO_COLOR, pack_color, unpack_color
+from kernels import BLEND_COPY, BLEND_REPLACE, BLEND_ADD, BLEND_ALPHA, BLEND_MASK
+from primitives import fill_rect, hline, vline
+
 # Switch between MicroPython and Python 
 
 MICROPYTHON = sys.platform == "rp2"
 
 if MICROPYTHON:
-    from neopixel import NeoPixel
-    from time import sleep, ticks_ms
+    from neopixel import NeoPixel, ParallelWriter, create_state_machine
+    from time import sleep, sleep_ms, sleep_us, ticks_ms, ticks_us, ticks_diff
 else:
     from time import monotonic
     def sleep(seconds):
         pass
+    def sleep_ms(milliseconds):
+        pass
+    def sleep_us(microseconds):
+        pass
     def ticks_ms():
         return int(monotonic() * 1000)
+    def ticks_us():
+        return int(monotonic() * 1000000)
+    def ticks_diff(end, start):
+        return end - start
 
 WIDTH = 16  # Width of the LED grid in landscape mode
 HEIGHT = 10  # Height of the LED grid in landscape mode
@@ -36,21 +54,43 @@ ORANGE = (5, 2, 0)
 BRIGHT_YELLOW = (8, 8, 0)
 LIGHT_YELLOW = (4, 4, 2)
 
+# All named colors, used to seed the GIF palette (see GIFRenderer)
+COLORS = (DARK_GREEN, LIGHT_GREEN, GREEN, BROWN, YELLOW, WHITE, BLACK, 
+          DARK_BLUE, BLUE, RED, MAGENTA, ORANGE, BRIGHT_YELLOW, LIGHT_YELLOW)
+
 # Print debug messages
 DEBUG = False
 
+# Report heap allocations per frame and per animation (see AllocationTracker)
+TRACK_ALLOCATIONS = False
+
+# Frames rendered ahead in idle time (see FrameLookahead), 0 = off
+LOOKAHEAD_DEPTH = 0
+
+# Lower the animation quality while frames overrun their slot (see 
+# QualityGovernor); the GIF export on the host always renders full quality
+QUALITY_GOVERNOR = True
+
+# Current budget of the LEDs in mA (see PowerLimiter), e.g. 450 on USB 
+# power; 0 = no limit
+POWER_LIMIT_MA = 0
+
+# LED refresh rate in Hz with temporal dithering (see DitheredRenderer), 
+# 0 = show every frame once with NeoPixelRenderer
+REFRESH_HZ = 0
+
 ################################################################################
 # region Helper Functions
 ################################################################################
 
 def pixel2index(u, v, width=WIDTH):
-    """Convert (row, col) in portrait to flat index for pixel dict"""
+    """Convert (row, col) in portrait to flat index for pixel buffer"""
     u_landscape = int(v)
     v_landscape = int(width - 1 - u)
     return u_landscape * width + v_landscape
 
 def index2pixel(i, width=WIDTH):
-    """Convert (row, col) in portrait to flat index for pixel dict"""
+    """Convert (row, col) in portrait to flat index for pixel buffer"""
     u_landscape = i // width
     v_landscape = i % width
     u = width - 1 - v_landscape
@@ -61,42 +101,355 @@ p2i = pixel2index  # Alias
 i2p = index2pixel  # Alias
 
 ################################################################################
-# region BaseFont class
+# region FrameBuffer
 ################################################################################
-class FontBase:
+class FrameBuffer:
+    """
+    Flat pixel buffer that is reused across frames.
     
-    def __init__(self, size, bitmap):
+    Pixels are stored as packed GRB words (see kernels.pack_color) in an
+    array("I") using the same flat indices as pixel2index. Pixels that were
+    not drawn in the current frame hold TRANSPARENT and show the background
+    color when rendered. Item assignment works like the former pixel dict:
+    pixels[idx] = (r, g, b) and pixels["background"] = (r, g, b).
+    """
+    
+    def __init__(self, width=WIDTH, height=HEIGHT, background=DARK_BLUE):
         """
-        Initialize font with size and bitmap data.
+        Parameters:
+        - width: Grid width (landscape mode)
+        - height: Grid height (landscape mode)
+        - background: Initial background color
+        """
+        self.width = width
+        self.height = height
+        self.num = width * height
+        self.buf = array.array("I", [TRANSPARENT] * self.num)
+        self.background = pack_color(background)
+        
+    def __setitem__(self, idx, color):
+        if isinstance(idx, str):
+            if idx == "background":
+                self.background = pack_color(color)
+        elif 0 <= idx < self.num:
+            self.buf[idx] = pack_color(color)
+            
+    def clear(self, background=DARK_BLUE):
+        """Mark all pixels as not drawn and reset the background"""
+        kernels.fill(self.buf, TRANSPARENT, self.num)
+        self.background = pack_color(background)
         
+    def get_word(self, idx):
+        """Get the resolved GRB word of a pixel (background if not drawn)"""
+        word = self.buf[idx]
+        return self.background if word == TRANSPARENT else word
+    
+    def get_color(self, idx):
+        """Get the resolved (r, g, b) color of a pixel"""
+        return unpack_color(self.get_word(idx))
+
+################################################################################
+# region BitPlane
+################################################################################
+class BitPlane:
+    """
+    One bit per pixel for single-color shapes such as text.
+    
+    Every portrait row is stored as stride bytes of bits, MSB first, so 
+    glyph rows (bitmasks) are drawn with shifts and ORs and horizontal 
+    scrolling is a shift of every row. The color is only applied by 
+    composite(). On a 16x10 grid, a plane takes 32 bytes instead of the
+    640 bytes of a FrameBuffer.
+    """
+    
+    def __init__(self, width=WIDTH, height=HEIGHT):
+        """
         Parameters:
-        - size: Font size (width and height, assumes square font)
-        - bitmap: Dictionary mapping characters to list of row bitmasks
+        - width: Grid width (landscape mode), the number of portrait rows
+        - height: Grid height (landscape mode), the bits per row
         """
-        self.size = size
-        self.bitmap = bitmap
-        self.char_bounds = {k: self._get_char_bounds(k) for k in bitmap}
+        self.width = width
+        self.height = height
+        self.stride = (height + 7) // 8
+        self.bits = bytearray(width * self.stride)
+        # Clears the padding bits right of the last column
+        self.last_mask = (0xFF00 >> (height - 8 * (self.stride - 1))) & 0xFF
+        # Reused parameter block of kernels.shift_bits and composite_bits,
+        # the last two entries are the first and last row with bits set
+        self._params = array.array("i", [width, self.stride, height, 
+                                         self.last_mask, 0, 0, width, -1])
         
-    def _get_char_bounds(self, char):
-        char = char.upper()
-        if char not in self.bitmap:
-            return (0, self.size - 1)
+    def clear(self):
+        """Clear all bits"""
+        params = self._params
+        bits = self.bits
+        for i in range(params[6] * self.stride, (params[7] + 1) * self.stride):
+            bits[i] = 0
+        params[6] = self.width
+        params[7] = -1
             
-        rows = self.bitmap[char]
+    def get(self, row, col):
+        """Check whether the pixel at (row, col) is set"""
+        return (self.bits[row * self.stride + (col >> 3)] >> (7 - (col & 7))) & 1
         
-        leftmost = self.size
-        rightmost = 0
+    def set(self, row, col):
+        """Set the pixel at (row, col), ignored outside the grid"""
+        if 0 <= row < self.width and 0 <= col < self.height:
+            self.bits[row * self.stride + (col >> 3)] |= 0x80 >> (col & 7)
+            self._mark_row(row)
+    
+    def _mark_row(self, row):
+        # Only rows between the first and last marked row are shifted and
+        # composited
+        params = self._params
+        if row < params[6]:
+            params[6] = row
+        if row > params[7]:
+            params[7] = row
+    
+    def or_row(self, row, col, value, n):
+        """
+        OR an n-bit mask into a row, clipped to the grid.
+        
+        Parameters:
+        - row: Row to draw into
+        - col: Column of the mask's most significant bit
+        - value: Bitmask, n <= 16 bits
+        - n: Number of bits of value
+        """
+        if row < 0 or row >= self.width or col >= self.height:
+            return
+        if col < 0:
+            # Drop the bits left of the grid
+            n += col
+            if n <= 0:
+                return
+            value &= (1 << n) - 1
+            col = 0
+        # Align the mask in a window of three bytes starting at col's byte
+        window = value << (24 - n - (col & 7))
+        stride = self.stride
+        base = row * stride
+        k = col >> 3
+        self.bits[base + k] |= window >> 16
+        if k + 1 < stride:
+            self.bits[base + k + 1] |= (window >> 8) & 0xFF
+            if k + 2 < stride:
+                self.bits[base + k + 2] |= window & 0xFF
+        self.bits[base + stride - 1] &= self.last_mask
+        self._mark_row(row)
+        
+    def draw_glyph(self, font, char, row, col):
+        """
+        Draw a character of a FontBase font.
         
+        Parameters:
+        - font: Font to draw with
+        - char: Character to draw (space if the font doesn't have it)
+        - row: Top row of the glyph box
+        - col: Left column of the glyph box
+        """
+        glyph = font.get_glyph(char)
+        if glyph < 0:
+            glyph = font.get_glyph(' ')
+        size = font.size
+        data = font.data
+        pos = glyph * font.stride + 2
+        if col >= self.height or col + size <= 0:
+            return
+        for r in range(max(0, -row), min(size, self.width - row)):
+            value = (data[pos + 2 * r] << 8) | data[pos + 2 * r + 1]
+            if value:
+                self.or_row(row + r, col, value, size)
+        
+    def scroll(self, n):
+        """Shift all rows left by n >= 0 columns, clearing the right edge"""
+        self._params[4] = n
+        kernels.shift_bits(self.bits, self._params)
+        
+    def composite(self, pixels, color):
+        """
+        Draw the set pixels into a FrameBuffer of the same size.
+        
+        Parameters:
+        - pixels: FrameBuffer to draw into
+        - color: Packed color
+        """
+        self._params[5] = color
+        kernels.composite_bits(pixels.buf, self.bits, self._params)
+        return pixels
+
+
+################################################################################
+# region Assets
+################################################################################
+# Fonts and sprites compiled into bytes by build_assets.py. When assets.py
+# is frozen into the firmware, the blobs are read straight from flash; 
+# without it, they are compiled from the Python sources at startup.
+try:
+    import assets
+except ImportError:
+    assets = None
+
+
+def load_asset(name):
+    """Get a compiled blob from assets.py, None if not available"""
+    return getattr(assets, name, None)
+
+
+def compile_font(size, bitmap):
+    """
+    Compile a font bitmap into an index and a data blob.
+    
+    Every glyph takes 2 + 2*size bytes in data: the first and last column 
+    with pixels set, then the rows as big-endian 16-bit masks (MSB = 
+    leftmost column). index maps a character code (0-255) to the glyph 
+    number, 255 if the font has no such character. Lower-case letters 
+    map to the upper-case glyphs.
+    
+    Parameters:
+    - size: Font size (width and height, assumes square font)
+    - bitmap: Dictionary mapping characters to list of row bitmasks
+    
+    Returns:
+    - (index, data) as bytes
+    """
+    assert len(bitmap) < 255, "Too many glyphs"
+    index = bytearray(b"\xff" * 256)
+    data = bytearray()
+    for glyph, char in enumerate(sorted(bitmap)):
+        rows = bitmap[char]
+        leftmost = size
+        rightmost = 0
         for row in rows:
-            for col in range(self.size):
-                if (row >> (self.size - 1 - col)) & 1:
+            for col in range(size):
+                if (row >> (size - 1 - col)) & 1:
                     leftmost = min(leftmost, col)
                     rightmost = max(rightmost, col)
-        
         if rightmost < leftmost:
-            return (0, self.size // 2)
-            
-        return (leftmost, rightmost)
+            leftmost, rightmost = 0, size // 2
+        data.append(leftmost)
+        data.append(rightmost)
+        for row in rows:
+            data.append(row >> 8)
+            data.append(row & 0xFF)
+        index[ord(char)] = glyph
+    for code in range(ord("a"), ord("z") + 1):
+        if index[code] == 0xFF:
+            index[code] = index[code - 32]
+    return bytes(index), bytes(data)
+
+
+def compile_sprite(draw, width=16, height=10):
+    """
+    Record the pixels a drawing function sets on an empty grid.
+    
+    Parameters:
+    - draw: Function drawing into a FrameBuffer (e.g. draw_xmas_tree)
+    - width: Width (landscape mode) of the grid the function is recorded
+             on, its top left corner becomes the sprite's origin
+    - height: Height (landscape mode) of the grid
+    
+    Returns:
+    - Bytes with the bounding box (first row, last row, first col, last 
+      col), then five entries per pixel: row, col, and the packed color 
+      as g, r, b (see draw_sprite)
+    """
+    pixels = FrameBuffer(width, height)
+    draw(pixels)
+    box = bytearray((255, 0, 255, 0))
+    sprite = bytearray()
+    for i in range(pixels.num):
+        word = pixels.buf[i]
+        if word != TRANSPARENT:
+            row, col = index2pixel(i, width)
+            box[0] = min(box[0], row)
+            box[1] = max(box[1], row)
+            box[2] = min(box[2], col)
+            box[3] = max(box[3], col)
+            sprite += bytes((row, col, word >> 16, (word >> 8) & 0xFF, word & 0xFF))
+    return bytes(box + sprite)
+
+
+def load_sprite(name, draw):
+    """Get a sprite from assets.py, or record it from its drawing function"""
+    sprite = load_asset(name)
+    if sprite is None:
+        sprite = compile_sprite(draw)
+    return sprite
+
+
+def draw_sprite(pixels, sprite, row_offset=0, col_offset=0):
+    """
+    Draw a sprite (see compile_sprite) at the given offset.
+    
+    The bounding box is checked against the grid first: sprites outside
+    the grid are skipped, only sprites on the edge are clipped per pixel.
+    
+    Parameters:
+    - pixels: FrameBuffer to draw into
+    - sprite: Sprite bytes
+    - row_offset: Row of the sprite's origin
+    - col_offset: Column of the sprite's origin
+    
+    Returns:
+    - Modified FrameBuffer
+    """
+    w = pixels.width
+    h = pixels.height
+    top = row_offset + sprite[0]
+    bottom = row_offset + sprite[1]
+    left = col_offset + sprite[2]
+    right = col_offset + sprite[3]
+    if top > bottom or bottom < 0 or top >= w or right < 0 or left >= h:
+        return pixels
+    clip = top < 0 or bottom >= w or left < 0 or right >= h
+    buf = pixels.buf
+    for i in range(4, len(sprite), 5):
+        row = row_offset + sprite[i]
+        col = col_offset + sprite[i + 1]
+        if clip and not (0 <= row < w and 0 <= col < h):
+            continue
+        buf[col * w + (w - 1 - row)] = (sprite[i + 2] << 16) | (sprite[i + 3] << 8) | sprite[i + 4]
+    return pixels
+
+
+################################################################################
+# region BaseFont class
+################################################################################
+class FontBase:
+    
+    def __init__(self, size, bitmap):
+        """
+        Initialize font with size and bitmap data.
+        
+        The glyphs are taken from assets.py if it has the font (by class 
+        name, e.g. FONT9X9_INDEX and FONT9X9_DATA), otherwise the bitmap 
+        is compiled (see compile_font).
+        
+        Parameters:
+        - size: Font size (width and height, assumes square font)
+        - bitmap: Dictionary mapping characters to list of row bitmasks, 
+                  or a function returning it
+        """
+        self.size = size
+        self.stride = 2 + 2 * size  # Bytes per glyph in self.data
+        name = type(self).__name__.upper()
+        self.index = load_asset(name + "_INDEX")
+        self.data = load_asset(name + "_DATA")
+        if self.index is None or self.data is None:
+            if callable(bitmap):
+                bitmap = bitmap()
+            self.index, self.data = compile_font(size, bitmap)
+        # Reused parameter block for kernels.blit_glyph
+        self._blit_params = array.array("i", [0] * 11)
+        
+    def get_glyph(self, char):
+        """Glyph number of a character, -1 if the font doesn't have it"""
+        code = ord(char)
+        if code > 255 or self.index[code] == 0xFF:
+            return -1
+        return self.index[code]
     
     def get_char_bounds(self, char):
         """
@@ -108,8 +461,11 @@ class FontBase:
         Returns:
         - (left_col, right_col) tuple with inclusive bounds
         """
-        char = char.upper()
-        return self.char_bounds.get(char, (0, self.size - 1))
+        glyph = self.get_glyph(char)
+        if glyph < 0:
+            return (0, self.size - 1)
+        pos = glyph * self.stride
+        return (self.data[pos], self.data[pos + 1])
     
     def get_char_width(self, char):
         """
@@ -121,8 +477,11 @@ class FontBase:
         Returns:
         - Width in pixels (or default size if character not found)
         """
-        leftmost, rightmost = self.char_bounds.get(char, (0, self.size - 1))
-        return rightmost - leftmost + 1
+        glyph = self.get_glyph(char)
+        if glyph < 0:
+            return self.size
+        pos = glyph * self.stride
+        return self.data[pos + 1] - self.data[pos] + 1
     
     def draw(self, pixels, char, row_offset=0, col_offset=0, 
              color=(15, 15, 15), bg_color=None, margins=None,
@@ -131,7 +490,7 @@ class FontBase:
         Draw a character to the pixel buffer.
         
         Parameters:
-        - pixels: Pixel dictionary to draw into
+        - pixels: FrameBuffer to draw into
         - char: Character to draw
         - row_offset: Starting row position
         - col_offset: Starting column position
@@ -140,46 +499,54 @@ class FontBase:
         - margins: Frame around the character as (top, bottom, left, right)
         
         Returns:
-        - Modified pixels dictionary
+        - Modified FrameBuffer
         """
-        char = char.upper()
-        if char not in self.bitmap:
-            char = ' '
+        glyph = self.get_glyph(char)
+        if glyph < 0:
+            glyph = self.get_glyph(' ')
+        pos = glyph * self.stride
         
-        rows = self.bitmap[char]
-        box_width = self.get_char_width(char) if variable_box else self.size
         box_height = self.size
-        leftmost, rightmost = self.get_char_bounds(char) if variable_box else (0, self.size - 1)
+        if variable_box:
+            leftmost = self.data[pos]
+            rightmost = self.data[pos + 1]
+        else:
+            leftmost = 0
+            rightmost = self.size - 1
         
-        for row in range(self.size):
-            for col in range(leftmost, rightmost + 1):
-                pixel_on = (rows[row] >> (self.size - 1 - col)) & 1
-                actual_row = row_offset + row
-                actual_col = col_offset + col #- leftmost
-                
-                if pixel_on:
-                    pixels[p2i(actual_row, actual_col)] = color
-                elif bg_color is not None:
-                    pixels[p2i(actual_row, actual_col)] = bg_color
+        # Clip the glyph box to the grid once, so that the kernel only 
+        # visits visible pixels and off-screen characters cost nothing
+        first_row = max(0, -row_offset)
+        last_row = min(box_height, pixels.width - row_offset) - 1
+        first_col = max(leftmost, -col_offset)
+        last_col = min(rightmost, pixels.height - 1 - col_offset)
+        params = self._blit_params
+        if first_row <= last_row and first_col <= last_col:
+            params[0] = self.size
+            params[1] = first_col
+            params[2] = last_col
+            params[3] = row_offset
+            params[4] = col_offset
+            params[5] = pack_color(color)
+            params[6] = pack_color(bg_color) if bg_color is not None else NO_COLOR
+            params[7] = pixels.width
+            params[8] = pos + 2
+            params[9] = first_row
+            params[10] = last_row
+            kernels.blit_glyph(pixels.buf, self.data, params)
                     
         if margins is not None and bg_color is not None:
             top, bottom, left, right = margins
-            # Clear top margin
-            for r in range(row_offset-top, row_offset):
-                for c in range(col_offset-left+leftmost, col_offset+rightmost+1+right):
-                    pixels[p2i(r, c)] = bg_color 
-            # Clear bottom margin
-            for r in range(row_offset+box_height, row_offset+box_height+bottom):
-                for c in range(col_offset-left+leftmost, col_offset+rightmost+1+right):
-                    pixels[p2i(r, c)] = bg_color
-            # Clear left margin
-            for r in range(row_offset-top, row_offset+box_height+bottom):
-                for c in range(col_offset-left+leftmost, col_offset+leftmost):
-                    pixels[p2i(r, c)] = bg_color
-            # Clear right margin
-            for r in range(row_offset-top, row_offset+box_height+bottom):
-                for c in range(col_offset+rightmost+1, col_offset+rightmost+1+right):
-                    pixels[p2i(r, c)] = bg_color
+            bg = pack_color(bg_color)
+            first = col_offset + leftmost - left
+            cols = rightmost - leftmost + 1 + left + right
+            # Top and bottom margin, including the corners
+            fill_rect(pixels, row_offset - top, first, top, cols, bg)
+            fill_rect(pixels, row_offset + box_height, first, bottom, cols, bg)
+            # Left and right margin
+            fill_rect(pixels, row_offset, first, box_height, left, bg)
+            fill_rect(pixels, row_offset, col_offset + rightmost + 1, 
+                      box_height, right, bg)
         
         return pixels
     
@@ -211,7 +578,12 @@ class FontBase:
 #################################################################################
 class Font9x9(FontBase):    
     def __init__(self):
-        FONT_9X9_BITMAP = {
+        super().__init__(size=9, bitmap=self.get_bitmap)
+    
+    @staticmethod
+    def get_bitmap():
+        """Glyph rows by character, only needed if the font is not in assets"""
+        return {
             'A': [0b001111000, 0b011001100, 0b011001100, 0b011001100, 0b011111100, 0b011001100, 0b011001100, 0b011001100, 0b000000000],
             'B': [0b011111000, 0b011001100, 0b011001100, 0b011111000, 0b011001100, 0b011001100, 0b011001100, 0b011111000, 0b000000000],
             'C': [0b001111000, 0b011001100, 0b011000000, 0b011000000, 0b011000000, 0b011000000, 0b011001100, 0b001111000, 0b000000000],
@@ -257,7 +629,6 @@ class Font9x9(FontBase):
             ':': [0b000000000, 0b000000000, 0b001110000, 0b001110000, 0b000000000, 0b001110000, 0b001110000, 0b000000000, 0b000000000],
             ' ': [0b000000000, 0b000000000, 0b000000000, 0b000000000, 0b000000000, 0b000000000, 0b000000000, 0b000000000, 0b000000000],
         }
-        super().__init__(size=9, bitmap=FONT_9X9_BITMAP)
         
         
 ################################################################################
@@ -265,7 +636,12 @@ class Font9x9(FontBase):
 #################################################################################
 class Font8x8(FontBase):    
     def __init__(self):
-        FONT_8X8_BITMAP = FONT_8X8 = {
+        super().__init__(size=8, bitmap=self.get_bitmap)
+    
+    @staticmethod
+    def get_bitmap():
+        """Glyph rows by character, only needed if the font is not in assets"""
+        return {
             'A': [0b00111100, 0b01000010, 0b01000010, 0b01111110, 0b01000010, 0b01000010, 0b01000010, 0b00000000],
             'B': [0b01111100, 0b01000010, 0b01000010, 0b01111100, 0b01000010, 0b01000010, 0b01111100, 0b00000000],
             'C': [0b00111100, 0b01000010, 0b01000000, 0b01000000, 0b01000000, 0b01000010, 0b00111100, 0b00000000],
@@ -311,7 +687,6 @@ class Font8x8(FontBase):
             ':': [0b00000000, 0b00011000, 0b00011000, 0b00000000, 0b00011000, 0b00011000, 0b00000000, 0b00000000],
             ' ': [0b00000000, 0b00000000, 0b00000000, 0b00000000, 0b00000000, 0b00000000, 0b00000000, 0b00000000],
         }
-        super().__init__(size=8, bitmap=FONT_8X8_BITMAP)
         
         
 ################################################################################
@@ -319,7 +694,12 @@ class Font8x8(FontBase):
 ################################################################################
 class Font7x7(FontBase):
     def __init__(self):
-        FONT_7X7_BITMAP = {
+        super().__init__(size=7, bitmap=self.get_bitmap)
+    
+    @staticmethod
+    def get_bitmap():
+        """Glyph rows by character, only needed if the font is not in assets"""
+        return {
             'A': [0b0111000, 0b1000100, 0b1000100, 0b1111100, 0b1000100, 0b1000100, 0b0000000],
             'B': [0b1111000, 0b1000100, 0b1111000, 0b1000100, 0b1000100, 0b1111000, 0b0000000],
             'C': [0b0111000, 0b1000100, 0b1000000, 0b1000000, 0b1000100, 0b0111000, 0b0000000],
@@ -365,7 +745,6 @@ class Font7x7(FontBase):
             ':': [0b0000000, 0b0110000, 0b0110000, 0b0000000, 0b0110000, 0b0110000, 0b0000000],
             ' ': [0b0000000, 0b0000000, 0b0000000, 0b0000000, 0b0000000, 0b0000000, 0b0000000],
         }
-        super().__init__(size=7, bitmap=FONT_7X7_BITMAP)
         
         
 ################################################################################
@@ -373,7 +752,12 @@ class Font7x7(FontBase):
 ################################################################################
 class Font6x6(FontBase):
     def __init__(self):
-        FONT_6X6 = {
+        super().__init__(size=6, bitmap=self.get_bitmap)
+    
+    @staticmethod
+    def get_bitmap():
+        """Glyph rows by character, only needed if the font is not in assets"""
+        return {
             'A': [0b011000, 0b100100, 0b111100, 0b100100, 0b100100, 0b000000],
             'B': [0b111000, 0b100100, 0b111000, 0b100100, 0b111000, 0b000000],
             'C': [0b011000, 0b100100, 0b100000, 0b100100, 0b011000, 0b000000],
@@ -419,7 +803,6 @@ class Font6x6(FontBase):
             ':': [0b000000, 0b011000, 0b000000, 0b011000, 0b000000, 0b000000],
             ' ': [0b000000, 0b000000, 0b000000, 0b000000, 0b000000, 0b000000],
         }
-        super().__init__(size=6, bitmap=FONT_6X6)
 
 
 ################################################################################
@@ -444,60 +827,65 @@ def select_font(size):
 def draw_xmas_tree(pixels):
     """
     Draw a Christmas tree on a 10x16 LED grid (portrait mode)
-    Grid is 10 pixels wide, 16 pixels high
+    Grid is 10 pixels wide, 16 pixels high. On larger grids the tree
+    stands centered on the bottom edge.
     """
+    w = pixels.width
+    r0 = pixels.width - 16       # Row offset: bottom aligned
+    c0 = pixels.height // 2 - 5  # Column offset: centered
+    
     # Tree
-    pixels[p2i(8, 4)] = LIGHT_GREEN
-    pixels[p2i(8, 5)] = LIGHT_GREEN
-    
-    pixels[p2i(9, 3)] = DARK_GREEN
-    pixels[p2i(9, 4)] = LIGHT_GREEN
-    pixels[p2i(9, 5)] = RED
-    pixels[p2i(9, 6)] = DARK_GREEN
-    
-    pixels[p2i(10, 2)] = DARK_GREEN
-    pixels[p2i(10, 3)] = MAGENTA
-    pixels[p2i(10, 4)] = LIGHT_GREEN
-    pixels[p2i(10, 5)] = LIGHT_GREEN
-    pixels[p2i(10, 6)] = DARK_GREEN
-    pixels[p2i(10, 7)] = DARK_GREEN
-
-    pixels[p2i(11, 3)] = DARK_GREEN
-    pixels[p2i(11, 4)] = LIGHT_GREEN
-    pixels[p2i(11, 5)] = LIGHT_GREEN
-    pixels[p2i(11, 6)] = DARK_GREEN
-    
-    pixels[p2i(12, 2)] = DARK_GREEN
-    pixels[p2i(12, 3)] = DARK_GREEN
-    pixels[p2i(12, 4)] = MAGENTA
-    pixels[p2i(12, 5)] = LIGHT_GREEN
-    pixels[p2i(12, 6)] = RED
-    pixels[p2i(12, 7)] = DARK_GREEN
-    
-    pixels[p2i(13, 1)] = DARK_GREEN
-    pixels[p2i(13, 2)] = RED
-    pixels[p2i(13, 3)] = DARK_GREEN
-    pixels[p2i(13, 4)] = LIGHT_GREEN
-    pixels[p2i(13, 5)] = LIGHT_GREEN
-    pixels[p2i(13, 6)] = DARK_GREEN
-    pixels[p2i(13, 7)] = DARK_GREEN
-    pixels[p2i(13, 8)] = DARK_GREEN
+    pixels[p2i(r0 + 8, c0 + 4, w)] = LIGHT_GREEN
+    pixels[p2i(r0 + 8, c0 + 5, w)] = LIGHT_GREEN
+    
+    pixels[p2i(r0 + 9, c0 + 3, w)] = DARK_GREEN
+    pixels[p2i(r0 + 9, c0 + 4, w)] = LIGHT_GREEN
+    pixels[p2i(r0 + 9, c0 + 5, w)] = RED
+    pixels[p2i(r0 + 9, c0 + 6, w)] = DARK_GREEN
+    
+    pixels[p2i(r0 + 10, c0 + 2, w)] = DARK_GREEN
+    pixels[p2i(r0 + 10, c0 + 3, w)] = MAGENTA
+    pixels[p2i(r0 + 10, c0 + 4, w)] = LIGHT_GREEN
+    pixels[p2i(r0 + 10, c0 + 5, w)] = LIGHT_GREEN
+    pixels[p2i(r0 + 10, c0 + 6, w)] = DARK_GREEN
+    pixels[p2i(r0 + 10, c0 + 7, w)] = DARK_GREEN
+
+    pixels[p2i(r0 + 11, c0 + 3, w)] = DARK_GREEN
+    pixels[p2i(r0 + 11, c0 + 4, w)] = LIGHT_GREEN
+    pixels[p2i(r0 + 11, c0 + 5, w)] = LIGHT_GREEN
+    pixels[p2i(r0 + 11, c0 + 6, w)] = DARK_GREEN
+    
+    pixels[p2i(r0 + 12, c0 + 2, w)] = DARK_GREEN
+    pixels[p2i(r0 + 12, c0 + 3, w)] = DARK_GREEN
+    pixels[p2i(r0 + 12, c0 + 4, w)] = MAGENTA
+    pixels[p2i(r0 + 12, c0 + 5, w)] = LIGHT_GREEN
+    pixels[p2i(r0 + 12, c0 + 6, w)] = RED
+    pixels[p2i(r0 + 12, c0 + 7, w)] = DARK_GREEN
+    
+    pixels[p2i(r0 + 13, c0 + 1, w)] = DARK_GREEN
+    pixels[p2i(r0 + 13, c0 + 2, w)] = RED
+    pixels[p2i(r0 + 13, c0 + 3, w)] = DARK_GREEN
+    pixels[p2i(r0 + 13, c0 + 4, w)] = LIGHT_GREEN
+    pixels[p2i(r0 + 13, c0 + 5, w)] = LIGHT_GREEN
+    pixels[p2i(r0 + 13, c0 + 6, w)] = DARK_GREEN
+    pixels[p2i(r0 + 13, c0 + 7, w)] = DARK_GREEN
+    pixels[p2i(r0 + 13, c0 + 8, w)] = DARK_GREEN
     
     if False:
         # Snow line (right sides of tree)
-        pixels[p2i(7, 4)] = YELLOW
-        pixels[p2i(8, 5)] = WHITE
-        pixels[p2i(9, 6)] = WHITE
-        pixels[p2i(10, 7)] = WHITE
-        pixels[p2i(11, 6)] = WHITE
-        pixels[p2i(12, 7)] = WHITE
-        pixels[p2i(13, 8)] = WHITE
+        pixels[p2i(r0 + 7, c0 + 4, w)] = YELLOW
+        pixels[p2i(r0 + 8, c0 + 5, w)] = WHITE
+        pixels[p2i(r0 + 9, c0 + 6, w)] = WHITE
+        pixels[p2i(r0 + 10, c0 + 7, w)] = WHITE
+        pixels[p2i(r0 + 11, c0 + 6, w)] = WHITE
+        pixels[p2i(r0 + 12, c0 + 7, w)] = WHITE
+        pixels[p2i(r0 + 13, c0 + 8, w)] = WHITE
     
     # Trunk
-    pixels[p2i(14, 4)] = BROWN
-    pixels[p2i(14, 5)] = BROWN
-    pixels[p2i(15, 4)] = BROWN
-    pixels[p2i(15, 5)] = BROWN
+    pixels[p2i(r0 + 14, c0 + 4, w)] = BROWN
+    pixels[p2i(r0 + 14, c0 + 5, w)] = BROWN
+    pixels[p2i(r0 + 15, c0 + 4, w)] = BROWN
+    pixels[p2i(r0 + 15, c0 + 5, w)] = BROWN
         
     return pixels
 
@@ -513,59 +901,40 @@ def draw_star_of_bethlehem(pixels, position=(1, 4), size=1):
     size>=3: star shape
     """
     row, col = position
+    width = pixels.width
+    height = pixels.height
     
     if size == 1:
         # Single pixel star
-        pixels[p2i(row, col)] = BRIGHT_YELLOW
-    elif size == 2:
-        # Small cross
-        pixels[p2i(row, col)] = BRIGHT_YELLOW
-        if row > 0:
-            pixels[p2i(row-1, col)] = YELLOW
-        if row < WIDTH-1:
-            pixels[p2i(row+1, col)] = YELLOW
-        if col > 0:
-            pixels[p2i(row, col-1)] = YELLOW
-        if col < HEIGHT-1:
-            pixels[p2i(row, col+1)] = YELLOW
-    elif size == 3:
-        # Larger star shape
-        pixels[p2i(row, col)] = BRIGHT_YELLOW
-        if row > 0:
-            pixels[p2i(row-1, col)] = YELLOW
-        if row < WIDTH-1:
-            pixels[p2i(row+1, col)] = YELLOW
-        if col > 0:
-            pixels[p2i(row, col-1)] = YELLOW
-        if col < HEIGHT-1:
-            pixels[p2i(row, col+1)] = YELLOW
-        
-        # Diagonal rays
-        if row > 0 and col > 0:
-            pixels[p2i(row-1, col-1)] = LIGHT_YELLOW
-        if row > 0 and col < HEIGHT-1:
-            pixels[p2i(row-1, col+1)] = LIGHT_YELLOW
-        if row < WIDTH-1 and col > 0:
-            pixels[p2i(row+1, col-1)] = LIGHT_YELLOW
-        if row < WIDTH-1 and col < HEIGHT-1:
-            pixels[p2i(row+1, col+1)] = LIGHT_YELLOW
+        pixels[p2i(row, col, width)] = BRIGHT_YELLOW
+    elif size == 2 or size == 3:
+        if size == 3:
+            # Diagonal rays: the corners of the 3x3 square
+            fill_rect(pixels, row-1, col-1, 3, 3, pack_color(LIGHT_YELLOW))
+        # Cross
+        yellow = pack_color(YELLOW)
+        hline(pixels, row, col-1, 3, yellow)
+        vline(pixels, row-1, col, 3, yellow)
+        pixels[p2i(row, col, width)] = BRIGHT_YELLOW
             
     elif size >= 4:
         # Even larger star shape
-        pixels[p2i(row, col)] = WHITE
+        pixels[p2i(row, col, width)] = WHITE
         for dr in range(-size+1, size-1):
             for dc in range(-size+1, size-1):
                 r = row + dr
                 c = col + dc
-                if 0 <= r < WIDTH and 0 <= c < HEIGHT:
-                    distance = math.sqrt(dr**2 + dc**2)
-                    if distance <= size/2:
-                        if distance < size/4:
-                            pixels[p2i(r, c)] = BRIGHT_YELLOW
-                        elif distance < size/2 * 0.75:
-                            pixels[p2i(r, c)] = YELLOW
+                if 0 <= r < width and 0 <= c < height:
+                    # Compare squared distances to stay in integer math:
+                    # d <= size/2, d < size/4 and d < size*3/8
+                    d2 = dr*dr + dc*dc
+                    if 4*d2 <= size*size:
+                        if 16*d2 < size*size:
+                            pixels[p2i(r, c, width)] = BRIGHT_YELLOW
+                        elif 64*d2 < 9*size*size:
+                            pixels[p2i(r, c, width)] = YELLOW
                         else:
-                            pixels[p2i(r, c)] = LIGHT_YELLOW
+                            pixels[p2i(r, c, width)] = LIGHT_YELLOW
     
     return pixels
 
@@ -573,6 +942,42 @@ def draw_star_of_bethlehem(pixels, position=(1, 4), size=1):
 ################################################################################
 # region draw_expanding_sphere
 ################################################################################
+def sphere_params(params, center, radius, width=WIDTH, height=HEIGHT, block=1):
+    """
+    Compute the integer parameter block of kernels.fill_sphere.
+    
+    Parameters:
+    - params: array("i") of length 13 to fill
+    - center: (row, col) center position
+    - radius: Current radius of the sphere
+    - width: Grid width (landscape mode)
+    - height: Grid height (landscape mode)
+    - block: Size of the square blocks the sphere is drawn in, 1 = pixels
+    
+    Returns:
+    - params
+    """
+    center_row, center_col = int(center[0]), int(center[1])
+    # Ring limits relative to the radius: very center, center, middle, outer
+    scale = max(radius, 0.1)
+    params[0] = width
+    # Speed: only visit the bounding box of the sphere
+    params[1] = max(0, math.ceil(center_row - radius))
+    params[2] = min(width - 1, math.floor(center_row + radius))
+    params[3] = max(0, math.ceil(center_col - radius))
+    params[4] = min(height - 1, math.floor(center_col + radius))
+    params[5] = center_row
+    params[6] = center_col
+    # The kernel compares squared distances: d < x  <=>  d² < ceil(x²)
+    params[7] = math.ceil((0.2 * scale)**2)
+    params[8] = math.ceil((0.3 * scale)**2)
+    params[9] = math.ceil((0.6 * scale)**2)
+    params[10] = math.ceil((0.8 * scale)**2)
+    params[11] = math.floor(radius**2)
+    params[12] = block
+    return params
+
+
 def draw_expanding_sphere(pixels, center=(7, 4), radius=1.0, max_radius=12,
                           colors=(DARK_BLUE, WHITE, BRIGHT_YELLOW, YELLOW, ORANGE)):
     """
@@ -581,46 +986,30 @@ def draw_expanding_sphere(pixels, center=(7, 4), radius=1.0, max_radius=12,
     radius: current radius of the sphere
     max_radius: maximum radius for color scaling
     """
-    center_row, center_col = center
-    # Iterate through all pixels
-    for row in range(WIDTH):
-        # Speed: skip rows outside bounding box
-        if row < center[0] - radius - 1 or row > center[0] + radius + 1:
-            continue
-        
-        for col in range(HEIGHT):
-            # Speed: skip columns outside bounding box
-            if col < center[1] - radius - 1 or col > center[1] + radius + 1:
-                continue
-            
-            # Calculate distance from center
-            distance = math.sqrt((row - center_row)**2 + (col - center_col)**2)
-            
-            # If within the current radius, color it based on distance
-            if distance <= radius:
-                # Normalize distance (0 at center, 1 at edge of sphere)
-                norm_dist = distance / max(radius, 0.1)
-                if norm_dist < 0.2:
-                    # Very center: pure white
-                    pixels[p2i(row, col)] = colors[0]
-                elif norm_dist < 0.3:
-                    # Center: bright white-yellow
-                    pixels[p2i(row, col)] = colors[1]
-                elif norm_dist < 0.6:
-                    # Middle: bright yellow
-                    pixels[p2i(row, col)] = colors[2]
-                elif norm_dist < 0.8:
-                    # Outer: yellow
-                    pixels[p2i(row, col)] = colors[3]
-                else:
-                    # Edge: orange
-                    pixels[p2i(row, col)] = colors[4]
+    params = sphere_params(_SPHERE_PARAMS, center, radius, 
+                           pixels.width, pixels.height)
+    packed = _SPHERE_COLORS
+    for i in range(5):
+        packed[i] = pack_color(colors[i])
+    kernels.fill_sphere(pixels.buf, params, packed)
     return pixels
 
+# Reused parameter blocks for kernels.fill_sphere
+_SPHERE_PARAMS = array.array("i", [0] * 13)
+_SPHERE_COLORS = array.array("I", [0] * 5)
+
 
 ################################################################################
 # region Animation BaseClass
 ################################################################################
+# Results of Animation.coverage()
+COVERAGE_UNKNOWN = None
+COVERAGE_FULL = "full"
+
+# Quality levels of Animation.set_quality(), see QualityGovernor
+QUALITY_LOW = 0
+QUALITY_FULL = 2
+
 class Animation:
     """
     Base class for all animations.
@@ -633,11 +1022,18 @@ class Animation:
     - completed: Animation has finished (if applicable)
     """
     
+    # True if update() draws the same pixels every frame; the 
+    # CompositingManager then draws the animation only once
+    static = False
+    
     def __init__(self, name="BaseAnimation"):
         self.name = name
         self.state = "initialized"
         self.frame_count = 0
         self._background = None
+        self.width = WIDTH    # Grid size (landscape mode), see set_geometry
+        self.height = HEIGHT
+        self.quality = QUALITY_FULL  # See set_quality
         
     def start(self):
         """Start or resume the animation"""
@@ -654,14 +1050,51 @@ class Animation:
         
     def update(self, pixels):
         """
-        Update animation state and draw to pixels dict.
+        Update animation state and draw to pixels (FrameBuffer).
         Override this in subclasses.
-        Returns modified pixels dict.
+        Returns modified FrameBuffer.
         """
         if self.state == "running":
             self.frame_count += 1
         return pixels
     
+    def advance(self, pixels):
+        """
+        Update the animation state like update() but without drawing.
+        Called by the AnimationManager instead of update() while the 
+        animation is completely hidden by the animations above it. The
+        background color is still set, since it is not covered by pixels.
+        The default simply calls update(); subclasses override this to 
+        skip the drawing.
+        """
+        return self.update(pixels)
+    
+    def coverage(self):
+        """
+        Pixels the next update() draws opaquely, used by the 
+        AnimationManager to skip drawing the animations below.
+        
+        Returns:
+        - COVERAGE_UNKNOWN: No guarantee (default)
+        - COVERAGE_FULL: Every pixel of the grid is drawn
+        - (row_min, row_max, col_min, col_max): Exactly the pixels of this
+          box (inclusive, portrait coordinates) are drawn, nothing else
+        """
+        return COVERAGE_UNKNOWN
+    
+    def cycle_phase(self):
+        """
+        Phase of the frame the next update() draws, used by the 
+        CompositingManager to replay rendered layers from its LayerCache.
+        Two frames with the same phase must draw the same pixels (the 
+        state may differ). The phases of a periodic animation repeat 
+        with its period.
+        
+        Returns:
+        - Phase >= 0, or -1 if the next frame cannot be cached (default)
+        """
+        return -1
+    
     def is_running(self):
         """Check if animation is currently running"""
         return self.state == "running"
@@ -673,6 +1106,25 @@ class Animation:
     def set_frame(self, frame):
         """Set the current frame count"""
         self.frame_count = frame
+        
+    def set_geometry(self, width, height):
+        """
+        Set the grid size (landscape mode) the animation draws on.
+        Called by the AnimationManager; subclasses that precompute
+        geometry-dependent state override this to rebuild it.
+        """
+        self.width = width
+        self.height = height
+        
+    def set_quality(self, level):
+        """
+        Set the quality level the animation draws with, from QUALITY_LOW
+        to QUALITY_FULL. Called by the QualityGovernor while frames overrun
+        their time budget; subclasses with expensive frames override this
+        to draw cheaper versions (fewer particles, coarser shapes). Frames
+        below QUALITY_FULL must not be cached, see cycle_phase().
+        """
+        self.quality = level
     
     
 ################################################################################
@@ -686,13 +1138,22 @@ class AnimationManager:
     
     def __init__(self, 
                  loop=True,
-                 frames_between_loops=20):
+                 frames_between_loops=20,
+                 width=WIDTH,
+                 height=HEIGHT):
         self.animations = []
+        self.width = width    # Grid size (landscape mode) of all animations
+        self.height = height
         self.global_frame = 0
         self.loop = loop
         self.duration = -1  # Total duration in frames (None = infinite)
         self.frames_between_loops = frames_between_loops
         self.repeat_count = 0
+        self.tracker = None  # Optional AllocationTracker, per animation
+        self.culling = True  # Skip drawing animations hidden by those above
+        self.culled = 0      # Number of updates skipped by culling
+        self._coverage = []  # Per animation, see cull()
+        self._hidden = bytearray()
         
     def add_animation(self, animation, start_frame=0, duration=None):
         """
@@ -703,12 +1164,15 @@ class AnimationManager:
         - start_frame: Frame number when animation should start (default: 0)
         - duration: How many frames the animation should run (None = infinite)
         """
+        animation.set_geometry(self.width, self.height)
         self.animations.append({
             'animation': animation,
             'start_frame': start_frame,
             'duration': duration,
             'end_frame': start_frame + duration if duration is not None else None
         })
+        self._coverage.append(COVERAGE_UNKNOWN)
+        self._hidden = bytearray(len(self.animations))
         
         if duration is None:
             self.duration = None  # Infinite duration
@@ -718,14 +1182,41 @@ class AnimationManager:
     def update(self, pixels):
         """
         Update all animations based on current global frame.
-        Returns modified pixels dict.
+        Returns modified FrameBuffer.
         """
+        if pixels.width != self.width or pixels.height != self.height:
+            self.set_geometry(pixels.width, pixels.height)
+        
+        self.schedule()
+        
+        if self.culling:
+            self.cull()
+        
+        # Update running animations bottom-up, hidden ones without drawing
+        hidden = self._hidden
+        for k in range(len(self.animations)):
+            animation = self.animations[k]['animation']
+            if animation.get_state() == "running":
+                if self.tracker is not None:
+                    self.tracker.begin()
+                if hidden[k]:
+                    pixels = animation.advance(pixels)
+                    self.culled += 1
+                else:
+                    pixels = animation.update(pixels)
+                if self.tracker is not None:
+                    self.tracker.end(animation.name)
+        
+        self.global_frame += 1
+        return pixels
+    
+    def schedule(self):
+        """Restart the loop if due, then start and stop the animations"""
         if self.loop and self.duration is not None:
             if self.global_frame >= self.duration + self.frames_between_loops:
                 self.global_frame = 0
                 self.repeat_count += 1
-                for anim_info in self.animations:
-                    anim_info['animation'].reset()
+                self.reset_animations()
         
         for anim_info in self.animations:
             animation = anim_info['animation']
@@ -747,17 +1238,66 @@ class AnimationManager:
                     if DEBUG:
                         msg = "Stopping animation (%s) at frame %03d..."
                         print(msg % (animation.name, self.global_frame))
-            
-            # Update animation if running
-            if animation.get_state() == "running":
-                pixels = animation.update(pixels)
-        
-        self.global_frame += 1
-        return pixels
     
+    def cull(self):
+        """
+        Mark the running animations that are completely hidden in the 
+        coming frame, walking the stack top-down: everything below an 
+        animation with full coverage, and animations whose coverage box 
+        lies inside the box of an animation above.
+        """
+        animations = self.animations
+        coverage = self._coverage
+        hidden = self._hidden
+        num = len(animations)
+        full = False
+        for k in range(num - 1, -1, -1):
+            animation = animations[k]['animation']
+            coverage[k] = COVERAGE_UNKNOWN
+            hidden[k] = 0
+            if not animation.is_running():
+                continue
+            if full:
+                hidden[k] = 1
+                continue
+            box = animation.coverage()
+            if box is COVERAGE_FULL:
+                full = True
+            elif box is not COVERAGE_UNKNOWN:
+                for j in range(k + 1, num):
+                    above = coverage[j]
+                    if (above is not COVERAGE_UNKNOWN
+                            and above[0] <= box[0] and box[1] <= above[1]
+                            and above[2] <= box[2] and box[3] <= above[3]):
+                        hidden[k] = 1
+                        break
+                if hidden[k]:
+                    continue
+            coverage[k] = box
+    
+    def set_geometry(self, width, height):
+        """Set the grid size (landscape mode) of the manager and all animations"""
+        self.width = width
+        self.height = height
+        for anim_info in self.animations:
+            anim_info['animation'].set_geometry(width, height)
+        
+    def set_quality(self, level):
+        """Set the quality level of all animations, see Animation.set_quality"""
+        for anim_info in self.animations:
+            anim_info['animation'].set_quality(level)
+        
+    def create_framebuffer(self):
+        """Create a FrameBuffer matching the manager's grid size"""
+        return FrameBuffer(self.width, self.height)
+        
     def reset(self):
         """Reset manager and all animations"""
         self.global_frame = 0
+        self.reset_animations()
+        
+    def reset_animations(self):
+        """Reset all animations to their initial state"""
         for anim_info in self.animations:
             anim_info['animation'].reset()
             
@@ -776,94 +1316,441 @@ class AnimationManager:
         return self.repeat_count
 
 
+################################################################################
+# region CompositingManager
+################################################################################
+class LayerCache:
+    """
+    Rendered layers with least-recently-used eviction.
+    
+    The buffers are allocated up front, as many as fit into max_bytes, so
+    replaying a cached layer does not allocate.
+    """
+    
+    def __init__(self, num, max_bytes):
+        """
+        Parameters:
+        - num: Number of pixels per layer
+        - max_bytes: Memory for the cached pixels (4 bytes per pixel)
+        """
+        self.num = num
+        self.capacity = max_bytes // (4 * num)
+        self.buffers = [array.array("I", [TRANSPARENT] * num) 
+                        for _ in range(self.capacity)]
+        self.keys = array.array("i", [-1] * self.capacity)
+        self.last_used = array.array("I", [0] * self.capacity)
+        self.slots = {}  # key -> slot
+        self.clock = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        
+    def get(self, key):
+        """Cached layer for key (a non-negative int) or None"""
+        slot = self.slots.get(key, -1)
+        if slot < 0:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self.clock += 1
+        self.last_used[slot] = self.clock
+        return self.buffers[slot]
+    
+    def put(self, key, buf):
+        """Store a copy of buf under key, evicting the oldest layer if full"""
+        if self.capacity == 0:
+            return
+        slot = 0
+        for i in range(self.capacity):
+            if self.keys[i] < 0:
+                slot = i
+                break
+            if self.last_used[i] < self.last_used[slot]:
+                slot = i
+        if self.keys[slot] >= 0:
+            del self.slots[self.keys[slot]]
+            self.evictions += 1
+        kernels.blend(self.buffers[slot], buf, BLEND_COPY, 0)
+        self.keys[slot] = key
+        self.clock += 1
+        self.last_used[slot] = self.clock
+        self.slots[key] = slot
+        
+    def stats(self):
+        """Hit/miss counters and occupancy"""
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "entries": len(self.slots),
+            "capacity": self.capacity,
+        }
+
+
+class CompositingManager(AnimationManager):
+    """
+    AnimationManager that renders every animation into its own layer.
+    
+    The layers are composited bottom-up in z order, each with a blend 
+    mode (see kernels.blend): BLEND_REPLACE draws over the layers below 
+    like the AnimationManager does, BLEND_ADD adds the colors, BLEND_ALPHA
+    mixes them and BLEND_MASK only keeps the layers below where the layer
+    is drawn. The background color of the frame is the one of the topmost
+    layer that sets it, not the one of the last animation updated.
+    
+    Static animations (Animation.static) are drawn once when they start 
+    and only advanced afterwards. The composite of the bottom layers that
+    are all static is cached too, so a frame only composites the layers 
+    from the first changing one upwards. With cache_bytes > 0, the layers
+    of the other animations are kept in a LayerCache keyed by their phase
+    (Animation.cycle_phase), so periodic animations and repeated loops 
+    replay their layers instead of drawing them again.
+    
+    The frame is composed from scratch: pixels drawn into the FrameBuffer
+    before update() are overwritten. Occlusion culling is not applied.
+    """
+    
+    def __init__(self, 
+                 loop=True,
+                 frames_between_loops=20,
+                 width=WIDTH,
+                 height=HEIGHT,
+                 cache_bytes=0):
+        """
+        Parameters:
+        - loop: Restart the show after frames_between_loops frames
+        - frames_between_loops: Pause between two loops in frames
+        - width: Grid width (landscape mode)
+        - height: Grid height (landscape mode)
+        - cache_bytes: Memory of the LayerCache (0 = no cache)
+        """
+        super().__init__(loop=loop, 
+                         frames_between_loops=frames_between_loops,
+                         width=width,
+                         height=height)
+        self.cache_bytes = cache_bytes
+        self.cache = None
+        if cache_bytes > 0:
+            self.cache = LayerCache(width * height, cache_bytes)
+        self.layers = []     # FrameBuffer per animation
+        self.order = []      # Animation indices, bottom layer first
+        self.base = FrameBuffer(width, height)  # Cached static composite
+        self.composited = 0  # Number of layers composited since creation
+        self._running = bytearray()
+        self._drawn = bytearray()  # Static layers that are up to date
+        self._version = 0          # Bumped whenever a static layer changes
+        self._base_key = (-1, 0, 0)
+        
+    def add_animation(self, animation, start_frame=0, duration=None,
+                      z=None, blend=BLEND_REPLACE, alpha=1.0):
+        """
+        Add an animation to the manager.
+        
+        Parameters:
+        - animation: Animation instance
+        - start_frame: Frame number when animation should start (default: 0)
+        - duration: How many frames the animation should run (None = infinite)
+        - z: Layer order, higher is on top (default: order of addition)
+        - blend: Blend mode of the layer (BLEND_REPLACE, BLEND_ADD, 
+                 BLEND_ALPHA or BLEND_MASK)
+        - alpha: Opacity of the layer for BLEND_ALPHA, 0.0 to 1.0
+        """
+        super().add_animation(animation, start_frame, duration)
+        anim_info = self.animations[-1]
+        anim_info['z'] = len(self.animations) - 1 if z is None else z
+        anim_info['op'] = blend | (int(alpha * 256) << 8)
+        self.layers.append(FrameBuffer(self.width, self.height))
+        self.order = sorted(range(len(self.animations)),
+                            key=lambda k: self.animations[k]['z'])
+        self._running = bytearray(len(self.animations))
+        self._drawn = bytearray(len(self.animations))
+        self._version += 1
+        
+    def update(self, pixels):
+        """
+        Update all animations and composite their layers into pixels.
+        Returns modified FrameBuffer.
+        """
+        if pixels.width != self.width or pixels.height != self.height:
+            self.set_geometry(pixels.width, pixels.height)
+        
+        self.schedule()
+        
+        # Render the layers, static ones only when they (re)start
+        running = self._running
+        drawn = self._drawn
+        background = TRANSPARENT
+        for k in self.order:
+            animation = self.animations[k]['animation']
+            running[k] = animation.get_state() == "running"
+            if not running[k]:
+                if drawn[k]:
+                    drawn[k] = 0
+                    self._version += 1
+                continue
+            layer = self.layers[k]
+            if self.tracker is not None:
+                self.tracker.begin()
+            if drawn[k]:
+                animation.advance(layer)
+            else:
+                key = -1
+                if self.cache is not None and not animation.static:
+                    phase = animation.cycle_phase()
+                    if phase >= 0:
+                        key = phase * len(self.animations) + k
+                cached = None if key < 0 else self.cache.get(key)
+                layer.background = TRANSPARENT  # Not set by the animation
+                if cached is not None:
+                    animation.advance(layer)
+                    kernels.blend(layer.buf, cached, BLEND_COPY, 0)
+                else:
+                    kernels.fill(layer.buf, TRANSPARENT, layer.num)
+                    animation.update(layer)
+                    if key >= 0:
+                        self.cache.put(key, layer.buf)
+                if animation.static:
+                    drawn[k] = 1
+                    self._version += 1
+            if self.tracker is not None:
+                self.tracker.end(animation.name)
+            if layer.background != TRANSPARENT:
+                background = layer.background
+        if background == TRANSPARENT:
+            background = pixels.background
+        pixels.background = background
+        
+        # Bottom layers that are static: composited once into self.base
+        order = self.order
+        num_static = 0
+        for pos in range(len(order)):
+            if running[order[pos]]:
+                if not drawn[order[pos]]:
+                    break
+                num_static = pos + 1
+        buf = pixels.buf
+        if num_static > 0:
+            key = self._base_key
+            if (key[0] != self._version or key[1] != background 
+                    or key[2] != num_static):
+                base = self.base.buf
+                kernels.fill(base, TRANSPARENT, self.base.num)
+                self.composite(base, 0, num_static, background)
+                self._base_key = (self._version, background, num_static)
+            kernels.blend(buf, self.base.buf, BLEND_COPY, 0)
+        else:
+            kernels.fill(buf, TRANSPARENT, pixels.num)
+        self.composite(buf, num_static, len(order), background)
+        
+        self.global_frame += 1
+        return pixels
+    
+    def composite(self, buf, first, last, background):
+        """Blend the running layers order[first:last] onto buf"""
+        running = self._running
+        for pos in range(first, last):
+            k = self.order[pos]
+            if running[k]:
+                kernels.blend(buf, self.layers[k].buf, 
+                              self.animations[k]['op'], background)
+                self.composited += 1
+    
+    def set_geometry(self, width, height):
+        """Set the grid size and reallocate the layers"""
+        super().set_geometry(width, height)
+        self.layers = [FrameBuffer(width, height) for _ in self.animations]
+        self.base = FrameBuffer(width, height)
+        if self.cache is not None:
+            self.cache = LayerCache(width * height, self.cache_bytes)
+        self.invalidate()
+        
+    def reset_animations(self):
+        super().reset_animations()
+        self.invalidate()
+        
+    def set_frame(self, frame):
+        super().set_frame(frame)
+        self.invalidate()
+        
+    def invalidate(self):
+        """Redraw all static layers in the next frame"""
+        for k in range(len(self._drawn)):
+            self._drawn[k] = 0
+        self._version += 1
+
+
 ################################################################################
 # region ChristmasTreeAnimation
 ################################################################################
 class ChristmasTreeAnimation(Animation):
     """Static Christmas tree display"""
     
+    static = True
+    
     def __init__(self, name="Christmas tree"):
         super().__init__(name=name)
+        self.sprite = load_sprite("TREE_SPRITE", draw_xmas_tree)
         
     def update(self, pixels):
         if self.is_running():
-            pixels = draw_xmas_tree(pixels)
+            # Same position as draw_xmas_tree: bottom aligned, centered
+            pixels = draw_sprite(pixels, self.sprite, 
+                                 pixels.width - 16, pixels.height // 2 - 5)
             self.frame_count += 1
         return pixels
-
-
-################################################################################
-# region SnowflakeAnimation
+    
+    def advance(self, pixels):
+        if self.is_running():
+            self.frame_count += 1
+        return pixels
+    
+    def cycle_phase(self):
+        return 0
+
+
+################################################################################
+# region SnowflakeAnimation
 ################################################################################
 class SnowflakeAnimation(Animation):
     
+    # Snowflake rows are kept in fixed point with 8 fractional bits, so
+    # fractional speeds need no float arithmetic (floats allocate on the Pico)
+    FRAC_BITS = 8
+    
     def __init__(self, n=25, 
                  speed=1,
                  melt_prob=0.05, 
                  name="Snowflake"):
         super().__init__(name=name)
         self.num_snowflakes = n
-        self.snowflakes = []
         self.speed = speed
         self.melt_prob = melt_prob
         self.enable_melting = False
-        
+        self.speed_fp = int(speed * (1 << self.FRAC_BITS))
+        self.melt_threshold = int(melt_prob * 65536)
         random.seed(42)
+        self.sample_snowflakes(random.choice)
+        
+    def set_geometry(self, width, height):
+        changed = (width, height) != (self.width, self.height)
+        super().set_geometry(width, height)
+        if changed:
+            # Own generator: reseeding or drawing from the global one would
+            # change the frames of the other animations using random
+            self._seed = 42
+            self.sample_snowflakes(self._choice)
+        
+    def _choice(self, options):
+        # xorshift32, the same columns for a grid size every time
+        x = self._seed
+        x ^= (x << 13) & 0xFFFFFFFF
+        x ^= x >> 17
+        x ^= (x << 5) & 0xFFFFFFFF
+        self._seed = x
+        return options[x % len(options)]
+        
+    def sample_snowflakes(self, choice):
+        """
+        Sample the snowflake columns for the current grid size.
+        
+        Parameters:
+        - choice: Function picking a random element of a list
+        """
+        n = self.num_snowflakes
         cols = []
-        for _ in range(self.num_snowflakes):
-            cols.append(self.sample_snowflake_cols(cols))
-            
-        for i in range(self.num_snowflakes):
-            snowflake = {
-                'row': self.sample_row(cols, i),
-                'col': cols[i],
-                'visible': True,
-            }
-            self.snowflakes.append(snowflake)
+        for _ in range(n):
+            cols.append(self.sample_snowflake_cols(cols, choice))
+        
+        # Snowflake state as parallel arrays (row in fixed point)
+        self.flake_rows = array.array("i", [0] * n)
+        self.flake_cols = array.array("H", cols)
+        self.flake_visible = bytearray(n)
+        for i in range(n):
+            self.flake_rows[i] = self.sample_row(cols, i) << self.FRAC_BITS
+            self.flake_visible[i] = 1
+        self.num_melted = 0
             
-        max_row = max([flake['row'] for flake in self.snowflakes])
+        max_row = max([self.sample_row(cols, i) for i in range(n)])
         self.max_snowflake_row = max_row + 2
         
+        # The flakes move in lockstep and wrap exactly at the bottom if the
+        # speed divides the wrap row and all start rows; then the pattern
+        # repeats every period frames (0: not periodic)
+        wrap_row = max(self.max_snowflake_row, self.width) << self.FRAC_BITS
+        speed = self.speed_fp
+        self.period = 0
+        if (speed > 0 and wrap_row % speed == 0 
+                and all(row % speed == 0 for row in self.flake_rows)):
+            self.period = wrap_row // speed
+        
     def reset(self):
         super().reset()
-        for i, flake in enumerate(self.snowflakes):
-            flake['row'] = float(i * 2)
-            flake['visible'] = True
+        for i in range(self.num_snowflakes):
+            self.flake_rows[i] = (i * 2) << self.FRAC_BITS
+            self.flake_visible[i] = 1
+        self.num_melted = 0
+        
+    def cycle_phase(self):
+        # Flake 0 starts at row 0, so its row gives the phase of all flakes
+        if (self.period == 0 or self.enable_melting or self.num_melted > 0
+                or self.quality < QUALITY_FULL):
+            return -1
+        return (self.flake_rows[0] // self.speed_fp + 1) % self.period
             
-    def sample_snowflake_cols(self, cols):
+    def sample_snowflake_cols(self, cols, choice=random.choice):
         last_flakes = set(cols[-5:])
-        candidates = set(range(HEIGHT))
+        candidates = set(range(self.height))
         available = list(candidates - last_flakes)
-        return random.choice(available)
+        return choice(available)
     
     def sample_row(self, cols, i):
         return i * 2
     
     def update(self, pixels):
+        pixels = self.advance(pixels)
+        if not self.is_running():
+            return pixels
+        
+        rows = self.flake_rows
+        visible = self.flake_visible
+        cols = self.flake_cols
+        # Below full quality only a part of the flakes is drawn; all of 
+        # them keep moving, so they are back in place at full quality
+        count = self.num_snowflakes * (self.quality + 1) // (QUALITY_FULL + 1)
+        for i in range(count):
+            row = rows[i] >> self.FRAC_BITS
+            if row < pixels.width and visible[i]:
+                pixels[p2i(row, cols[i], pixels.width)] = WHITE
+        
+        return pixels
+    
+    def advance(self, pixels):
         pixels["background"] = DARK_BLUE
         if not self.is_running():
             return pixels
         
-        for flake in self.snowflakes:
+        rows = self.flake_rows
+        visible = self.flake_visible
+        wrap_row = max(self.max_snowflake_row, pixels.width) << self.FRAC_BITS
+        for i in range(self.num_snowflakes):
             # Move snowflake down every frame
-            flake['row'] += self.speed
+            rows[i] += self.speed_fp
             # Randomly decide if snowflake disappears
-            if random.random() < self.melt_prob and self.enable_melting:
-                flake['visible'] = False
+            if self.enable_melting and random.getrandbits(16) < self.melt_threshold:
+                if visible[i]:
+                    visible[i] = 0
+                    self.num_melted += 1
             
             # Reset to top if reached bottom
-            if flake['row'] >= max(self.max_snowflake_row, WIDTH):
-                flake['row'] = 0.0
-                flake['visible'] = True
+            if rows[i] >= wrap_row:
+                rows[i] = 0
+                if not visible[i]:
+                    visible[i] = 1
+                    self.num_melted -= 1
                 
         self.frame_count += 1
-        
-        for flake in self.snowflakes:
-            if flake['row'] < WIDTH and flake['visible']:
-                row = int(flake['row'])
-                col = int(flake['col'])
-                pixels[p2i(row, col)] = WHITE
-        
         return pixels
         
         
@@ -898,6 +1785,7 @@ class TextFlashAnimation(Animation):
                  name="Text flash"):
         super().__init__(name=name)
         self.text = text.replace(' ', '')  # Remove spaces for scrolling
+        self.chars = [char for char in self.text]  # Indexing a str allocates
         self.color = color
         self.background_color = background_color
         self.box_color = box_color
@@ -932,20 +1820,34 @@ class TextFlashAnimation(Animation):
         if not self.is_running():
             return pixels
         
-        if self.background_color is not None:
-            pixels["background"] = self.background_color
-        
-        self.frame_count += 1
-        if (self.frame_count < self.frames_on):
+        pixels = self.advance(pixels)
+        # advance() restarts the count at 0 when moving to the next char
+        if 0 < self.frame_count < self.frames_on:
             pixels = self.font.draw(pixels, 
-                                    self.text[self.char_index],
+                                    self.chars[self.char_index],
                                     row_offset=self.offset[0], 
                                     col_offset=self.offset[1],
                                     color=self.color,
                                     bg_color=self.box_color,
                                     margins=self.box_margins,
                                     variable_box=self.variable_box)
-        elif self.frame_count >= self.frames_on + self.frames_off:
+        return pixels
+    
+    def cycle_phase(self):
+        # One period per character, the whole text repeats
+        period = self.frames_on + self.frames_off
+        return ((self.char_index * period + self.frame_count + 1) 
+                % (len(self.chars) * period))
+        
+    def advance(self, pixels):
+        if not self.is_running():
+            return pixels
+        
+        if self.background_color is not None:
+            pixels["background"] = self.background_color
+        
+        self.frame_count += 1
+        if self.frame_count >= self.frames_on + self.frames_off:
             self.frame_count = 0
             new_char_index = (self.char_index + 1)
             self.char_index = new_char_index % len(self.text)
@@ -985,22 +1887,41 @@ class TextScrollAnimation(Animation):
         self.font = select_font(font_size)
         
         # Compute variable widths of characters
+        self.chars = [char for char in self.text]  # Indexing a str allocates
         self.widths = []
         self.offsets = []
+        self.starts = []  # Column where each character starts in the text
+        total_width = 0
         for char in self.text:
             char_width = self.font.get_char_width(char)
             char_bounds = self.font.get_char_bounds(char)
             self.offsets.append(char_bounds[0])
             self.widths.append(char_width + 2)  # Add 2 pixels spacing
+            self.starts.append(total_width)
+            total_width += char_width + 2
+        self.total_width = total_width
+        
+        # The text is drawn into a bit plane that scrolls along with it, 
+        # only the columns scrolled in on the right are drawn each frame
+        self.plane = BitPlane(self.width, self.height)
+        self.plane_offset = -1  # Scroll offset shown by the plane, -1 = none
             
     def reset(self):
         super().reset()
         self.scroll_offset = 0
+        self.plane_offset = -1
+        
+    def set_geometry(self, width, height):
+        changed = (width, height) != (self.width, self.height)
+        super().set_geometry(width, height)
+        if changed:
+            self.plane = BitPlane(width, height)
+            self.plane_offset = -1
         
     def set_frame(self, frame):
         if frame < 0:
             return
-        total_width = sum(self.widths)
+        total_width = self.total_width
         scroll_offset = frame * self.scroll_speed
         if not self.loop and scroll_offset > total_width:
             self.stop()
@@ -1013,23 +1934,46 @@ class TextScrollAnimation(Animation):
         if not self.is_running():
             return pixels
         
+        scroll_offset = int(self.scroll_offset)
+        plane = self.plane
+        if plane.width != pixels.width or plane.height != pixels.height:
+            self.set_geometry(pixels.width, pixels.height)
+            plane = self.plane
+        delta = scroll_offset - self.plane_offset
+        if self.plane_offset < 0 or delta < 0 or delta >= pixels.height:
+            plane.clear()
+            first_col = 0
+        else:
+            plane.scroll(delta)
+            first_col = pixels.height - delta
+        self.plane_offset = scroll_offset
+        
+        # Draw the characters that reach into the new columns. Glyphs are
+        # ORed in, so redrawing the part that is already there is harmless.
+        if first_col < pixels.height:
+            for i in range(len(self.chars)):
+                start = self.offset[1] + self.starts[i] - scroll_offset
+                if start >= pixels.height:
+                    break  # This and all following characters are right of the grid
+                if start + self.widths[i] - 2 > first_col:
+                    plane.draw_glyph(self.font, self.chars[i], 
+                                     self.offset[0], start - self.offsets[i])
+        plane.composite(pixels, pack_color(self.color))
+        return self.advance(pixels)
+    
+    def cycle_phase(self):
+        return int(self.scroll_offset)
+    
+    def advance(self, pixels):
+        if not self.is_running():
+            return pixels
+        
         if self.background_color is not None:
             pixels["background"] = self.background_color
         
         self.frame_count += 1
-        for i, char in enumerate(self.text):
-            scroll_offset = int(self.scroll_offset)
-            col_offset = (self.offset[1] + sum(self.widths[:i]) 
-                          - scroll_offset - self.offsets[i])
-            # Only draw character if within visible area
-            if -self.widths[i] < col_offset < WIDTH:
-                pixels = self.font.draw(pixels, 
-                                        char,
-                                        row_offset=self.offset[0], 
-                                        col_offset=col_offset,
-                                        color=self.color)
         self.scroll_offset += self.scroll_speed
-        if self.scroll_offset > sum(self.widths) + self.offset[1]:
+        if self.scroll_offset > self.total_width + self.offset[1]:
             self.scroll_offset = 0
             if not self.loop:
                 self.stop()
@@ -1053,8 +1997,8 @@ class StarOfBethlehemAnimation(Animation):
     """
     
     def __init__(self, 
-                 start_pos=(1, 4),
-                 end_pos=(7, 4),
+                 start_pos=None,
+                 end_pos=None,
                  wait_frames=100, 
                  growth_frames=50, 
                  explosion_frames=30,
@@ -1066,8 +2010,13 @@ class StarOfBethlehemAnimation(Animation):
         self.explosion_frames = explosion_frames
         self.explosion_colors = (DARK_BLUE, WHITE, BRIGHT_YELLOW, YELLOW, ORANGE)
         
+        # Default positions: above the tree and at the tree top (see
+        # draw_xmas_tree), (1, 4) and (7, 4) on the 16x10 grid
+        self.fixed_start_pos = start_pos
+        self.fixed_end_pos = end_pos
         self.start_pos = start_pos
         self.end_pos = end_pos
+        self.place_star()
         
         self.phase = 'waiting'  # waiting, growing, exploding, uniform_screen
         self.phase_starts = dict(waiting=0, 
@@ -1077,6 +2026,59 @@ class StarOfBethlehemAnimation(Animation):
         self.star_size = 1
         self.sphere_radius = 0
         self.phase_frame = 0
+        self.star_pos = [self.start_pos[0], self.start_pos[1]]  # Reused, see update()
+        
+        # Sphere radius and fill_sphere parameters of every explosion frame
+        # are computed once, so the explosion needs no float arithmetic
+        self.explosion_packed = array.array("I", [pack_color(c) for c in self.explosion_colors])
+        self.explosion_radii = []
+        self.explosion_params = []
+        self.prepare_explosion()
+        
+    def place_star(self):
+        """Compute start and end position for the current grid size"""
+        center_col = self.height // 2 - 1
+        if self.fixed_start_pos is None:
+            self.start_pos = (1, center_col)
+        if self.fixed_end_pos is None:
+            self.end_pos = (self.width - 9, center_col)
+        
+    def set_geometry(self, width, height):
+        changed = (width, height) != (self.width, self.height)
+        super().set_geometry(width, height)
+        if changed:
+            self.place_star()
+            self.prepare_explosion()
+        
+    def prepare_explosion(self):
+        """Precompute the sphere of every explosion frame for the grid size"""
+        # Final radius 52 on the 16x10 grid, scaled with the grid
+        span = 50 * max(self.width, self.height) // 16
+        self.explosion_radii = []
+        self.explosion_params = []
+        self.explosion_full = bytearray(self.explosion_frames + 1)
+        for phase_frame in range(self.explosion_frames + 1):
+            progress = phase_frame / self.explosion_frames
+            radius = 2 + (progress * span)
+            params = array.array("i", [0] * 13)
+            sphere_params(params, self.end_pos, radius, self.width, self.height,
+                          self.sphere_block())
+            self.explosion_radii.append(radius)
+            self.explosion_params.append(params)
+            # The disc covers the grid once it contains all four corners
+            self.explosion_full[phase_frame] = all(
+                (row - params[5])**2 + (col - params[6])**2 <= params[11]
+                for row in (0, self.width - 1) for col in (0, self.height - 1))
+        
+    def sphere_block(self):
+        """Block size of the explosion sphere at the current quality level"""
+        return 1 + QUALITY_FULL - self.quality
+        
+    def set_quality(self, level):
+        super().set_quality(level)
+        block = self.sphere_block()
+        for params in self.explosion_params:
+            params[12] = block
         
     def reset(self):
         super().reset()
@@ -1101,19 +2103,65 @@ class StarOfBethlehemAnimation(Animation):
             self.phase = 'uniform_screen'
             self.phase_frame = frame - self.phase_starts['uniform_screen']
         
+    def coverage(self):
+        # Only the explosion draws every pixel, once the disc is big enough
+        # (the uniform screen just sets the background color); coarse 
+        # blocks may leave the corners out
+        if self.phase == 'exploding' and self.quality == QUALITY_FULL:
+            pf = min(self.phase_frame + 1, self.explosion_frames)
+            if self.explosion_full[pf]:
+                return COVERAGE_FULL
+        return COVERAGE_UNKNOWN
+    
+    def cycle_phase(self):
+        # The waiting star and the uniform screen never change, the growth
+        # and explosion frames are numbered after them
+        pf = self.phase_frame + 1
+        if self.phase == 'waiting':
+            return 0
+        elif self.phase == 'growing':
+            return pf
+        elif self.phase == 'exploding':
+            if self.quality < QUALITY_FULL:
+                return -1
+            return 1 + self.growth_frames + min(pf, self.explosion_frames)
+        return 2 + self.growth_frames + self.explosion_frames
+        
     def update(self, pixels):
         if not self.is_running():
             return pixels
         
-        self.frame_count += 1
-        self.phase_frame += 1
+        # advance() moves on to the next phase after its last frame, which 
+        # still has to be drawn
+        phase = self.phase
+        pf = self.phase_frame + 1
+        pixels = self.advance(pixels)
         
-        if self.phase == 'waiting':
+        if phase == 'waiting':
             # Draw small star above tree
             pixels = draw_star_of_bethlehem(pixels, 
                                             position=self.start_pos, 
                                             size=1)
-            
+        elif phase == 'growing':
+            pixels = draw_star_of_bethlehem(pixels, 
+                                            position=self.star_pos, 
+                                            size=self.star_size)
+        elif phase == 'exploding':
+            # Star transforms into expanding sphere
+            pf = min(pf, self.explosion_frames)
+            kernels.fill_sphere(pixels.buf, 
+                                self.explosion_params[pf], 
+                                self.explosion_packed)
+        return pixels
+    
+    def advance(self, pixels):
+        if not self.is_running():
+            return pixels
+        
+        self.frame_count += 1
+        self.phase_frame += 1
+        
+        if self.phase == 'waiting':
             if self.phase_frame >= self.wait_frames:
                 self.phase = 'growing'
                 self.phase_frame = 0
@@ -1122,17 +2170,14 @@ class StarOfBethlehemAnimation(Animation):
                     print(msg % (self.frame_count))
                 
         elif self.phase == 'growing':
-            # Star grows from size 1 to 4
-            progress = self.phase_frame / self.growth_frames
-            self.star_size = 1 + int(progress**2 * 4)
-            pos = (
-                int(self.start_pos[0] + (self.end_pos[0] - self.start_pos[0]) * progress),
-                int(self.start_pos[1] + (self.end_pos[1] - self.start_pos[1]) * progress)
-            )
-            
-            pixels = draw_star_of_bethlehem(pixels, 
-                                            position=pos, 
-                                            size=self.star_size)
+            # Star grows from size 1 to 4, with progress = phase_frame / growth_frames
+            # (integer math: floor(a + (b-a) * progress) for positions >= 0)
+            pf = self.phase_frame
+            n = self.growth_frames
+            self.star_size = 1 + (4 * pf * pf) // (n * n)
+            pos = self.star_pos
+            pos[0] = self.start_pos[0] + ((self.end_pos[0] - self.start_pos[0]) * pf) // n
+            pos[1] = self.start_pos[1] + ((self.end_pos[1] - self.start_pos[1]) * pf) // n
             
             if self.phase_frame >= self.growth_frames:
                 self.phase = 'exploding'
@@ -1142,13 +2187,8 @@ class StarOfBethlehemAnimation(Animation):
                     print(msg % (self.frame_count))
                 
         elif self.phase == 'exploding':
-            # Star transforms into expanding sphere
-            progress = self.phase_frame / self.explosion_frames
-            self.sphere_radius = 2 + (progress * 50)
-            pixels = draw_expanding_sphere(pixels, 
-                                           center=self.end_pos, 
-                                           radius=self.sphere_radius,
-                                           colors=self.explosion_colors)
+            pf = min(self.phase_frame, self.explosion_frames)
+            self.sphere_radius = self.explosion_radii[pf]
             
             if self.phase_frame >= self.explosion_frames:
                 self.phase = 'uniform_screen'
@@ -1186,12 +2226,37 @@ class FireworkAnimation(Animation):
         if colors is None:
             colors = [RED, GREEN, BLUE, YELLOW, MAGENTA]
         self.colors = colors
+        self.packed_colors = array.array("I", [pack_color(c) for c in colors])
         self.background_color = background_color
-        self.particles = []  # List of active particles
+        
+        # Spawn rate in 1/65536 units, compared against random.getrandbits(16)
+        self.initial_spawn_threshold = int(initial_spawn_rate * 65536)
+        self.final_spawn_threshold = int(final_spawn_rate * 65536)
+        
+        self.allocate_particles()
+        
+    def set_geometry(self, width, height):
+        changed = (width, height) != (self.width, self.height)
+        super().set_geometry(width, height)
+        if changed:
+            self.allocate_particles()
+        
+    def allocate_particles(self):
+        """Allocate the particle pool for the current grid size"""
+        # Active particles live in a preallocated ring buffer. All particles
+        # have the same lifetime, so they expire in the order they were spawned.
+        spawn_cells = ((self.width + 1) // 2) * ((self.height + 1) // 2)
+        self.capacity = spawn_cells * max(self.particle_lifetime, 1)
+        self.particle_index = array.array("I", [0] * self.capacity)  # Pixel index
+        self.particle_color = array.array("I", [0] * self.capacity)  # Packed color
+        self.particle_lifetime_left = bytearray(self.capacity)
+        self.particle_head = 0   # Oldest particle
+        self.particle_count = 0  # Number of active particles
         
     def reset(self):
         super().reset()
-        self.particles = []
+        self.particle_head = 0
+        self.particle_count = 0
         
     def set_frame(self, frame):
         if frame < 0:
@@ -1204,176 +2269,1434 @@ class FireworkAnimation(Animation):
         
         self.frame_count += 1
         pixels["background"] = self.background_color
+        self.spawn_particles(pixels)
+        self.age_particles(pixels.buf)
+        return pixels
+    
+    def advance(self, pixels):
+        if not self.is_running():
+            return pixels
         
+        self.frame_count += 1
+        pixels["background"] = self.background_color
+        self.spawn_particles(pixels)
+        self.age_particles(None)
+        return pixels
+    
+    def spawn_particles(self, pixels):
+        """Spawn the new particles of the current frame"""
         # Calculate current spawn rate based on progress
-        progress = self.frame_count / self.spawn_ramp_duration
-        progress = min(max(progress, 0.0), 1.0)
-        current_spawn_rate = (self.initial_spawn_rate + 
-                              (self.final_spawn_rate - self.initial_spawn_rate) * progress)
+        ramp = self.spawn_ramp_duration
+        progress = min(max(self.frame_count, 0), ramp)
+        spawn_threshold = (self.initial_spawn_threshold + 
+                           (self.final_spawn_threshold - self.initial_spawn_threshold) 
+                           * progress // ramp)
+        # Fewer particles below full quality
+        spawn_threshold = spawn_threshold * (self.quality + 1) // (QUALITY_FULL + 1)
         
         # Spawn new particles
-        for row in range(0, WIDTH, 2):
-            for col in range(0, HEIGHT, 2):
-                if random.random() < current_spawn_rate:
-                    particle = {
-                        'row': row,
-                        'col': col,
-                        'lifetime': self.particle_lifetime,
-                        'color': random.choice(self.colors)
-                    }
-                    self.particles.append(particle)
-        
-        # Update and draw particles
-        new_particles = []
-        for particle in self.particles:
-            if particle['lifetime'] > 0:
-                pixels[p2i(particle['row'], particle['col'])] = particle['color']
-                particle['lifetime'] -= 1
-                new_particles.append(particle)
-        
-        self.particles = new_particles
+        capacity = self.capacity
+        num_colors = len(self.packed_colors)
+        for row in range(0, pixels.width, 2):
+            for col in range(0, pixels.height, 2):
+                if random.getrandbits(16) < spawn_threshold:
+                    if self.particle_count == capacity:
+                        continue
+                    slot = (self.particle_head + self.particle_count) % capacity
+                    self.particle_index[slot] = p2i(row, col, pixels.width)
+                    self.particle_color[slot] = self.packed_colors[random.getrandbits(8) % num_colors]
+                    self.particle_lifetime_left[slot] = self.particle_lifetime
+                    self.particle_count += 1
+    
+    def age_particles(self, buf):
+        """Draw the particles into buf (unless None) and age them by a frame"""
+        # Update and draw particles, oldest first
+        capacity = self.capacity
+        lifetime_left = self.particle_lifetime_left
+        slot = self.particle_head
+        for _ in range(self.particle_count):
+            if lifetime_left[slot] > 0:
+                if buf is not None:
+                    buf[self.particle_index[slot]] = self.particle_color[slot]
+                lifetime_left[slot] -= 1
+            slot = (slot + 1) % capacity
         
-        return pixels
+        # Drop expired particles
+        while self.particle_count > 0 and lifetime_left[self.particle_head] == 0:
+            self.particle_head = (self.particle_head + 1) % capacity
+            self.particle_count -= 1
     
     
 ################################################################################
-# region Rendering
+# region Rainbow Animations
 ################################################################################
-def render_pico(strip, pixels):
-    """Render pixel dictionary to LED strip"""
-    background = pixels.pop('background', DARK_BLUE)
-    strip.pixels_fill(background)
-    
-    for idx, color in pixels.items():
-        if isinstance(idx, str):  # Skip special keys like "background"
-            continue
-        if 0 <= idx < 160:
-            strip.pixels_set(idx, color)
-    
-    strip.pixels_show()
+class RainbowAnimation(Animation):
+    """
+    Rainbow running along the LED chain, like NeoPixel.rainbow_cycle.
     
+    The wheel colors are computed once (kernels.make_wheel_table) and 
+    every pixel has a fixed position on the wheel, so a frame only 
+    rotates the wheel: kernels.gather looks up each pixel at its 
+    position plus the current offset.
     
-class RendererBase:
-    """Base class for rendering pixel data to different targets"""
+    Parameters:
+    - level: Maximum channel value of the wheel colors
+    - size: Number of wheel colors (a power of two)
+    - speed: Wheel steps per frame
+    - spread: How many times the wheel repeats along the chain
+    """
     
-    def __init__(self, width=16, height=10):
-        """
-        Initialize renderer with grid dimensions.
+    def __init__(self, level=8, size=32, speed=1, spread=8, name="Rainbow"):
+        super().__init__(name=name)
+        assert size & (size - 1) == 0, "Wheel size must be a power of two"
+        self.table = kernels.make_wheel_table(size, level)
+        self.speed = speed
+        self.spread = spread
+        self.offset = 0
+        self.place_pixels()
         
-        Parameters:
-        - width: Grid width (landscape mode)
-        - height: Grid height (landscape mode)
-        """
-        self.width = width
-        self.height = height
-        self.is_rendering = False
+    def set_geometry(self, width, height):
+        changed = (width, height) != (self.width, self.height)
+        super().set_geometry(width, height)
+        if changed:
+            self.place_pixels()
+            
+    def place_pixels(self):
+        """Compute the wheel position of every pixel for the grid size"""
+        num = self.width * self.height
+        size = len(self.table)
+        self.positions = array.array(
+            "H", [(i * size * self.spread // num) % size for i in range(num)])
         
-    def start(self):
-        """Start/initialize the renderer"""
-        self.is_rendering = True
+    def reset(self):
+        super().reset()
+        self.offset = 0
         
-    def stop(self):
-        """Stop/cleanup the renderer"""
-        self.is_rendering = False
+    def set_frame(self, frame):
+        if frame < 0:
+            return
+        self.frame_count = frame
+        self.offset = (frame * self.speed) % len(self.table)
         
-    def render(self, pixels):
-        """
-        Render pixel dictionary to target.
+    def coverage(self):
+        return COVERAGE_FULL
+    
+    def cycle_phase(self):
+        return self.offset
         
-        Parameters:
-        - pixels: Dictionary with integer indices as keys, RGB tuples as values
-                  Special key "background" for background color
+    def update(self, pixels):
+        if not self.is_running():
+            return pixels
+        kernels.gather(pixels.buf, self.positions, self.table, self.offset)
+        return self.advance(pixels)
+    
+    def advance(self, pixels):
+        if self.is_running():
+            self.frame_count += 1
+            self.offset = (self.offset + self.speed) % len(self.table)
+        return pixels
+    
+    
+class HueCycleAnimation(RainbowAnimation):
+    """
+    Background color cycling through the color wheel.
+    
+    Only the background is set, so the animations above draw over it.
+    
+    Parameters:
+    - level: Maximum channel value of the wheel colors
+    - size: Number of wheel colors (a power of two)
+    - speed: Wheel steps per frame
+    """
+    
+    def __init__(self, level=4, size=64, speed=1, name="Hue cycle"):
+        super().__init__(level=level, size=size, speed=speed, name=name)
         
-        Must be implemented by subclasses.
-        """
-        raise NotImplementedError("Subclasses must implement render method")
-
-
+    def place_pixels(self):
+        pass  # Same color everywhere
+        
+    def coverage(self):
+        return COVERAGE_UNKNOWN
+        
+    def update(self, pixels):
+        return self.advance(pixels)
+    
+    def advance(self, pixels):
+        if self.is_running():
+            pixels.background = self.table[self.offset]
+        return super().advance(pixels)
+    
+    
 ################################################################################
-# region NeoPixelRenderer
+# region Procedural Effects
 ################################################################################
-class NeoPixelRenderer(RendererBase):
-    """Renderer for NeoPixel LED strips (MicroPython)"""
+# The effects below only use integer table lookups and adds per pixel and
+# frame (see fastmath.py). Everything that needs sin or sqrt is computed 
+# per grid size in place_pixels().
+
+class PlasmaAnimation(Animation):
+    """
+    Plasma: three sine waves, along the rows, along the columns and 
+    around the center, added up and colored with a color wheel. A frame
+    moves every wave by its speed (kernels.plasma).
     
-    def __init__(self, brightness=0.8, width=WIDTH, height=HEIGHT):
-        """
-        Initialize NeoPixel renderer.
+    Parameters:
+    - level: Maximum channel value of the colors
+    - scale: Wave angle per pixel (256 = one period per pixel)
+    - speeds: Angle steps per frame of the three waves
+    """
+    
+    def __init__(self, level=8, scale=16, speeds=(3, -2, 5), name="Plasma"):
+        super().__init__(name=name)
+        self.scale = scale
+        self.speeds = speeds
+        # Sine table followed by the colors, as kernels.plasma expects
+        self.tables = (array.array("I", fastmath.SIN_TABLE)
+                       + kernels.make_wheel_table(256, level))
+        self.params = array.array("i", [3, 0, 0, 0])
+        self.phase = 0  # Frame number modulo 256
+        self.place_pixels()
         
-        Parameters:
-        - strip: NeoPixel strip object
-        - brightness: LED brightness (0.0 to 1.0)
-        - width: Grid width
-        - height: Grid height
-        """
-        super().__init__(width, height)
-        strip = NeoPixel()
-        strip.brightness = brightness
-        self.strip = strip
-        self.strip.brightness = brightness
+    def set_geometry(self, width, height):
+        changed = (width, height) != (self.width, self.height)
+        super().set_geometry(width, height)
+        if changed:
+            self.place_pixels()
+            
+    def place_pixels(self):
+        """Compute the wave angles of every pixel for the grid size"""
+        width, height = self.width, self.height
+        num = width * height
+        scale = self.scale
+        center = (width // 2, height // 2)
+        distances = fastmath.distance_table(width, height, center, scale)
+        self.indices = array.array("H", [0] * (3 * num))
+        for i in range(num):
+            row, col = index2pixel(i, width)
+            self.indices[i] = (row * scale) & 0xFF
+            self.indices[num + i] = (col * scale) & 0xFF
+            self.indices[2 * num + i] = distances[i] & 0xFF
+            
+    def reset(self):
+        super().reset()
+        self.phase = 0
         
-    def render(self, pixels):
-        """Render to NeoPixel strip"""
-        if not self.is_rendering:
+    def set_frame(self, frame):
+        if frame < 0:
             return
+        self.frame_count = frame
+        self.phase = frame & 0xFF
         
-        background = pixels.pop('background', DARK_BLUE)
-        self.strip.pixels_fill(background)
-        
-        for idx, color in pixels.items():
-            if isinstance(idx, str):  # Skip special keys like "background"
-                continue
-            if 0 <= idx < self.width * self.height:
-                self.strip.pixels_set(idx, color)
-        self.strip.pixels_show()
+    def coverage(self):
+        return COVERAGE_FULL
+    
+    def cycle_phase(self):
+        return self.phase
         
-       
-################################################################################
-# region GIFRenderer
-################################################################################ 
-class GIFRenderer(RendererBase):
-    """Renderer for creating animated GIFs (Python with PIL)"""
+    def update(self, pixels):
+        if not self.is_running():
+            return pixels
+        params = self.params
+        for j in range(3):
+            params[1 + j] = (self.phase * self.speeds[j]) & 0xFF
+        kernels.plasma(pixels.buf, self.indices, self.tables, params)
+        return self.advance(pixels)
     
-    def __init__(self, 
-                 output_path="animation.gif", 
-                 fps=10, 
-                 smoothing=False,
-                 width=WIDTH, 
-                 height=HEIGHT, 
-                 scale=10):
-        """
-        Initialize GIF renderer.
+    def advance(self, pixels):
+        if self.is_running():
+            self.frame_count += 1
+            self.phase = (self.phase + 1) & 0xFF
+        return pixels
+    
+    
+class FireAnimation(Animation):
+    """
+    Flames rising from the bottom edge.
+    
+    Every frame seeds the bottom row with random heat, lets the heat rise
+    and cool down by a row (kernels.fire) and colors it from black over
+    red and orange to yellow. Hidden frames (see advance()) skip the 
+    simulation, the flames are random anyway.
+    
+    Parameters:
+    - level: Maximum channel value of the colors
+    - cooling: Heat lost per row (higher = lower flames)
+    """
+    
+    def __init__(self, level=8, cooling=16, name="Fire"):
+        super().__init__(name=name)
+        self.palette = fastmath.make_gradient(
+            ((0, 0, 0), (level, 0, 0), (level, level // 2, 0), (level, level, level // 4)))
+        self.params = array.array("i", [0, 0, cooling])
+        self.allocate_heat()
         
-        Parameters:
-        - output_path: Path to save GIF file
-        - fps: Frames per second
-        - smoothing: Apply morphological smoothing (rounding corners)
-        - width: Grid width
-        - height: Grid height
-        - scale: Pixel scale factor (each LED pixel = scale×scale image pixels)
-        """
+    def set_geometry(self, width, height):
+        changed = (width, height) != (self.width, self.height)
+        super().set_geometry(width, height)
+        if changed:
+            self.allocate_heat()
+            
+    def allocate_heat(self):
+        """Allocate the heat map for the grid size"""
+        self.heat = bytearray(self.width * self.height)
+        self.params[0] = self.width
+        self.params[1] = self.height
         
-        from pathlib import Path
-        output_dir = Path(output_path).parent
-        output_dir.mkdir(parents=True, exist_ok=True)
-        if not Path(output_path).is_absolute():
-            output_path = Path(__file__).parent / output_path
+    def reset(self):
+        super().reset()
+        heat = self.heat
+        for i in range(len(heat)):
+            heat[i] = 0
         
-        super().__init__(width, height)
-        self.output_path = output_path
-        self.fps = fps
-        self.smoothing = smoothing
-        self.scale = scale
-        self.frames = []
+    def coverage(self):
+        return COVERAGE_FULL
         
-    def scale_color(self, color):
-        """Scale color tuple to 0-255 range"""
-        scale = 255/4
-        return tuple(min(max(int(c * scale), 0), 255) for c in color)
+    def update(self, pixels):
+        if not self.is_running():
+            return pixels
+        # Bottom row (portrait): the first entry of every buffer column
+        heat = self.heat
+        width = self.width
+        for col in range(self.height):
+            heat[col * width] = 96 + random.getrandbits(7) + random.getrandbits(5)
+        kernels.fire(pixels.buf, heat, self.palette, self.params)
+        return self.advance(pixels)
+    
+    def advance(self, pixels):
+        if self.is_running():
+            self.frame_count += 1
+        return pixels
+    
+    
+class RippleAnimation(Animation):
+    """
+    Rings of light moving outward from a point.
+    
+    Every pixel's distance from the center is turned into a position in
+    a sine-shaded color table once; a frame rotates the table 
+    (kernels.gather), like RainbowAnimation.
+    
+    Parameters:
+    - center: (row, col) of the center (default: center of the grid)
+    - wavelength: Distance between the rings in pixels
+    - speed: Table steps per frame (256 = one wavelength)
+    - color: Color of the ring crests
+    """
+    
+    def __init__(self, center=None, wavelength=4, speed=32, color=(0, 4, 8),
+                 name="Ripple"):
+        super().__init__(name=name)
+        self.fixed_center = center
+        self.wavelength = wavelength
+        self.speed = speed
+        self.table = array.array("I", [
+            pack_color(tuple(c * fastmath.sin8(k) // 255 for c in color)) 
+            for k in range(fastmath.ANGLE_STEPS)])
+        self.offset = 0
+        self.place_pixels()
+        
+    def set_geometry(self, width, height):
+        changed = (width, height) != (self.width, self.height)
+        super().set_geometry(width, height)
+        if changed:
+            self.place_pixels()
+            
+    def place_pixels(self):
+        """Compute the table position of every pixel for the grid size"""
+        center = self.fixed_center
+        if center is None:
+            center = (self.width // 2, self.height // 2)
+        self.positions = fastmath.distance_table(
+            self.width, self.height, center, 256 // self.wavelength)
+        
+    def reset(self):
+        super().reset()
+        self.offset = 0
+        
+    def set_frame(self, frame):
+        if frame < 0:
+            return
+        self.frame_count = frame
+        self.offset = (-frame * self.speed) & 0xFF
+        
+    def coverage(self):
+        return COVERAGE_FULL
+    
+    def cycle_phase(self):
+        return self.offset
+        
+    def update(self, pixels):
+        if not self.is_running():
+            return pixels
+        kernels.gather(pixels.buf, self.positions, self.table, self.offset)
+        return self.advance(pixels)
+    
+    def advance(self, pixels):
+        if self.is_running():
+            self.frame_count += 1
+            # Decreasing offsets move the rings outward
+            self.offset = (self.offset - self.speed) & 0xFF
+        return pixels
+    
+    
+################################################################################
+# region FrameLookahead
+################################################################################
+class FrameLookahead:
+    """
+    Renders upcoming frames of a manager in idle time.
+    
+    The main loop takes every frame from next_frame() and calls fill() 
+    with the time the frame slot ends. fill() renders frames ahead into a 
+    ring of FrameBuffers while there is time left, so that expensive 
+    frames (explosion, dense fireworks) are taken from the ring instead of 
+    being rendered after their slot has started. Only when the ring is 
+    empty is a frame rendered on demand.
+    
+    The show is periodic, so the render time of every frame of a loop is 
+    kept and fill() expects a frame to take as long as it did in the 
+    previous loop. Frames not rendered yet (first loop, shows that don't 
+    loop) are expected to take as long as the slowest of the last 
+    RECENT frames.
+    
+    The frame returned by next_frame() stays valid until the next call. 
+    get_frame() and get_repeat_count() refer to the frame returned last, 
+    not to the manager, which runs up to depth frames ahead.
+    """
+    
+    RECENT = 8
+    UNKNOWN = 0xFFFF  # Entry of costs for frames not rendered yet
+    
+    def __init__(self, manager, depth=4, clock=ticks_ms, period=None, 
+                 governor=None):
+        """
+        Parameters:
+        - manager: AnimationManager (or CompositingManager) to render
+        - depth: Maximum number of frames rendered ahead
+        - clock: Function returning the time in milliseconds
+        - period: Frames per loop of the show (default: from the manager's
+                  duration, 0 if it does not loop)
+        - governor: QualityGovernor to record the render time of every 
+                    frame with, ahead or on demand (optional)
+        """
+        self.manager = manager
+        self.depth = depth
+        self.clock = clock
+        self.governor = governor
+        if period is None:
+            period = 0
+            if manager.loop and manager.duration is not None and manager.duration > 0:
+                period = manager.duration + manager.frames_between_loops
+        # Render time per frame of the loop, and of the last RECENT frames
+        self.costs = array.array("H", [self.UNKNOWN] * period)
+        self.recent = array.array("H", [0] * self.RECENT)
+        self._recent_pos = 0
+        # One slot more than depth: the frame on display
+        self.slots = [manager.create_framebuffer() for _ in range(depth + 1)]
+        self.frames = array.array("i", [0] * (depth + 1))
+        self.repeats = array.array("i", [0] * (depth + 1))
+        self.head = 0   # Slot of the frame on display
+        self.count = 0  # Frames rendered ahead, in the slots after head
+        self.frame_ms = 0  # Render time of the last frame
+        self.hits = 0      # Frames taken from the ring
+        self.misses = 0    # Frames rendered on demand
+        self.usage = array.array("I", [0] * (depth + 1))  # Ring depth per frame
+        
+    def _render(self, slot):
+        start = self.clock()
+        pixels = self.slots[slot]
+        pixels.clear(DARK_BLUE)  # Default background
+        self.manager.update(pixels)
+        self.frames[slot] = self.manager.get_frame()
+        self.repeats[slot] = self.manager.get_repeat_count()
+        self.frame_ms = ticks_diff(self.clock(), start)
+        cost = min(max(int(self.frame_ms), 0), self.UNKNOWN - 1)
+        if self.frames[slot] <= len(self.costs):
+            self.costs[self.frames[slot] - 1] = cost
+        self.recent[self._recent_pos] = cost
+        self._recent_pos = (self._recent_pos + 1) % self.RECENT
+        if self.governor is not None:
+            self.governor.record(self.frame_ms)
+    
+    def estimate_ms(self):
+        """Expected render time of the next frame rendered ahead"""
+        costs = self.costs
+        if len(costs):
+            # Frame counter after the last frame rendered, 0 after a loop
+            frame = self.frames[(self.head + self.count) % len(self.slots)]
+            cost = costs[frame if frame < len(costs) else 0]
+            if cost != self.UNKNOWN:
+                return cost
+        slowest = 0
+        for k in range(self.RECENT):
+            if self.recent[k] > slowest:
+                slowest = self.recent[k]
+        return slowest
+        
+    def next_frame(self):
+        """Next frame as a FrameBuffer, from the ring if available"""
+        self.usage[self.count] += 1
+        self.head = (self.head + 1) % len(self.slots)
+        if self.count > 0:
+            self.count -= 1
+            self.hits += 1
+        else:
+            self._render(self.head)
+            self.misses += 1
+        return self.slots[self.head]
+    
+    def fill(self, deadline):
+        """
+        Render frames ahead until the ring is full or the next frame would 
+        not be done before deadline (see estimate_ms).
+        
+        Parameters:
+        - deadline: Time in clock() milliseconds
+        """
+        while (self.count < self.depth 
+               and ticks_diff(deadline, self.clock()) > self.estimate_ms()):
+            self.count += 1
+            self._render((self.head + self.count) % len(self.slots))
+            
+    def get_frame(self):
+        """Global frame counter after the frame returned last"""
+        return self.frames[self.head]
+    
+    def get_repeat_count(self):
+        """Repeat count after the frame returned last"""
+        return self.repeats[self.head]
+    
+    def report(self):
+        """Print how many frames came from the ring and how full it was"""
+        served = self.hits + self.misses
+        print("Lookahead: %d of %d frames from the ring, %d rendered on demand"
+              % (self.hits, served, self.misses))
+        for depth in range(len(self.usage)):
+            if self.usage[depth]:
+                print("  depth %d: %d frames" % (depth, self.usage[depth]))
+    
+    
+################################################################################
+# region QualityGovernor
+################################################################################
+class QualityGovernor:
+    """
+    Lowers the quality level of the animations while frames overrun their
+    time budget, and raises it again once there is headroom.
+    
+    The main loop calls begin() when a frame slot starts and end() when 
+    the frame is shown. With FrameLookahead, which renders frames outside
+    their slot, the lookahead records the render time of every frame 
+    instead (see record()). The frames are judged in windows: when at least 
+    half the frames of a window took longer than high_percent of the 
+    budget, the quality drops one level (see Animation.set_quality). It 
+    only rises one level again after recover_frames frames in a row below 
+    low_percent of the budget. The gap between the two thresholds and the
+    long recovery keep a single slow frame from changing the level. When 
+    the level has to drop again in the first window after rising, the 
+    higher level is too expensive for the current load, and the wait 
+    before the next try doubles (up to 8 times recover_frames), so that 
+    the level does not flip back and forth.
+    """
+    
+    def __init__(self, manager, budget_ms=100, window=8, high_percent=90, 
+                 low_percent=60, recover_frames=30, clock=ticks_ms):
+        """
+        Parameters:
+        - manager: AnimationManager whose animations are governed
+        - budget_ms: Time slot of a frame in milliseconds
+        - window: Number of frames judged together before lowering
+        - high_percent: Frames above this share of the budget are slow
+        - low_percent: Frames below this share of the budget are fast
+        - recover_frames: Fast frames in a row before raising the level
+        - clock: Function returning the time in milliseconds
+        """
+        self.manager = manager
+        self.budget_ms = budget_ms
+        self.high_ms = budget_ms * high_percent // 100
+        self.low_ms = budget_ms * low_percent // 100
+        self.window = window
+        self.recover_frames = recover_frames
+        self.recover_wait = recover_frames  # Doubles after failed raises
+        self.raised = False  # Level raised, first window not judged yet
+        self.clock = clock
+        self.level = QUALITY_FULL
+        self.start_time = 0
+        self.frame_ms = 0  # Time of the last frame
+        self.frames = 0    # Frames in the current window
+        self.slow = 0      # Slow frames in the current window
+        self.fast = 0      # Fast frames in a row
+        self.changes = 0   # Number of level changes
+        self.usage = array.array("I", [0] * (QUALITY_FULL + 1))  # Frames per level
+        
+    def begin(self):
+        """Start timing a frame"""
+        self.start_time = self.clock()
+        
+    def end(self):
+        """Stop timing the frame and adjust the quality level, returns the level"""
+        return self.record(ticks_diff(self.clock(), self.start_time))
+    
+    def record(self, frame_ms):
+        """Judge a frame that took frame_ms milliseconds, returns the level"""
+        self.frame_ms = frame_ms
+        self.usage[self.level] += 1
+        self.frames += 1
+        if frame_ms > self.high_ms:
+            self.slow += 1
+        if frame_ms < self.low_ms:
+            self.fast += 1
+        else:
+            self.fast = 0
+        
+        if self.fast >= self.recover_wait and self.level < QUALITY_FULL:
+            self.set_level(self.level + 1)
+            self.raised = True
+        elif self.frames >= self.window:
+            if 2 * self.slow >= self.window and self.level > QUALITY_LOW:
+                if self.raised:
+                    self.recover_wait = min(2 * self.recover_wait, 
+                                            8 * self.recover_frames)
+                self.set_level(self.level - 1)
+            else:
+                if self.raised:
+                    self.recover_wait = self.recover_frames
+                self.frames = 0
+                self.slow = 0
+            self.raised = False
+        return self.level
+    
+    def set_level(self, level):
+        """Set the quality level of all animations and start over judging"""
+        self.level = level
+        self.manager.set_quality(level)
+        self.changes += 1
+        self.frames = 0
+        self.slow = 0
+        self.fast = 0
+        if DEBUG:
+            print("Quality level %d at frame %03d" % (level, self.manager.get_frame()))
+        
+    def report(self):
+        """Print how many frames were shown at each quality level"""
+        print("Quality: %d level changes" % self.changes)
+        for level in range(len(self.usage)):
+            if self.usage[level]:
+                print("  level %d: %d frames" % (level, self.usage[level]))
+    
+    
+################################################################################
+# region Rendering
+################################################################################
+def render_pico(strip, pixels):
+    """Render FrameBuffer to LED strip"""
+    strip.pixels_show_buffer(pixels.buf, pixels.background)
+    
+    
+class RendererBase:
+    """Base class for rendering pixel data to different targets"""
+    
+    # True if wait() keeps refreshing the target between frames, which 
+    # leaves no idle time to render ahead (see FrameLookahead)
+    refreshes = False
+    
+    def __init__(self, width=16, height=10):
+        """
+        Initialize renderer with grid dimensions.
+        
+        Parameters:
+        - width: Grid width (landscape mode)
+        - height: Grid height (landscape mode)
+        """
+        self.width = width
+        self.height = height
+        self.is_rendering = False
+        
+    def start(self):
+        """Start/initialize the renderer"""
+        self.is_rendering = True
+        
+    def stop(self):
+        """Stop/cleanup the renderer"""
+        self.is_rendering = False
+        
+    def render(self, pixels):
+        """
+        Render pixel buffer to target.
+        
+        Parameters:
+        - pixels: FrameBuffer with packed colors and a background color
+        
+        Must be implemented by subclasses.
+        """
+        raise NotImplementedError("Subclasses must implement render method")
+    
+    def wait(self, deadline):
+        """
+        Wait until the next frame is due. Renderers that keep refreshing
+        their target between frames override this.
+        
+        Parameters:
+        - deadline: Time in ticks_ms() milliseconds
+        """
+        sleep_ms(max(0, ticks_diff(deadline, ticks_ms())))
+
+
+################################################################################
+# region PowerLimiter
+################################################################################
+class PowerLimiter:
+    """
+    Keeps the estimated LED current of every frame under a budget by 
+    scaling the brightness down in steps.
+    
+    A WS2812 draws about channel_ma per color channel at full output plus
+    idle_ma per LED. update() sums the red, green and blue channels of
+    the frame with kernels.channel_sums, a plain scan of the buffer. It
+    then picks the highest level whose scaled sum stays under the budget,
+    from a table of sum limits per level computed once. Renderers derive
+    their lookup table for the level from their full-brightness table
+    (scale_table), only when the level changes. A level is only raised
+    with 1/16 headroom, so that a frame right at the limit does not flip
+    it back and forth.
+    """
+    
+    LEVELS = 16  # Brightness steps of 1/LEVELS of the full brightness
+    MAX_SUM = 1 << 26  # Sum limits are clamped to keep the integers small
+    
+    def __init__(self, budget_ma, brightness, num, channel_ma=20, idle_ma=1):
+        """
+        Parameters:
+        - budget_ma: Current budget of the strip in milliamps
+        - brightness: Brightness factor of the renderer's lookup tables
+        - num: Number of LEDs
+        - channel_ma: Current of one channel at output level 255
+        - idle_ma: Current of an LED that is off
+        """
+        self.budget_ma = budget_ma
+        self.num = num
+        self.sums = array.array("i", [0, 0, 0])
+        self.level = self.LEVELS
+        # Highest channel sum (before brightness) allowed at every level
+        available = max(budget_ma - idle_ma * num, 0) * 255 * self.LEVELS
+        self.limits = array.array("i", [self.MAX_SUM] * (self.LEVELS + 1))
+        for level in range(1, self.LEVELS + 1):
+            limit = available // max(channel_ma * brightness * level, 1e-9)
+            self.limits[level] = int(min(limit, self.MAX_SUM))
+        self.channel_ma = channel_ma
+        self.idle_ma = idle_ma
+        self.brightness = brightness
+        
+    def update(self, pixels):
+        """
+        Sum the channels of a frame and choose its level.
+        
+        Returns:
+        - True if the level changed (the renderer must call scale_table)
+        """
+        kernels.channel_sums(pixels.buf, self.sums, pixels.background)
+        total = self.sums[0] + self.sums[1] + self.sums[2]
+        limits = self.limits
+        level = self.level
+        while level > 0 and total > limits[level]:
+            level -= 1
+        while level < self.LEVELS and 16 * total <= 15 * limits[level + 1]:
+            level += 1
+        if level == self.level:
+            return False
+        self.level = level
+        return True
+    
+    def scale_table(self, dst, src, shifts):
+        """
+        Scale a channel lookup table to the current level.
+        
+        Parameters:
+        - dst: Table to fill (768 entries)
+        - src: The same table at full brightness
+        - shifts: Bit position of the value in the entries of each 256 
+                  block, e.g. (16, 8, 0) for make_channel_table and 
+                  (0, 0, 0) for make_dither_table
+        """
+        level = self.level
+        n = self.LEVELS
+        for k in range(3):
+            shift = shifts[k]
+            for i in range(256 * k, 256 * k + 256):
+                dst[i] = (((src[i] >> shift) * level) // n) << shift
+                
+    def estimate_ma(self):
+        """Estimated current of the last frame at the current level"""
+        total = self.sums[0] + self.sums[1] + self.sums[2]
+        return (self.idle_ma * self.num + total * self.brightness * self.channel_ma
+                * self.level / (self.LEVELS * 255))
+    
+    
+################################################################################
+# region NeoPixelRenderer
+################################################################################
+class NeoPixelRenderer(RendererBase):
+    """Renderer for NeoPixel LED strips (MicroPython)"""
+    
+    def __init__(self, brightness=0.8, width=WIDTH, height=HEIGHT, 
+                 power_limit_ma=None):
+        """
+        Initialize NeoPixel renderer.
+        
+        Parameters:
+        - strip: NeoPixel strip object
+        - brightness: LED brightness (0.0 to 1.0)
+        - width: Grid width
+        - height: Grid height
+        - power_limit_ma: Optional current budget, see PowerLimiter
+        """
+        super().__init__(width, height)
+        strip = NeoPixel(num=width * height)
+        strip.brightness = brightness
+        self.strip = strip
+        self.strip.brightness = brightness
+        self.limiter = None
+        if power_limit_ma is not None:
+            self.limiter = PowerLimiter(power_limit_ma, brightness, width * height)
+            self.full_table = array.array("I", strip.table)
+        
+    def render(self, pixels):
+        """Render to NeoPixel strip"""
+        if not self.is_rendering:
+            return
+        
+        if self.limiter is not None and self.limiter.update(pixels):
+            self.limiter.scale_table(self.strip.table, self.full_table, (16, 8, 0))
+        self.strip.pixels_show_buffer(pixels.buf, pixels.background)
+
+
+################################################################################
+# region MultiStripRenderer
+################################################################################
+class FakeStateMachine:
+    """
+    Host stand-in for rp2.StateMachine.
+
+    Records every word pushed to the TX FIFO, so the output of a renderer
+    can be inspected without hardware.
+    """
+
+    def __init__(self, sm_id=0, pin=None, record=True):
+        self.sm_id = sm_id
+        self.pin = pin
+        self.record = record  # False: only count the put() calls
+        self.puts = 0     # Number of put() calls
+        self.words = []   # All words pushed so far, as they enter the FIFO
+        self.frames = []  # One list of words per put() call
+
+    def active(self, value=None):
+        return 1
+
+    def put(self, value, shift=0):
+        self.puts += 1
+        if not self.record:
+            return
+        if isinstance(value, int):
+            words = [(value << shift) & 0xFFFFFFFF]
+        else:
+            words = [(word << shift) & 0xFFFFFFFF for word in value]
+        self.words.extend(words)
+        self.frames.append(words)
+
+
+class MultiStripRenderer(RendererBase):
+    """
+    Renderer for several LED strips, each on its own pin and PIO state
+    machine (MicroPython, or host with fake state machines).
+
+    The FrameBuffer is split into segments, contiguous ranges of the flat
+    pixel index (i.e. of the LED order along the chains). Every segment
+    is sent to its own state machine. With DMA (MicroPython 1.21+) all
+    segments are transferred at the same time, so the refresh time is
+    that of the longest segment instead of the whole grid.
+    """
+
+    def __init__(self, segments, brightness=0.8, width=WIDTH, height=HEIGHT,
+                 state_machines=None, power_limit_ma=None):
+        """
+        Initialize multi-strip renderer.
+
+        Parameters:
+        - segments: Sequence of (pin, start, count) tuples, one per strip;
+                    the strip on pin shows pixels start ... start+count-1.
+                    State machine ids are assigned in order (0-7).
+        - brightness: LED brightness (0.0 to 1.0)
+        - width: Grid width
+        - height: Grid height
+        - state_machines: Optional list of objects with a put() method, one
+                          per segment (e.g. FakeStateMachine on the host).
+                          By default rp2 state machines are created.
+        - power_limit_ma: Optional current budget of all strips together,
+                          see PowerLimiter
+        """
+        super().__init__(width, height)
+        assert 0 < len(segments) <= 8, "The RP2040 has 8 state machines"
+        for pin, start, count in segments:
+            assert start >= 0 and count > 0 and start + count <= width * height, \
+                "Segment on pin %d exceeds the grid" % pin
+        self.segments = segments
+        self.table = kernels.make_channel_table(brightness, 8)
+        self.limiter = None
+        if power_limit_ma is not None:
+            self.limiter = PowerLimiter(power_limit_ma, brightness, width * height)
+            self.full_table = array.array("I", self.table)
+        self.out = [array.array("I", [0] * count) for _, _, count in segments]
+        self.writer = None
+        if state_machines is None:
+            sm_ids = list(range(len(segments)))
+            state_machines = [create_state_machine(sm_ids[i], segments[i][0])
+                              for i in range(len(segments))]
+            if ParallelWriter.available():
+                self.writer = ParallelWriter(sm_ids)
+        assert len(state_machines) == len(segments)
+        self.state_machines = state_machines
+        # Memoryviews into the FrameBuffer, rebuilt when the buffer changes
+        self._source = None
+        self._views = []
+
+    def _bind(self, buf):
+        self._source = buf
+        view = memoryview(buf)
+        self._views = [view[start:start + count] for _, start, count in self.segments]
+
+    def render(self, pixels):
+        """Render every segment to its strip"""
+        if not self.is_rendering:
+            return
+        if pixels.buf is not self._source:
+            self._bind(pixels.buf)
+        if self.writer is not None:
+            # The previous frame may still be transferring from self.out
+            self.writer.wait()
+        if self.limiter is not None and self.limiter.update(pixels):
+            self.limiter.scale_table(self.table, self.full_table, (24, 16, 8))
+        for i in range(len(self.out)):
+            kernels.pack_grb(self._views[i], self.out[i], self.table,
+                             pixels.background)
+        if self.writer is not None:
+            self.writer.write(self.out)
+        else:
+            for i in range(len(self.out)):
+                self.state_machines[i].put(self.out[i])
+
+
+################################################################################
+# region DitheredRenderer
+################################################################################
+class DitheredRenderer(RendererBase):
+    """
+    Renderer that refreshes the LED strip at refresh_hz, independent of
+    the frame rate, with temporal dithering.
+    
+    render() only converts the frame into channel levels with 
+    DITHER_BITS fractional bits (brightness applied, see 
+    kernels.make_dither_table). wait(), which the main loop calls instead 
+    of sleeping, pushes subframes until the next frame is due. Each 
+    subframe rounds the levels with a different threshold 
+    (kernels.dither_grb), so over 16 subframes the dim colors show 
+    the fractions that plain 8-bit output loses. With blend=True, the 
+    subframes also fade from the previous frame to the current one over 
+    the frame period, which smooths slow movements and fades.
+    """
+    
+    refreshes = True
+    
+    def __init__(self, pin=6, brightness=0.8, refresh_hz=200, blend=True,
+                 frame_rate=10, width=WIDTH, height=HEIGHT, 
+                 state_machine=None, power_limit_ma=None):
+        """
+        Parameters:
+        - pin: GPIO pin of the strip
+        - brightness: LED brightness
+        - refresh_hz: Subframes per second
+        - blend: Fade between consecutive frames
+        - frame_rate: Frames per second of the animation (for blending)
+        - width: Grid width
+        - height: Grid height
+        - state_machine: Optional object with a put() method (e.g. a 
+                         FakeStateMachine on the host); by default an rp2
+                         state machine is created
+        - power_limit_ma: Optional current budget, see PowerLimiter
+        """
+        super().__init__(width, height)
+        num = width * height
+        self.refresh_hz = refresh_hz
+        self.blend = blend
+        self.subframe_us = 1000000 // refresh_hz
+        self.frame_us = 1000000 // frame_rate
+        self.table = kernels.make_dither_table(brightness)
+        self.limiter = None
+        if power_limit_ma is not None:
+            self.limiter = PowerLimiter(power_limit_ma, brightness, num)
+            self.full_table = array.array("H", self.table)
+        # Levels of two frames; render() overwrites the older one
+        self.levels = array.array("H", [0] * (6 * num))
+        levels_mv = memoryview(self.levels)
+        self._halves = (levels_mv[0:3 * num], levels_mv[3 * num:6 * num])
+        self._newer = 0
+        self.params = array.array("i", [256, 0, 8, 0, 0] + list(kernels.DITHER_ORDER))
+        self.out = array.array("I", [0] * num)
+        if state_machine is None:
+            state_machine = create_state_machine(0, pin)
+        self.state_machine = state_machine
+        self.frames = 0
+        self.subframes = 0
+        self._frame_start = ticks_us()
+        self._next_subframe = self._frame_start
+        
+    def render(self, pixels):
+        """Convert a frame into channel levels and show its first subframe"""
+        if not self.is_rendering:
+            return
+        if self.limiter is not None and self.limiter.update(pixels):
+            self.limiter.scale_table(self.table, self.full_table, (0, 0, 0))
+        older = 1 - self._newer
+        kernels.expand_grb(pixels.buf, self._halves[older], self.table, 
+                           pixels.background)
+        if self.frames == 0:
+            # Nothing to fade from yet
+            kernels.expand_grb(pixels.buf, self._halves[self._newer], 
+                               self.table, pixels.background)
+        self._newer = older
+        self.params[3] = 3 * pixels.num * (1 - older)  # Previous frame
+        self.params[4] = 3 * pixels.num * older        # Current frame
+        self.frames += 1
+        self._frame_start = ticks_us()
+        self._next_subframe = self._frame_start
+        self.refresh()
+        
+    def refresh(self):
+        """Push one subframe to the strip"""
+        params = self.params
+        if self.blend:
+            elapsed = ticks_diff(ticks_us(), self._frame_start)
+            params[0] = min(256, (elapsed << 8) // self.frame_us)
+        else:
+            params[0] = 256
+        params[1] = self.subframes & 15
+        kernels.dither_grb(self.out, self.levels, params)
+        self.state_machine.put(self.out)
+        self.subframes += 1
+        self._next_subframe += self.subframe_us
+        
+    def wait(self, deadline):
+        """Refresh the strip at refresh_hz until deadline (ticks_ms)"""
+        if not self.is_rendering:
+            super().wait(deadline)
+            return
+        while ticks_diff(deadline, ticks_ms()) > 0:
+            delay = ticks_diff(self._next_subframe, ticks_us())
+            if delay > 0:
+                sleep_us(min(delay, 1000 * max(0, ticks_diff(deadline, ticks_ms()))))
+                continue
+            if delay < -self.subframe_us:
+                self._next_subframe = ticks_us()  # Too slow, don't catch up
+            self.refresh()
+
+
+################################################################################
+# region SerialStreamRenderer
+################################################################################
+class SerialStreamRenderer(RendererBase):
+    """
+    Renderer streaming frames over USB serial to a Pico running
+    stream.run_receiver() (Python). See stream.py for the protocol.
+    """
+
+    def __init__(self, device="/dev/ttyACM0", window=2, timeout=1.0,
+                 width=WIDTH, height=HEIGHT):
+        """
+        Initialize serial stream renderer.
+
+        Parameters:
+        - device: Serial device path (or stream.PtyLoopback().device)
+        - window: Maximum number of unacknowledged frames (backpressure)
+        - timeout: Seconds to wait for an acknowledgement before the
+                   frames in flight are considered lost
+        - width: Grid width
+        - height: Grid height
+        """
+        super().__init__(width, height)
+        self.device = device
+        self.window = window
+        self.timeout = timeout
+        self.fd = None
+        self.words = array.array("I", [0] * (width * height))
+
+    def start(self):
+        """Open the serial device and reset the statistics"""
+        import os
+        import tty
+        super().start()
+        self.fd = os.open(self.device, os.O_RDWR | os.O_NOCTTY)
+        tty.setraw(self.fd)
+        self.encoder = StreamEncoder(self.width * self.height)
+        self.in_flight = 0
+        self.sent_at = [0.0] * 256   # Send time per sequence number
+        # Seconds from send to acknowledgement: count, sum and maximum
+        self.acks = 0
+        self.latency_sum = 0.0
+        self.latency_max = 0.0
+        self.frames_sent = 0
+        self.bytes_sent = 0
+        self.naks = 0
+        self.timeouts = 0
+        self._pending = b""
+
+    def _poll(self, timeout):
+        """Process acknowledgements, waiting up to timeout seconds for one"""
+        import os
+        import select
+        ready, _, _ = select.select([self.fd], [], [], timeout)
+        if not ready:
+            return False
+        data = self._pending + os.read(self.fd, 256)
+        now = time.perf_counter()
+        for i in range(0, len(data) - 1, 2):
+            code, seq = data[i], data[i + 1]
+            self.in_flight = max(self.in_flight - 1, 0)
+            if code == ACK:
+                latency = now - self.sent_at[seq]
+                self.acks += 1
+                self.latency_sum += latency
+                self.latency_max = max(self.latency_max, latency)
+            elif code == NAK:
+                self.naks += 1
+                self.encoder.force_keyframe()
+        self._pending = data[len(data) - len(data) % 2:]
+        return True
+
+    def render(self, pixels):
+        """Encode and send one frame, blocking while the window is full"""
+        import os
+        if not self.is_rendering:
+            return
+        buf = pixels.buf
+        words = self.words
+        for i in range(len(words)):
+            word = buf[i]
+            words[i] = pixels.background if word == TRANSPARENT else word
+
+        while self.in_flight >= self.window:
+            if not self._poll(self.timeout):
+                # Acknowledgements lost: start over with a key frame
+                self.timeouts += 1
+                self.in_flight = 0
+                self.encoder.force_keyframe()
+
+        seq, packet = self.encoder.encode(words)
+        self.sent_at[seq] = time.perf_counter()
+        view = memoryview(packet)
+        while len(view):
+            view = view[os.write(self.fd, view):]
+        self.in_flight += 1
+        self.frames_sent += 1
+        self.bytes_sent += len(packet)
+        self._poll(0)
+
+    def stop(self):
+        """Wait for the outstanding acknowledgements and close the device"""
+        import os
+        super().stop()
+        if self.fd is None:
+            return
+        while self.in_flight > 0 and self._poll(self.timeout):
+            pass
+        os.close(self.fd)
+        self.fd = None
+
+    def stats(self):
+        """Return a dict with frame, byte and latency statistics"""
+        return {
+            "frames": self.frames_sent,
+            "bytes_per_frame": self.bytes_sent / max(self.frames_sent, 1),
+            "latency_mean": self.latency_sum / max(self.acks, 1),
+            "latency_max": self.latency_max,
+            "naks": self.naks,
+            "timeouts": self.timeouts,
+        }
+
+
+################################################################################
+# region RawStreamRenderer
+################################################################################
+class RawStreamRenderer(RendererBase):
+    """
+    Renderer writing every frame as packed RGB24 bytes to a file 
+    descriptor, named pipe or stdout (Python), e.g. for piping into
+    
+        ffmpeg -f rawvideo -pix_fmt rgb24 -s 200x320 -r 10 -i - out.mp4
+    
+    Frames are assembled in one reused buffer and written through a 
+    memoryview, so nothing is allocated or copied per frame beyond 
+    filling that buffer.
+    """
+    
+    def __init__(self, output="-", scale=1, portrait=True, 
+                 scale_colors=True, width=WIDTH, height=HEIGHT):
+        """
+        Initialize raw stream renderer.
+        
+        Parameters:
+        - output: "-" for stdout, a path (file or named pipe), a file 
+                  descriptor or an object with fileno()
+        - scale: Pixel scale factor (each LED pixel = scale×scale pixels)
+        - portrait: Write portrait frames (width × height pixels with 
+                    rows of the landscape grid as columns, like the GIF);
+                    otherwise landscape frames in LED order
+        - scale_colors: Scale channels for display like GIFRenderer 
+                        (0-4 to 0-255); otherwise write the raw values
+        - width: Grid width (landscape mode)
+        - height: Grid height (landscape mode)
+        """
+        super().__init__(width, height)
+        self.output = output
+        self.scale = scale
+        self.portrait = portrait
+        self.scale_colors = scale_colors
+        self.fd = None
+        self._close_fd = False
+        
+        # Buffer index of every output pixel, row by row
+        if portrait:
+            self.rows, self.cols = width, height
+            self.index_map = [p2i(u, v, width) for u in range(width) 
+                              for v in range(height)]
+        else:
+            self.rows, self.cols = height, width
+            self.index_map = list(range(width * height))
+        self.row_bytes = self.cols * scale * 3
+        self.frame = bytearray(self.rows * scale * self.row_bytes)
+        self.view = memoryview(self.frame)
+        self._row = bytearray(self.row_bytes)
+        self._blocks = {}  # GRB word -> bytes of one scaled pixel run
+        self.frames_written = 0
+        self.bytes_written = 0
+    
+    @property
+    def frame_size(self):
+        """Output frame size in pixels (width, height)"""
+        return (self.cols * self.scale, self.rows * self.scale)
+    
+    def _block(self, word):
+        r, g, b = unpack_color(word)
+        if self.scale_colors:
+            scale = 255 / 4
+            r, g, b = [min(int(c * scale), 255) for c in (r, g, b)]
+        block = bytes((r, g, b)) * self.scale
+        self._blocks[word] = block
+        return block
+    
+    def start(self):
+        """Open the output"""
+        import os
+        super().start()
+        output = self.output
+        self._close_fd = False
+        if output == "-":
+            import sys
+            sys.stdout.flush()
+            self.fd = sys.stdout.fileno()
+        elif isinstance(output, int):
+            self.fd = output
+        elif hasattr(output, "fileno"):
+            output.flush()
+            self.fd = output.fileno()
+        else:
+            # Opening a named pipe blocks until a reader opens it
+            self.fd = os.open(output, os.O_WRONLY | os.O_CREAT | os.O_TRUNC)
+            self._close_fd = True
+        self.frames_written = 0
+        self.bytes_written = 0
+    
+    def render(self, pixels):
+        """Write one frame"""
+        import os
+        if not self.is_rendering:
+            return
+        buf = pixels.buf
+        background = pixels.background
+        blocks = self._blocks
+        index_map = self.index_map
+        row = self._row
+        view = self.view
+        block_bytes = 3 * self.scale
+        row_bytes = self.row_bytes
+        cols = self.cols
+        for r in range(self.rows):
+            offset = 0
+            base = r * cols
+            for c in range(cols):
+                word = buf[index_map[base + c]]
+                if word == TRANSPARENT:
+                    word = background
+                block = blocks.get(word)
+                if block is None:
+                    block = self._block(word)
+                row[offset:offset + block_bytes] = block
+                offset += block_bytes
+            start = r * self.scale * row_bytes
+            for k in range(self.scale):
+                view[start + k * row_bytes:start + (k + 1) * row_bytes] = row
+        
+        remaining = view
+        while len(remaining):
+            remaining = remaining[os.write(self.fd, remaining):]
+        self.frames_written += 1
+        self.bytes_written += len(view)
+    
+    def stop(self):
+        """Close the output (unless it was passed in open)"""
+        import os
+        super().stop()
+        if self._close_fd and self.fd is not None:
+            os.close(self.fd)
+        self.fd = None
+
+
+################################################################################
+# region GIFRenderer
+################################################################################ 
+class GIFRenderer(RendererBase):
+    """
+    Renderer for creating animated GIFs (Python with PIL)
+    
+    Frames are stored as P-mode images indexing one global palette, which
+    holds the named colors (COLORS) and every other color drawn. Pillow 
+    then writes the frames without quantizing each of them again, and a 
+    color keeps its palette entry across all frames.
+    
+    Smoothing rounds the convex corners of same-colored regions with a 
+    precomputed corner stamp (NumPy). The cut is filled with the color of
+    the diagonal neighbor, which needs no new colors, so the smoothed 
+    frames stay palette-indexed; RGB frames get the same stamp.
+    
+    With background=True, upscaling, smoothing and encoding run in 
+    worker processes fed through a bounded queue, overlapping with the 
+    animation. Only index frames (one byte per LED) are sent, in batches 
+    to keep the per-message overhead low. Each frame is encoded against 
+    the previous one on its own, so several workers can share the work.
+    """
+    
+    MAX_COLORS = 256  # GIF palette size
+    TRANSPARENT_INDEX = 0  # Reserved palette entry for unchanged pixels
+    
+    def __init__(self, 
+                 output_path="animation.gif", 
+                 fps=10, 
+                 smoothing=False,
+                 width=WIDTH, 
+                 height=HEIGHT, 
+                 scale=10,
+                 background=False,
+                 workers=None,
+                 queue_size=8,
+                 batch_size=32):
+        """
+        Initialize GIF renderer.
+        
+        Parameters:
+        - output_path: Path to save GIF file
+        - fps: Frames per second
+        - smoothing: Round the corners of colored regions (needs NumPy)
+        - width: Grid width
+        - height: Grid height
+        - scale: Pixel scale factor (each LED pixel = scale×scale image pixels)
+        - background: Encode in worker processes
+        - workers: Number of worker processes (default: one per CPU core 
+                   besides the one running the animation, at least one)
+        - queue_size: Maximum number of batches waiting for the workers
+        - batch_size: Number of frames sent to a worker per message
+        """
+        
+        from pathlib import Path
+        output_dir = Path(output_path).parent
+        output_dir.mkdir(parents=True, exist_ok=True)
+        if not Path(output_path).is_absolute():
+            output_path = Path(__file__).parent / output_path
+        
+        super().__init__(width, height)
+        self.output_path = output_path
+        self.fps = fps
+        self.smoothing = smoothing
+        self.scale = scale
+        self.background = background
+        if workers is None:
+            import os
+            workers = max(1, (os.cpu_count() or 1) - 1)
+        self.workers = workers
+        self.queue_size = queue_size
+        self.batch_size = batch_size
+        self.frames = []
+        self.backgrounds = []  # Palette index of the background per frame
+        self._stamps = None
+        self._encoder = None  # State of the incremental delta encoder
+        self._workers = []
+        self.reset_palette()
+        
+    def scale_color(self, color):
+        """Scale color tuple to 0-255 range"""
+        scale = 255/4
+        return tuple(min(max(int(c * scale), 0), 255) for c in color)
+    
+    def reset_palette(self):
+        """Start a new global palette with the named colors"""
+        self.palette = {}  # GRB word -> palette index
+        # Flat list r, g, b, ... as passed to putpalette; entry 0 is reserved
+        self.palette_rgb = [0, 0, 0]
+        for color in COLORS:
+            self.palette_index(pack_color(color))
+    
+    def palette_index(self, word):
+        """
+        Palette index of a GRB word, adding the color if it is new.
+        
+        Returns:
+        - Index into the global palette, or None if the palette is full
+        """
+        index = self.palette.get(word)
+        if index is None:
+            if len(self.palette) + 1 >= self.MAX_COLORS:
+                return None
+            index = len(self.palette) + 1
+            self.palette[word] = index
+            self.palette_rgb.extend(self.scale_color(unpack_color(word)))
+        return index
         
     def start(self):
         """Start recording frames"""
         super().start()
         self.frames = []
+        self.backgrounds = []
+        self.reset_palette()
+        if self.background:
+            self._start_workers()
+            self.begin_encoding()
+    
+    def index_frame(self, pixels):
+        """
+        Palette indices of a frame as a bytearray in image order (portrait, 
+        row by row), or None if the frame needs more colors than fit into 
+        the palette.
+        """
+        indices = bytearray(self.width * self.height)
+        buf = pixels.buf
+        background = pixels.background
+        for idx in range(min(len(buf), self.width * self.height)):
+            word = buf[idx]
+            if word == TRANSPARENT:
+                word = background
+            index = self.palette_index(word)
+            if index is None:
+                return None
+            u, v = i2p(idx, width=self.height)
+            indices[u * self.width + v] = index
+        return indices
         
     def render(self, pixels):
         """Capture frame for GIF"""
@@ -1385,95 +3708,879 @@ class GIFRenderer(RendererBase):
         except ImportError:
             print("PIL/Pillow required for GIF rendering")
             return
-            
-        # Create image for this frame
-        img = Image.new('RGB', (self.width * self.scale, 
-                                self.height * self.scale))
-        img_pixels = img.load()
-        
-        # Get background
-        background = pixels.pop('background', DARK_BLUE)
-        
-        # Fill background
-        for y in range(self.height * self.scale):
-            for x in range(self.width * self.scale):
-                img_pixels[x, y] = self.scale_color(background)
-        
-        # Draw pixels
-        for idx, color in pixels.items():
-            if isinstance(idx, str):  # Skip special keys like "background"
-                continue
-            if 0 <= idx < self.width * self.height:
-                u, v = i2p(idx, width=self.height)
-                for dy in range(self.scale):
-                    for dx in range(self.scale):
-                        x = u * self.scale + dx
-                        y = v * self.scale + dy
-                        img_pixels[y, x] = self.scale_color(color)
-                        
-        # Use opencv to apply morphological smoothing (rounding corners)
-        if self.smoothing:
-            try:
-                import cv2
-                import numpy as np
-                
-                # Convert PIL image to OpenCV format
-                cv_img = cv2.cvtColor(np.array(img), cv2.COLOR_RGB2BGR)
-                
-                # Create circular kernel
-                kernel_size = self.scale // 2
-                kernel = cv2.getStructuringElement(cv2.MORPH_ELLIPSE, 
-                                                (kernel_size, kernel_size))
-                
-                # Apply morphological operations
-                cv_img = cv2.morphologyEx(cv_img, cv2.MORPH_OPEN, kernel, iterations=1)
-                cv_img = cv2.morphologyEx(cv_img, cv2.MORPH_CLOSE, kernel, iterations=1)
-                cv_img = cv2.morphologyEx(cv_img, cv2.MORPH_OPEN, kernel, iterations=1)
-                cv_img = cv2.morphologyEx(cv_img, cv2.MORPH_CLOSE, kernel, iterations=1)
-                
-                # Convert back to PIL format
-                img = Image.fromarray(cv2.cvtColor(cv_img, cv2.COLOR_BGR2RGB))
-            except ImportError:
-                pass  # OpenCV not available, skip smoothing
         
+        indices = self.index_frame(pixels)
+        if indices is not None:
+            # Kept at grid resolution, scaled up when the GIF is written
+            background = self.palette_index(pixels.background)
+            self.frames.append(indices)
+            self.backgrounds.append(background)
+            if self._encoder is not None:
+                self.encode_frame(indices, background)
+            return
+        
+        # Palette full: keep an RGB frame, Pillow quantizes it in stop()
+        self.frames.append(self.rgb_image(pixels))
+        self.backgrounds.append(None)
+        if self._workers:
+            # The delta encoder can't take RGB frames, stop() uses Pillow
+            self._cancel_workers()
+            self._encoder = None
+    
+    def rgb_image(self, pixels):
+        """Scaled RGB image of a frame, smoothed like the index frames"""
+        from PIL import Image
+        words = [pixels.get_word(p2i(u, v, self.height))
+                 for u in range(self.height) for v in range(self.width)]
+        if self.can_smooth():
+            import numpy as np
+            grid = np.array(words, dtype=np.uint32).reshape(self.height, self.width)
+            colors, image = np.unique(self.smooth_grid(grid), return_inverse=True)
+            rgb = np.array([self.scale_color(unpack_color(int(word)))
+                            for word in colors], dtype=np.uint8)
+            return Image.fromarray(rgb[image.reshape(-1)].reshape(
+                self.height * self.scale, self.width * self.scale, 3), 'RGB')
+        img = Image.new('RGB', (self.width, self.height))
+        img.putdata([self.scale_color(unpack_color(word)) for word in words])
+        return img.resize((self.width * self.scale, self.height * self.scale),
+                          Image.NEAREST)
+    
+    def corner_stamps(self):
+        """
+        Corner masks for smoothing, built once per scale and grid size.
+        
+        Returns:
+        - List of four (cut, dy, dx) tuples, one per cell corner: cut is a 
+          boolean array of the scaled image size, True for the image pixels 
+          outside the rounded corner of every cell; (dy, dx) points to the 
+          two neighbors that make the corner convex when both differ.
+        """
+        import numpy as np
+        key = (self.scale, self.width, self.height)
+        if self._stamps is not None and self._stamps[0] == key:
+            return self._stamps[1]
+        s = self.scale
+        r = max(1, s * 3 // 8)  # Corner radius, similar to the former morphology
+        y, x = np.mgrid[0:s, 0:s] + 0.5
+        # Top-left corner; the others are mirror images
+        top_left = (y < r) & (x < r) & ((x - r) ** 2 + (y - r) ** 2 > r * r)
+        stamps = []
+        for dy, dx in ((-1, -1), (-1, 1), (1, -1), (1, 1)):
+            corner = top_left[::-dy, ::-dx]
+            stamps.append((np.tile(corner, (self.height, self.width)), dy, dx))
+        self._stamps = (key, stamps)
+        return stamps
+    
+    def smooth_indices(self, indices):
+        """Scaled, smoothed index frame as a NumPy uint8 array"""
+        import numpy as np
+        grid = np.frombuffer(bytes(indices), dtype=np.uint8).reshape(
+            self.height, self.width)
+        return self.smooth_grid(grid)
+    
+    def smooth_grid(self, grid):
+        """
+        Scaled, smoothed copy of a 2D NumPy array of cell colors (palette 
+        indices or GRB words).
+        
+        Every cell corner where the cells above/below and left/right both 
+        have a different color is cut along a quarter circle and filled 
+        with the color of the diagonal neighbor at that corner. Cells 
+        outside the grid count as equal, so the outer corners of the 
+        screen stay square.
+        """
+        import numpy as np
+        s = self.scale
+        h, w = grid.shape
+        # Whether the neighbor in each direction has a different color
+        differs = {}
+        for d in (-1, 1):
+            differs[d, 0] = np.zeros(grid.shape, dtype=bool)
+            differs[0, d] = np.zeros(grid.shape, dtype=bool)
+        rows = grid[1:] != grid[:-1]
+        cols = grid[:, 1:] != grid[:, :-1]
+        differs[-1, 0][1:] = rows
+        differs[1, 0][:-1] = rows
+        differs[0, -1][:, 1:] = cols
+        differs[0, 1][:, :-1] = cols
+        image = grid.repeat(s, axis=0).repeat(s, axis=1)
+        for cut, dy, dx in self.corner_stamps():
+            convex = differs[dy, 0] & differs[0, dx]
+            if convex.any():
+                # Convex corners always have both neighbors inside the grid
+                diagonal = np.zeros_like(grid)
+                diagonal[max(-dy, 0):h - max(dy, 0), max(-dx, 0):w - max(dx, 0)] = \
+                    grid[max(dy, 0):h - max(-dy, 0), max(dx, 0):w - max(-dx, 0)]
+                mask = convex.repeat(s, axis=0).repeat(s, axis=1) & cut
+                image[mask] = diagonal.repeat(s, axis=0).repeat(s, axis=1)[mask]
+        return image
+    
+    def can_smooth(self):
+        """True if smoothing is enabled and NumPy is available"""
+        if not self.smoothing:
+            return False
+        try:
+            import numpy
+        except ImportError:
+            return False  # NumPy not available, skip smoothing
+        return True
+    
+    def index_image(self, indices, box=None):
+        """
+        Scaled P-mode image of index frame cells.
+        
+        Parameters:
+        - indices: Index frame (see index_frame)
+        - box: (x0, y0, x1, y1) cell range to crop, x1/y1 exclusive
+               (default: whole frame)
+        """
+        from PIL import Image
+        if box is None:
+            box = (0, 0, self.width, self.height)
+        x0, y0, x1, y1 = box
+        if x1 - x0 == self.width:
+            data = bytes(indices[y0 * self.width:y1 * self.width])
+        else:
+            data = b"".join(indices[y * self.width + x0:y * self.width + x1]
+                            for y in range(y0, y1))
+        img = Image.frombytes('P', (x1 - x0, y1 - y0), data)
+        return img.resize(((x1 - x0) * self.scale, (y1 - y0) * self.scale),
+                          Image.NEAREST)
+    
+    def changed_box(self, previous, indices):
+        """
+        Bounding box (x0, y0, x1, y1) of the cells that differ between 
+        two index frames, x1/y1 exclusive, or None if they are identical.
+        """
+        w = self.width
+        rows = [y for y in range(self.height)
+                if previous[y * w:(y + 1) * w] != indices[y * w:(y + 1) * w]]
+        if not rows:
+            return None
+        cols = [x for x in range(w)
+                if any(previous[y * w + x] != indices[y * w + x] for y in rows)]
+        return (cols[0], rows[0], cols[-1] + 1, rows[-1] + 1)
+    
+    def begin_encoding(self):
+        """Start an incremental delta encoding (see encode_frame)"""
+        self._encoder = {
+            "smooth": self.can_smooth(),
+            "chunks": {},       # Run number -> encoded frame
+            "runs": 0,          # Runs submitted
+            "pending": None,    # Last run: [indices, background, count]
+            "previous": None,   # Last submitted run
+            "previous_image": None,  # Its smoothed image (serial mode)
+            "batch": [],        # Jobs not yet sent to the workers
+        }
+    
+    def encode_frame(self, indices, background):
+        """
+        Add one index frame to the incremental delta encoding.
+        
+        Runs of identical frames are merged into one frame with a longer 
+        duration, so a frame is only encoded once the next different 
+        frame arrives (or in end_encoding).
+        """
+        state = self._encoder
+        pending = state["pending"]
+        if pending is not None and pending[0] == indices and pending[1] == background:
+            pending[2] += 1
+            return
+        if pending is not None:
+            self._submit_run(pending)
+        state["pending"] = [indices, background, 1]
+    
+    def _submit_run(self, run):
+        state = self._encoder
+        job = (state["runs"], state["previous"], run)
+        state["runs"] += 1
+        state["previous"] = run
+        if self._workers:
+            state["batch"].append(job)
+            if len(state["batch"]) >= self.batch_size:
+                self._send(state["batch"])
+                state["batch"] = []
+        else:
+            chunks, image = self.encode_run(job[1], run, state["previous_image"])
+            state["chunks"][job[0]] = chunks
+            state["previous_image"] = image
+    
+    def encode_run(self, previous, run, previous_image=None):
+        """
+        Encode one run of identical frames against the previous run.
+        
+        The first run is stored whole. Every later run only stores the 
+        bounding box of the cells that changed; it is drawn over the 
+        previous frame (disposal 1) and pixels inside the box that did not 
+        change are transparent. With smoothing, the box grows by one cell 
+        on every side, because a changed cell also changes the rounded 
+        corners of its neighbors.
+        
+        Parameters:
+        - previous: Previous run (indices, background, count) or None
+        - run: Run to encode (indices, background, count)
+        - previous_image: Smoothed image of the previous run, if known
+        
+        Returns:
+        - (list of GIF data chunks, smoothed image or None)
+        """
+        from PIL import GifImagePlugin, Image
+        
+        indices, background, count = run
+        w, h, scale = self.width, self.height, self.scale
+        transparent = self.TRANSPARENT_INDEX
+        params = {"duration": int(1000 / self.fps) * count, "disposal": 1}
+        box = (0, 0, w, h)
+        if previous is not None:
+            box = self.changed_box(previous[0], indices) or (0, 0, 1, 1)
+            params["transparency"] = transparent
+        image = None
+        if self._encoder["smooth"]:
+            image = self.smooth_indices(indices)
+            if previous is not None:
+                if previous_image is None:
+                    previous_image = self.smooth_indices(previous[0])
+                box = (max(box[0] - 1, 0), max(box[1] - 1, 0),
+                       min(box[2] + 1, w), min(box[3] + 1, h))
+            x0, y0, x1, y1 = [c * scale for c in box]
+            crop = image[y0:y1, x0:x1].copy()
+            if previous is not None:
+                crop[crop == previous_image[y0:y1, x0:x1]] = transparent
+            img = Image.frombytes('P', (x1 - x0, y1 - y0), crop.tobytes())
+        else:
+            data = indices
+            if previous is not None:
+                data = bytearray(indices)
+                before = previous[0]
+                for i in range(len(data)):
+                    if data[i] == before[i]:
+                        data[i] = transparent
+            img = self.index_image(data, box)
+        offset = (box[0] * scale, box[1] * scale)
+        return GifImagePlugin.getdata(img, offset, **params), image
+    
+    def end_encoding(self):
+        """
+        Encode the last run, collect the workers' results and write the 
+        GIF file.
+        
+        Returns:
+        - Number of frames written
+        """
+        state = self._encoder
+        if state["pending"] is not None:
+            self._submit_run(state["pending"])
+            state["pending"] = None
+        if self._workers:
+            if state["batch"]:
+                self._send(state["batch"])
+                state["batch"] = []
+            self._finish_workers()
+        w, h, scale = self.width, self.height, self.scale
+        colors = len(self.palette_rgb) // 3
+        bits = max(1, (colors - 1).bit_length())
+        palette = bytes(self.palette_rgb) + bytes(3 * ((1 << bits) - colors))
+        with open(self.output_path, "wb") as fp:
+            fp.write(b"GIF89a")
+            fp.write(struct.pack("<HHBBB", w * scale, h * scale,
+                                 0x80 | (bits - 1) << 4 | (bits - 1), 0, 0))
+            fp.write(palette)
+            # Loop forever
+            fp.write(b"!\xff\x0bNETSCAPE2.0\x03\x01\x00\x00\x00")
+            for run in range(state["runs"]):
+                for chunk in state["chunks"][run]:
+                    fp.write(chunk)
+            fp.write(b";")
+        self._encoder = None
+        return state["runs"]
+    
+    def save_delta(self):
+        """
+        Write the GIF from index frames (all frames must be bytearrays),
+        with the delta encoder (see encode_frame).
         
+        Returns:
+        - Number of frames written
+        """
+        self.begin_encoding()
+        for indices, background in zip(self.frames, self.backgrounds):
+            self.encode_frame(indices, background)
+        return self.end_encoding()
+    
+    def _start_workers(self):
+        import multiprocessing
+        config = dict(output_path=str(self.output_path), fps=self.fps,
+                      smoothing=self.smoothing, width=self.width,
+                      height=self.height, scale=self.scale)
+        self._jobs = multiprocessing.Queue(self.queue_size)
+        self._results = multiprocessing.Queue()
+        self._workers = [multiprocessing.Process(
+                            target=_gif_worker, 
+                            args=(config, self._jobs, self._results),
+                            daemon=True)
+                         for _ in range(self.workers)]
+        for worker in self._workers:
+            worker.start()
+    
+    def _collect(self, timeout=None):
+        """
+        Store encoded runs reported by the workers and raise a worker's
+        exception. Waits up to timeout seconds for a result (None: don't
+        wait).
         
-        self.frames.append(img)
+        Returns:
+        - True if a result was received
+        """
+        import queue
+        try:
+            if timeout is None:
+                kind, value = self._results.get_nowait()
+            else:
+                kind, value = self._results.get(timeout=timeout)
+        except queue.Empty:
+            return False
+        if kind == "error":
+            self._stop_workers()
+            raise RuntimeError("GIF encoder process failed:\n" + value)
+        self._encoder["chunks"].update(value)
+        return True
+    
+    def _check_alive(self, finishing=False):
+        """
+        Raise if a worker exited early. While finishing, workers exit after
+        their stop message, so that is only an error if all of them exited
+        with encoded runs still missing.
+        """
+        alive = [worker.is_alive() for worker in self._workers]
+        if all(alive) or (finishing and any(alive)):
+            return
+        while self._collect():
+            pass  # Raises the error if a worker reported one
+        state = self._encoder
+        if finishing and len(state["chunks"]) == state["runs"]:
+            return
+        self._stop_workers()
+        raise RuntimeError("GIF encoder process exited unexpectedly")
+    
+    def _send(self, message, finishing=False):
+        """Put a message on the bounded queue, waiting while it is full"""
+        import queue
+        while True:
+            while self._collect():
+                pass
+            self._check_alive(finishing)
+            try:
+                self._jobs.put(message, timeout=0.1)
+                return
+            except queue.Full:
+                pass
+    
+    def _finish_workers(self):
+        """Flush the queue, collect all encoded runs and join the workers"""
+        for _ in self._workers:
+            self._send(None, finishing=True)
+        while len(self._encoder["chunks"]) < self._encoder["runs"]:
+            if not self._collect(timeout=0.1):
+                self._check_alive(finishing=True)
+        self._stop_workers()
+    
+    def _cancel_workers(self):
+        """Send the stop messages and join the workers, dropping their results"""
+        for _ in self._workers:
+            self._send(None, finishing=True)
+        # A worker only exits once its results are read from the queue
+        while any(worker.is_alive() for worker in self._workers):
+            self._collect(timeout=0.1)
+        self._stop_workers()
+    
+    def _stop_workers(self):
+        workers, self._workers = self._workers, []
+        for worker in workers:
+            worker.join(timeout=1.0)
+            if worker.is_alive():
+                worker.terminate()
+                worker.join()
+    
+    def finish_frames(self):
+        """
+        Turn all frames into P-mode images with the global palette, for
+        saving with Pillow. RGB frames (palette overflow) are mapped onto 
+        the palette, or, if the palette is full, all frames are left to 
+        Pillow's per-frame quantization.
+        """
+        from PIL import Image
+        smooth = self.can_smooth()
+        size = (self.width * self.scale, self.height * self.scale)
+        frames = []
+        for frame in self.frames:
+            if not isinstance(frame, bytearray):
+                frames.append(frame)
+            elif smooth:
+                image = self.smooth_indices(frame)
+                frames.append(Image.frombytes('P', size, image.tobytes()))
+            else:
+                frames.append(self.index_image(frame))
+        if any(img.mode != 'P' for img in frames):
+            if len(self.palette) + 1 >= self.MAX_COLORS:
+                for img in frames:
+                    if img.mode == 'P':
+                        img.putpalette(self.palette_rgb)
+                return [img.convert('RGB') for img in frames]
+            reference = Image.new('P', (1, 1))
+            reference.putpalette(self.palette_rgb)
+            frames = [img if img.mode == 'P' else
+                      img.quantize(palette=reference, dither=Image.Dither.NONE)
+                      for img in frames]
+        for img in frames:
+            img.putpalette(self.palette_rgb)
+        return frames
     
     def stop(self):
         """Save GIF and cleanup"""
         super().stop()
-        if self.frames:
+        if self._workers and not self.frames:
+            # Nothing was rendered, don't write a GIF without frames
+            self._cancel_workers()
+            self._encoder = None
+        elif self._workers:
+            try:
+                count = self.end_encoding()
+                print(f"GIF saved to {self.output_path} "
+                      f"({len(self.frames)} frames, {count} stored)")
+            except Exception as e:
+                self._stop_workers()
+                self._encoder = None
+                print(f"Error saving GIF: {e}")
+        elif self.frames and all(isinstance(f, bytearray) for f in self.frames):
+            try:
+                count = self.save_delta()
+                print(f"GIF saved to {self.output_path} "
+                      f"({len(self.frames)} frames, {count} stored)")
+            except Exception as e:
+                print(f"Error saving GIF: {e}")
+        elif self.frames:
             try:
-                self.frames[0].save(
+                frames = self.finish_frames()
+                frames[0].save(
                     self.output_path,
                     save_all=True,
-                    append_images=self.frames[1:],
+                    append_images=frames[1:],
                     duration=int(1000 / self.fps),
                     loop=0
                 )
-                print(f"GIF saved to {self.output_path} ({len(self.frames)} frames)")
+                print(f"GIF saved to {self.output_path} ({len(frames)} frames)")
             except Exception as e:
                 print(f"Error saving GIF: {e}")
 
 
+def _gif_worker(config, jobs, results):
+    """
+    GIF encoder process (see GIFRenderer, background=True).
+    
+    Receives lists of (run number, previous run, run) jobs until None and 
+    reports ("chunks", {run number: GIF data chunks}) per list, or 
+    ("error", traceback) on failure.
+    """
+    try:
+        renderer = GIFRenderer(**config)
+        renderer.begin_encoding()
+        while True:
+            batch = jobs.get()
+            if batch is None:
+                break
+            encoded = {}
+            for number, previous, run in batch:
+                encoded[number] = renderer.encode_run(previous, run)[0]
+            results.put(("chunks", encoded))
+    except Exception:
+        import traceback
+        results.put(("error", traceback.format_exc()))
+
+
+################################################################################
+# region MultiRenderer
+################################################################################
+# Policies of a threaded MultiRenderer sink when its queue is full
+SINK_DROP_OLDEST = "drop_oldest"  # Replace the oldest waiting frame
+SINK_BLOCK = "block"              # Wait until the sink has taken a frame
+
+class SinkWorker:
+    """
+    Thread that feeds one renderer of a MultiRenderer from a bounded queue
+    of snapshot slots (host only, needs the threading module).
+    """
+    
+    def __init__(self, renderer, owner, queue_size=4, policy=SINK_DROP_OLDEST):
+        """
+        Parameters:
+        - renderer: RendererBase to feed
+        - owner: MultiRenderer holding the snapshots
+        - queue_size: Maximum number of frames waiting for the renderer
+        - policy: SINK_DROP_OLDEST or SINK_BLOCK
+        """
+        import threading
+        from collections import deque
+        if policy not in (SINK_DROP_OLDEST, SINK_BLOCK):
+            raise ValueError("Unknown sink policy: %s" % policy)
+        self.renderer = renderer
+        self.owner = owner
+        self.queue_size = queue_size
+        self.policy = policy
+        self.queue = deque()
+        self.cond = threading.Condition()
+        self.thread = None
+        self.stopping = False
+        self.error = None    # Exception raised by the renderer
+        self.rendered = 0    # Frames passed to the renderer
+        self.dropped = 0     # Frames replaced while waiting
+        self.blocked_ms = 0  # Time put() waited for a full queue
+        
+    def start(self):
+        """Start the thread"""
+        import threading
+        self.stopping = False
+        self.thread = threading.Thread(target=self.run, daemon=True,
+                                       name=type(self.renderer).__name__)
+        self.thread.start()
+        
+    def put(self, slot):
+        """Queue a snapshot slot, the owner has already counted a reference"""
+        with self.cond:
+            if self.error is not None:
+                self.owner.release(slot)
+                raise self.error
+            if len(self.queue) >= self.queue_size:
+                if self.policy == SINK_BLOCK:
+                    start = ticks_ms()
+                    while len(self.queue) >= self.queue_size and self.error is None:
+                        self.cond.wait()
+                    self.blocked_ms += ticks_diff(ticks_ms(), start)
+                else:
+                    self.owner.release(self.queue.popleft())
+                    self.dropped += 1
+            self.queue.append(slot)
+            self.cond.notify_all()
+            
+    def run(self):
+        while True:
+            with self.cond:
+                while not self.queue and not self.stopping:
+                    self.cond.wait()
+                if not self.queue:
+                    return
+                slot = self.queue.popleft()
+                self.cond.notify_all()  # Room for a blocked put()
+            try:
+                if self.error is None:
+                    self.renderer.render(self.owner.snapshots[slot])
+                    self.rendered += 1
+            except Exception as e:
+                self.error = e
+            self.owner.release(slot)
+            
+    def join(self):
+        """Render the frames still queued and end the thread"""
+        if self.thread is None:
+            return
+        with self.cond:
+            self.stopping = True
+            self.cond.notify_all()
+        self.thread.join()
+        self.thread = None
+
+
+class MultiRenderer(RendererBase):
+    """
+    Renders every frame to several renderers (sinks), e.g. LEDs, a GIF 
+    and a serial stream in the same run.
+    
+    Sinks added with threaded=False render in the calling thread, in the
+    order they were added; the first of them also paces the main loop 
+    (see wait()). Threaded sinks get their own worker thread and bounded
+    queue, so a slow sink such as a GIFRenderer never stalls the real-time
+    output. Each frame is copied once into a snapshot FrameBuffer from a 
+    preallocated pool, which all threaded sinks share read-only; a 
+    snapshot returns to the pool when the last sink is done with it.
+    """
+    
+    def __init__(self, sinks=(), width=WIDTH, height=HEIGHT):
+        """
+        Parameters:
+        - sinks: Renderers to add with the default options, see add_sink()
+        - width: Grid width (landscape mode)
+        - height: Grid height (landscape mode)
+        """
+        super().__init__(width, height)
+        self.sinks = []    # Renderers, in the order they were added
+        self.workers = []  # SinkWorker per sink, None for direct sinks
+        self.snapshots = []
+        self.refs = bytearray()  # Sinks still using each snapshot
+        self.threaded = 0        # Number of threaded sinks
+        self._lock = None
+        for renderer in sinks:
+            self.add_sink(renderer)
+            
+    def add_sink(self, renderer, threaded=False, queue_size=4, 
+                 policy=SINK_DROP_OLDEST):
+        """
+        Add a renderer, before start().
+        
+        Parameters:
+        - renderer: RendererBase with the same grid size
+        - threaded: Render in a worker thread (host only)
+        - queue_size: Frames waiting for a threaded sink at most
+        - policy: What put() does when the queue of a threaded sink is 
+                  full: SINK_DROP_OLDEST replaces the oldest waiting 
+                  frame, SINK_BLOCK waits (every frame reaches the sink)
+        """
+        if self.is_rendering:
+            raise RuntimeError("Sinks must be added before start()")
+        worker = None
+        if threaded:
+            worker = SinkWorker(renderer, self, queue_size, policy)
+        self.sinks.append(renderer)
+        self.workers.append(worker)
+        return renderer
+    
+    def start(self):
+        """Start all sinks and the worker threads"""
+        super().start()
+        workers = [worker for worker in self.workers if worker is not None]
+        self.threaded = len(workers)
+        if workers:
+            import threading
+            self._lock = threading.Lock()
+            # Each worker holds up to queue_size frames plus the one it renders
+            size = 1 + sum(worker.queue_size + 1 for worker in workers)
+            self.snapshots = [FrameBuffer(self.width, self.height) 
+                              for _ in range(size)]
+            self.refs = bytearray(size)
+        for renderer in self.sinks:
+            renderer.start()
+        for worker in workers:
+            worker.start()
+            
+    def snapshot(self, pixels, count):
+        """Copy pixels into a free snapshot used by count sinks, returns its slot"""
+        with self._lock:
+            slot = self.refs.find(0)  # Free by the pool size, see start()
+            self.refs[slot] = count
+        snapshot = self.snapshots[slot]
+        kernels.blend(snapshot.buf, pixels.buf, BLEND_COPY, 0)
+        snapshot.background = pixels.background
+        return slot
+    
+    def release(self, slot):
+        """Called by a sink that is done with a snapshot"""
+        with self._lock:
+            self.refs[slot] -= 1
+        
+    def render(self, pixels):
+        """Queue the frame for the threaded sinks, then render the direct ones"""
+        if not self.is_rendering:
+            return
+        if self.threaded:
+            slot = self.snapshot(pixels, self.threaded)
+            for worker in self.workers:
+                if worker is not None:
+                    worker.put(slot)
+        for k in range(len(self.sinks)):
+            if self.workers[k] is None:
+                self.sinks[k].render(pixels)
+                
+    @property
+    def refreshes(self):
+        """Whether the sink that waits refreshes between frames"""
+        for k in range(len(self.sinks)):
+            if self.workers[k] is None:
+                return self.sinks[k].refreshes
+        return False
+        
+    def wait(self, deadline):
+        """Wait with the first direct sink, e.g. to keep dithering the LEDs"""
+        for k in range(len(self.sinks)):
+            if self.workers[k] is None:
+                return self.sinks[k].wait(deadline)
+        super().wait(deadline)
+        
+    def stop(self):
+        """Let the threaded sinks finish their queues, then stop all sinks"""
+        for worker in self.workers:
+            if worker is not None:
+                worker.join()
+        for renderer in self.sinks:
+            renderer.stop()
+        super().stop()
+        for worker in self.workers:
+            if worker is not None and worker.error is not None:
+                raise worker.error
+            
+    def report(self):
+        """Print the frames rendered and dropped per threaded sink"""
+        for k in range(len(self.sinks)):
+            worker = self.workers[k]
+            name = type(self.sinks[k]).__name__
+            if worker is None:
+                print("%s: direct" % name)
+            else:
+                print("%s: %d frames rendered, %d dropped, %d ms blocked (%s)"
+                      % (name, worker.rendered, worker.dropped, 
+                         worker.blocked_ms, worker.policy))
+
+
+################################################################################
+# region Frame export
+################################################################################
+def render_frames(manager, start=0, count=None, out=None, portrait=True,
+                  seed=None, chunk=1024):
+    """
+    Render frames of a manager headless into a NumPy array (Python).
+    
+    The manager is reset and run from frame 0, and frames start ... 
+    start+count-1 are stored, so the result matches a normal run of the 
+    timeline. Colors are the raw channel values as drawn (e.g. DARK_BLUE 
+    is (0, 0, 2)), not scaled for display like GIFRenderer does.
+    
+    Parameters:
+    - manager: AnimationManager to render
+    - start: First frame to store
+    - count: Number of frames (default: one loop including the gap)
+    - out: Optional uint8 array (or np.memmap) of shape (count, rows, 
+           cols, 3) to write into
+    - portrait: Store frames in portrait orientation (rows = grid width, 
+                as the scenes are authored and GIFs are saved) instead of 
+                landscape (rows = grid height, as the LEDs are wired)
+    - seed: Seed for the random module before rendering, for reproducible 
+            frames (animations like fireworks use the global generator)
+    - chunk: Number of frames converted to RGB at once
+    
+    Returns:
+    - Array of shape (count, rows, cols, 3) with dtype uint8
+    """
+    import numpy as np
+    
+    if count is None:
+        count = manager.duration + manager.frames_between_loops
+    width, height = manager.width, manager.height
+    shape = (count, width, height, 3) if portrait else (count, height, width, 3)
+    if out is None:
+        out = np.empty(shape, dtype=np.uint8)
+    elif out.shape != shape or out.dtype != np.uint8:
+        raise ValueError("out must be a uint8 array of shape %s" % (shape,))
+    
+    if seed is not None:
+        random.seed(seed)
+    manager.reset()
+    pixels = manager.create_framebuffer()
+    for _ in range(start):
+        pixels.clear(DARK_BLUE)
+        manager.update(pixels)
+    
+    # Packed words of up to chunk frames, converted to RGB in one go
+    words = np.empty((min(chunk, count), height, width), dtype=np.uint32)
+    backgrounds = np.empty((len(words), 1, 1), dtype=np.uint32)
+    done = 0
+    while done < count:
+        n = min(len(words), count - done)
+        for k in range(n):
+            pixels.clear(DARK_BLUE)
+            manager.update(pixels)
+            words[k] = np.frombuffer(pixels.buf, dtype=np.uint32).reshape(
+                height, width)
+            backgrounds[k] = pixels.background
+        frames = np.where(words[:n] == TRANSPARENT, backgrounds[:n], words[:n])
+        if portrait:
+            # Portrait (u, v) is landscape (v, width - 1 - u), see pixel2index
+            frames = np.rot90(frames, axes=(1, 2))
+        target = out[done:done + n]
+        target[..., 0] = frames >> 8
+        target[..., 1] = frames >> 16
+        target[..., 2] = frames
+        done += n
+    return out
+
+
+################################################################################
+# region Allocation check
+################################################################################
+def check_allocations(renderer=None, width=WIDTH, height=HEIGHT, layered=False):
+    """
+    Check that the steady-state frame loop does not allocate.
+    
+    Runs the Christmas show for one loop to warm up, then tracks a second
+    loop frame by frame and per animation. An animation (or the frame) 
+    fails the check if any of its measurements allocated, garbage freed 
+    before the end of the measurement included (on the host: more than 
+    CPYTHON_SLACK bytes).
+    
+    Parameters:
+    - renderer: Optional renderer to include in the check (e.g. a
+                NeoPixelRenderer on the Pico)
+    - width: Grid width (landscape mode)
+    - height: Grid height (landscape mode)
+    - layered: Check the CompositingManager instead of the AnimationManager
+    
+    Raises:
+    - AssertionError listing the animations (or "frame") that allocated
+    """
+    manager = create_xmas_manager(width, height, layered)
+    pixels = manager.create_framebuffer()
+    loop_frames = manager.duration + manager.frames_between_loops
+    # Alternating overload and headroom, so the quality levels change
+    governor = QualityGovernor(manager)
+    
+    def run_frame():
+        pixels.clear(DARK_BLUE)
+        manager.update(pixels)
+        if renderer is not None:
+            renderer.render(pixels)
+        governor.record(150 if manager.get_frame() % 100 < 50 else 10)
+    
+    # Start tracing before the warm-up, so that objects created during the
+    # warm-up and freed later are accounted for
+    tracker = AllocationTracker()
+    tracker.start()
+    for _ in range(loop_frames):
+        run_frame()
+    
+    manager.tracker = tracker
+    for _ in range(loop_frames):
+        tracker.begin()
+        run_frame()
+        tracker.end("frame")
+    manager.tracker = None
+    tracker.stop()
+    
+    tracker.report()
+    # On the Pico no allocation is allowed; see CPYTHON_SLACK for the host
+    slack = 0 if MICROPYTHON else CPYTHON_SLACK
+    offenders = [label for label in tracker.peaks if tracker.peaks[label] > slack]
+    assert not offenders, "Allocations after warm-up: %s" % ", ".join(offenders)
+
+
 ################################################################################
 # region Main Animation Loop
 ################################################################################
-def animate_xmas_tree():
-    if MICROPYTHON:
-        renderer = NeoPixelRenderer(brightness=1.8, 
-                                    width=WIDTH, 
-                                    height=HEIGHT)
-    else:
-        renderer = GIFRenderer(width=HEIGHT, 
-                               height=WIDTH, 
-                               scale=20,
-                               output_path="result.gif")
-    renderer.start()
+def create_xmas_manager(width=WIDTH, height=HEIGHT, layered=False, cache_bytes=0):
+    """
+    Create the AnimationManager with the scheduled Christmas show.
     
+    Parameters:
+    - width: Grid width (landscape mode)
+    - height: Grid height (landscape mode)
+    - layered: Use a CompositingManager (one layer per animation)
+    - cache_bytes: Size of the CompositingManager's LayerCache
+    """
     # Create animation manager
-    manager = AnimationManager(frames_between_loops=20)
+    if layered:
+        manager = CompositingManager(frames_between_loops=20, 
+                                     width=width, 
+                                     height=height,
+                                     cache_bytes=cache_bytes)
+    else:
+        manager = AnimationManager(frames_between_loops=20, 
+                                   width=width, 
+                                   height=height)
     
     # Create animation instances
     tree_anim = ChristmasTreeAnimation()
@@ -1484,7 +4591,7 @@ def animate_xmas_tree():
         text="MERRY CHRISTMAS! ",
         color=(5, 0, 5),
         speed=1,
-        offset=(1, HEIGHT+1),
+        offset=(1, height+1),
         font_size=6,
         loop=False
     )
@@ -1512,6 +4619,43 @@ def animate_xmas_tree():
         loop=False
     )
     
+    # Add animations to manager with timing
+    # Phase 1: Tree with snow and Christmas text
+    manager.add_animation(tree_anim, start_frame=0, duration=210)
+    manager.add_animation(snow_anim, start_frame=0, duration=200)
+    manager.add_animation(xmas_text_anim, start_frame=30, duration=150)
+    
+    # Phase 2: Star animation
+    manager.add_animation(star_anim, start_frame=140, duration=200)
+    
+    # Phase 3: Fireworks
+    manager.add_animation(firework_anim, start_frame=220, duration=210)
+    
+    # Phase 4: New Year text
+    manager.add_animation(newyear_text_anim, start_frame=250, duration=160)
+    return manager
+
+
+def animate_xmas_tree(width=WIDTH, height=HEIGHT):
+    if MICROPYTHON and REFRESH_HZ > 0:
+        renderer = DitheredRenderer(brightness=1.8,
+                                    refresh_hz=REFRESH_HZ,
+                                    width=width,
+                                    height=height,
+                                    power_limit_ma=POWER_LIMIT_MA or None)
+    elif MICROPYTHON:
+        renderer = NeoPixelRenderer(brightness=1.8, 
+                                    width=width, 
+                                    height=height,
+                                    power_limit_ma=POWER_LIMIT_MA or None)
+    else:
+        # GIF in portrait mode
+        renderer = GIFRenderer(width=height, 
+                               height=width, 
+                               scale=20,
+                               output_path="result.gif")
+    renderer.start()
+    
     if False:
         # Debug fonts rendering    
         test = TextFlashAnimation(
@@ -1525,49 +4669,75 @@ def animate_xmas_tree():
         )
 
         test.start()
+        pixels = FrameBuffer(width, height)
         while True:
-            pixels = {}
+            pixels.clear()
             pixels = test.update(pixels)
             render(strip, pixels)
             sleep(0.1)
         return
     
-    # Add animations to manager with timing
-    # Phase 1: Tree with snow and Christmas text
-    manager.add_animation(tree_anim, start_frame=0, duration=210)
-    manager.add_animation(snow_anim, start_frame=0, duration=200)
-    manager.add_animation(xmas_text_anim, start_frame=30, duration=150)
-    
-    # Phase 2: Star animation
-    manager.add_animation(star_anim, start_frame=140, duration=200)
-    
-    # Phase 3: Fireworks
-    manager.add_animation(firework_anim, start_frame=220, duration=210)
-    
-    # Phase 4: New Year text
-    manager.add_animation(newyear_text_anim, start_frame=250, duration=160)
+    manager = create_xmas_manager(width, height)
     
     # Target frame rate
     FRAME_RATE = 10  # frames per second
     
     #manager.set_frame(150)
     
-    # Main loop
+    tracker = None
+    if TRACK_ALLOCATIONS:
+        tracker = AllocationTracker()
+        tracker.start()
+        manager.tracker = tracker
+    
+    # Render upcoming frames in the idle time of cheap frames; a renderer
+    # that refreshes the strip between frames has no idle time, rendering
+    # ahead would stall its subframes and the dithering would flicker
+    governor = None
+    if QUALITY_GOVERNOR and not isinstance(renderer, GIFRenderer):
+        governor = QualityGovernor(manager, budget_ms=1000 // FRAME_RATE)
+    
+    lookahead = None
+    timeline = manager
+    if LOOKAHEAD_DEPTH > 0 and not renderer.refreshes:
+        # Judges every frame by its own render time, ahead or on demand
+        lookahead = FrameLookahead(manager, depth=LOOKAHEAD_DEPTH, 
+                                   governor=governor)
+        timeline = lookahead
+    
+    # Main loop (no heap allocations once warmed up, see check_allocations)
+    pixels = manager.create_framebuffer()
     while True:
         start_time = ticks_ms()
-        pixels = {}
-        pixels["background"] = DARK_BLUE  # Default background
-        pixels = manager.update(pixels)
+        if tracker is not None:
+            tracker.begin()
+        if governor is not None and lookahead is None:
+            governor.begin()
+        if lookahead is not None:
+            pixels = lookahead.next_frame()
+        else:
+            pixels.clear(DARK_BLUE)  # Default background
+            pixels = manager.update(pixels)
         renderer.render(pixels)
-        elapsed = ticks_ms() - start_time
-        sleep_time = max(0, int(1000 / FRAME_RATE) - elapsed)
-        sleep(sleep_time / 1000.0)
+        if governor is not None and lookahead is None:
+            governor.end()
+        if lookahead is not None:
+            lookahead.fill(start_time + 1000 // FRAME_RATE)
+        if tracker is not None and tracker.end("frame") > (0 if MICROPYTHON else CPYTHON_SLACK):
+            msg = "Frame %03d allocated %d bytes"
+            print(msg % (timeline.get_frame(), tracker.last))
+        renderer.wait(start_time + 1000 // FRAME_RATE)
         if DEBUG:
-            print("Frame:", manager.get_frame())
+            print("Frame:", timeline.get_frame())
             
-        if isinstance(renderer, GIFRenderer) and manager.get_repeat_count() >= 1:
+        if isinstance(renderer, GIFRenderer) and timeline.get_repeat_count() >= 1:
             print("Animation complete.")
             renderer.stop()
+            if lookahead is not None:
+                lookahead.report()
+            if tracker is not None:
+                tracker.stop()
+                tracker.report()
             break
 
 if __name__=='__main__':
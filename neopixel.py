@@ -4,6 +4,8 @@ from machine import Pin
 
 import rp2
 
+import kernels
+
 # Configure the number of WS2812 LEDs.
 NUM_LEDS = 160
 PIN_NUM = 6
@@ -22,20 +24,67 @@ def ws2812():
     nop()                   .side(0)    [T2 - 1]
     wrap()
         
+def create_state_machine(sm_id, pin):
+    # Create the StateMachine with the ws2812 program, outputting on pin.
+    # sm_id 0-3 are on PIO0, 4-7 on PIO1.
+    sm = rp2.StateMachine(sm_id, ws2812, freq=8_000_000, sideset_base=Pin(pin))
+    # Start the StateMachine, it will wait for data on its FIFO.
+    sm.active(1)
+    return sm
+
+# PIO TX FIFO registers and DMA request lines (RP2040 datasheet 2.5.3.1, 3.7)
+PIO_BASES = (0x50200000, 0x50300000)
+PIO_TXF0 = 0x010
+PIO_DREQ_TX0 = (0, 8)
+
+class ParallelWriter(object):
+    # Feeds several state machines at the same time, one DMA channel per
+    # state machine. The words must be FIFO-ready, i.e. already shifted
+    # left by 8 (see kernels.make_channel_table). write() returns as soon
+    # as all transfers are started; wait() blocks until they are done.
+    def __init__(self, sm_ids):
+        self.channels = [rp2.DMA() for _ in sm_ids]
+        self.addresses = []
+        self.ctrls = []
+        for i in range(len(sm_ids)):
+            pio, index = sm_ids[i] // 4, sm_ids[i] % 4
+            self.addresses.append(PIO_BASES[pio] + PIO_TXF0 + 4 * index)
+            self.ctrls.append(self.channels[i].pack_ctrl(
+                size=2, inc_write=False, treq_sel=PIO_DREQ_TX0[pio] + index))
+
+    @staticmethod
+    def available():
+        # rp2.DMA exists since MicroPython 1.21
+        return hasattr(rp2, "DMA")
+
+    def wait(self):
+        for channel in self.channels:
+            while channel.active():
+                pass
+
+    def write(self, buffers):
+        self.wait()
+        for i in range(len(self.channels)):
+            self.channels[i].config(read=buffers[i], write=self.addresses[i],
+                                    count=len(buffers[i]), ctrl=self.ctrls[i],
+                                    trigger=True)
+
 class NeoPixel(object):
-    def __init__(self,pin=PIN_NUM,num=NUM_LEDS,brightness=0.8):
+    def __init__(self,pin=PIN_NUM,num=NUM_LEDS,brightness=0.8,sm_id=0):
         self.pin=pin
         self.num=num
+        # Channel lookup table, rebuilt whenever brightness is assigned
+        self._table = array.array("I", [0 for _ in range(768)])
         self.brightness = brightness
         
-        # Create the StateMachine with the ws2812 program, outputting on pin
-        self.sm = rp2.StateMachine(0, ws2812, freq=8_000_000, sideset_base=Pin(PIN_NUM))
-
-        # Start the StateMachine, it will wait for data on its FIFO.
-        self.sm.active(1)
+        self.sm = create_state_machine(sm_id, pin)
 
         # Display a pattern on the LEDs via an array of LED RGB values.
         self.ar = array.array("I", [0 for _ in range(self.num)])
+        # Dimmed output words, reused by every pixels_show()
+        self.out_ar = array.array("I", [0 for _ in range(self.num)])
+        # Color wheel (packed GRB), computed once; see wheel()
+        self.wheel_table = kernels.make_wheel_table(32, 31)
         
         self.BLACK = (0, 0, 0)
         self.RED = (15, 0, 0)
@@ -58,21 +107,36 @@ class NeoPixel(object):
                         self.CYAN, self.CYAN, self.CYAN, self.CYAN, self.CYAN, self.CYAN, self.CYAN, self.CYAN, self.CYAN, self.CYAN, self.CYAN, self.CYAN, self.CYAN, self.CYAN, self.CYAN, self.CYAN]
         
     ##########################################################################
+    @property
+    def brightness(self):
+        return self._brightness
+
+    @brightness.setter
+    def brightness(self, value):
+        self._brightness = value
+        kernels.make_channel_table(value, 0, self._table)
+
+    @property
+    def table(self):
+        # Channel lookup table of the current brightness; may be rewritten
+        # in place, e.g. by main.PowerLimiter
+        return self._table
+
     def pixels_show(self):
-        dimmer_ar = array.array("I", [0 for _ in range(self.num)])
-        for i,c in enumerate(self.ar):
-            r = int(((c >> 16) & 0xFF) * self.brightness)
-            g = int(((c >> 8) & 0xFF) * self.brightness)
-            b = int((c & 0xFF) * self.brightness)
-            dimmer_ar[i] = (g<<16) + (r<<8) + b
-        self.sm.put(dimmer_ar, 8)
+        kernels.pack_grb(self.ar, self.out_ar, self._table, 0)
+        self.sm.put(self.out_ar, 8)
+
+    def pixels_show_buffer(self, buf, background):
+        # Show an external GRB buffer (e.g. FrameBuffer.buf) without copying
+        # it into self.ar; TRANSPARENT entries are shown as background.
+        kernels.pack_grb(buf, self.out_ar, self._table, background)
+        self.sm.put(self.out_ar, 8)
 
     def pixels_set(self, i, color):
         self.ar[i] = (color[1]<<16) + (color[0]<<8) + color[2]
 
     def pixels_fill(self, color):
-        for i in range(len(self.ar)):
-            self.pixels_set(i, color)
+        kernels.fill(self.ar, kernels.pack_color(color), self.num)
 
     def color_chase(self, color, length):
         #for i in range(self.num):
@@ -86,19 +150,15 @@ class NeoPixel(object):
         # The colours are a transition r - g - b - back to r.
         if pos < 0 or pos > 31:
             return (0, 0, 0)
-        if pos < 10:
-            return (31 - pos * 3, pos * 3, 0)
-        if pos < 15:
-            pos -= 10
-            return (0, 31 - pos * 3,pos * 3)
-        pos -= 15
-        return (pos * 3, 0, 31 - pos * 3)
+        return kernels.unpack_color(self.wheel_table[pos])
      
      
     def rainbow_cycle(self, wait):
+        # Every frame rotates the wheel by one step; the per-LED wheel
+        # positions are fixed. Use main.RainbowAnimation to run this
+        # effect in an AnimationManager instead of blocking here.
+        offsets = array.array("H", [(i * 256 // self.num) & 31 for i in range(self.num)])
         for j in range(256):
-            for i in range(self.num):
-                rc_index = (i * 256 // self.num) + j
-                self.pixels_set(i, self.wheel(rc_index & 31))
+            kernels.gather(self.ar, offsets, self.wheel_table, j)
             self.pixels_show()
             time.sleep(wait)
\ No newline at end of file
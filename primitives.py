@@ -0,0 +1,108 @@
+# Bulk drawing primitives on a FrameBuffer.
+#
+# Coordinates are in portrait mode like pixel2index: rows 0..width-1 from
+# top to bottom, columns 0..height-1 from left to right. A portrait column
+# is one contiguous run of the flat buffer, so every primitive clips its
+# rectangle to the grid once and then writes one run per column (see
+# kernels.fill_runs and kernels.copy_runs). Nothing outside the grid is
+# touched, shapes never wrap onto neighboring rows.
+#
+# Colors are packed GRB words (see kernels.pack_color); TRANSPARENT marks
+# pixels as not drawn.
+import array
+
+import kernels
+
+# Reused parameter block of the run kernels
+_PARAMS = array.array("i", [0] * 6)
+
+
+def fill(pixels, color):
+    """
+    Set every pixel.
+
+    Parameters:
+    - pixels: FrameBuffer to draw into
+    - color: Packed color
+    """
+    kernels.fill(pixels.buf, color, pixels.num)
+    return pixels
+
+
+def fill_rect(pixels, row, col, rows, cols, color):
+    """
+    Fill a rectangle, clipped to the grid.
+
+    Parameters:
+    - pixels: FrameBuffer to draw into
+    - row: Top row of the rectangle
+    - col: Left column of the rectangle
+    - rows: Height of the rectangle
+    - cols: Width of the rectangle
+    - color: Packed color
+
+    Returns:
+    - Modified FrameBuffer
+    """
+    w = pixels.width
+    r0 = max(row, 0)
+    r1 = min(row + rows, w)
+    c0 = max(col, 0)
+    c1 = min(col + cols, pixels.height)
+    if r0 >= r1 or c0 >= c1:
+        return pixels
+    params = _PARAMS
+    params[0] = c0 * w + (w - r1)  # Bottom row comes first in the buffer
+    params[1] = r1 - r0
+    params[2] = w
+    params[3] = c1 - c0
+    kernels.fill_runs(pixels.buf, color, params)
+    return pixels
+
+
+def hline(pixels, row, col, length, color):
+    """Draw a horizontal line of length pixels starting at (row, col)"""
+    return fill_rect(pixels, row, col, 1, length, color)
+
+
+def vline(pixels, row, col, length, color):
+    """Draw a vertical line of length pixels starting at (row, col)"""
+    return fill_rect(pixels, row, col, length, 1, color)
+
+
+def blit(pixels, src, row=0, col=0, mask=None):
+    """
+    Copy a smaller FrameBuffer into pixels, clipped to the grid.
+
+    Parameters:
+    - pixels: FrameBuffer to draw into
+    - src: FrameBuffer to copy (src.width rows, src.height columns in
+           portrait mode), TRANSPARENT entries are copied as well
+    - row: Row of the top left corner of src in pixels
+    - col: Column of the top left corner of src in pixels
+    - mask: Optional bytes with one entry per src pixel (same indices as
+            src.buf), only pixels with a non-zero entry are copied
+
+    Returns:
+    - Modified FrameBuffer
+    """
+    w = pixels.width
+    sw = src.width
+    r0 = max(row, 0)
+    r1 = min(row + sw, w)
+    c0 = max(col, 0)
+    c1 = min(col + src.height, pixels.height)
+    if r0 >= r1 or c0 >= c1:
+        return pixels
+    params = _PARAMS
+    params[0] = c0 * w + (w - r1)
+    params[1] = (c0 - col) * sw + (sw - (r1 - row))
+    params[2] = r1 - r0
+    params[3] = c1 - c0
+    params[4] = w
+    params[5] = sw
+    if mask is None:
+        kernels.copy_runs(pixels.buf, src.buf, params)
+    else:
+        kernels.copy_runs_masked(pixels.buf, src.buf, mask, params)
+    return pixels
@@ -0,0 +1,394 @@
+# Frame streaming over USB CDC serial: render on the host, display on the Pico.
+#
+# The host runs the full AnimationManager and sends every frame with
+# SerialStreamRenderer (main.py). The Pico runs run_receiver(), which
+# pushes the frames straight to the LED strip and acknowledges them.
+#
+# Packet layout (all multi-byte fields little-endian):
+#
+#   0xA5 0x5A  type  seq  length(3)  payload(length)  checksum
+#
+# - type: FRAME_RAW, FRAME_PALETTE or FRAME_DELTA (see encode_payload)
+# - seq: Sequence number, incremented by one per frame (mod 256)
+# - checksum: Sum of the payload bytes (mod 256)
+#
+# Colors are sent as three bytes g, r, b (the packed word, MSB first).
+# The receiver answers every packet with ACK seq after showing the frame,
+# or NAK seq if it was corrupt or a delta frame followed a lost frame.
+# The sender keeps at most `window` frames unacknowledged (backpressure)
+# and answers a NAK with a key frame (raw or palette).
+import array
+import sys
+
+MICROPYTHON = sys.platform == "rp2"
+
+MAGIC0 = 0xA5
+MAGIC1 = 0x5A
+HEADER_SIZE = 7
+
+FRAME_RAW = ord("R")      # 3 bytes per pixel
+FRAME_PALETTE = ord("P")  # Palette size (0 = 256), palette, 1 index per pixel
+FRAME_DELTA = ord("D")    # Pixel count (2), then index (2) + color (3) each
+
+ACK = 0x06
+NAK = 0x15
+
+
+################################################################################
+# region Encoder
+################################################################################
+class StreamEncoder:
+    """
+    Turns frames into packets, choosing the most compact frame type.
+
+    Delta frames are relative to the previously encoded frame, so the
+    receiver must have shown every packet in between. A key frame is
+    forced every keyframe_interval frames and after force_keyframe().
+    """
+
+    def __init__(self, num, keyframe_interval=50):
+        """
+        Parameters:
+        - num: Number of pixels per frame
+        - keyframe_interval: Maximum number of frames between key frames
+        """
+        self.num = num
+        self.keyframe_interval = keyframe_interval
+        self.previous = array.array("I", [0] * num)
+        self.seq = 0
+        self._since_keyframe = keyframe_interval
+
+    def force_keyframe(self):
+        """Make the next packet a key frame"""
+        self._since_keyframe = self.keyframe_interval
+
+    def encode_payload(self, words):
+        """
+        Encode one frame of packed GRB words.
+
+        Parameters:
+        - words: Sequence of num packed colors (no TRANSPARENT entries)
+
+        Returns:
+        - (frame type, payload bytes)
+        """
+        num = self.num
+        raw = bytearray(3 * num)
+        palette = {}
+        changed = []
+        previous = self.previous
+        for i in range(num):
+            word = words[i]
+            raw[3 * i] = (word >> 16) & 0xFF
+            raw[3 * i + 1] = (word >> 8) & 0xFF
+            raw[3 * i + 2] = word & 0xFF
+            if len(palette) <= 256 and word not in palette:
+                palette[word] = len(palette)
+            if word != previous[i]:
+                changed.append(i)
+
+        candidates = [(len(raw), FRAME_RAW)]
+        if len(palette) <= 256:
+            candidates.append((1 + 3 * len(palette) + num, FRAME_PALETTE))
+        if self._since_keyframe < self.keyframe_interval:
+            candidates.append((2 + 5 * len(changed), FRAME_DELTA))
+        frame_type = min(candidates)[1]
+
+        if frame_type == FRAME_RAW:
+            payload = raw
+        elif frame_type == FRAME_PALETTE:
+            payload = bytearray(1 + 3 * len(palette) + num)
+            payload[0] = len(palette) & 0xFF
+            for word, k in palette.items():
+                payload[1 + 3 * k:4 + 3 * k] = raw_color(word)
+            offset = 1 + 3 * len(palette)
+            for i in range(num):
+                payload[offset + i] = palette[words[i]]
+        else:
+            payload = bytearray(2 + 5 * len(changed))
+            payload[0] = len(changed) & 0xFF
+            payload[1] = len(changed) >> 8
+            offset = 2
+            for i in changed:
+                payload[offset] = i & 0xFF
+                payload[offset + 1] = i >> 8
+                payload[offset + 2:offset + 5] = raw[3 * i:3 * i + 3]
+                offset += 5
+
+        if frame_type == FRAME_DELTA:
+            self._since_keyframe += 1
+        else:
+            self._since_keyframe = 1
+        for i in range(num):
+            previous[i] = words[i]
+        return frame_type, bytes(payload)
+
+    def encode(self, words):
+        """
+        Encode one frame as a complete packet.
+
+        Parameters:
+        - words: Sequence of num packed colors (no TRANSPARENT entries)
+
+        Returns:
+        - (sequence number, packet bytes)
+        """
+        frame_type, payload = self.encode_payload(words)
+        seq = self.seq
+        self.seq = (seq + 1) & 0xFF
+        n = len(payload)
+        header = bytes((MAGIC0, MAGIC1, frame_type, seq,
+                        n & 0xFF, (n >> 8) & 0xFF, n >> 16))
+        return seq, header + payload + bytes((sum(payload) & 0xFF,))
+
+
+def raw_color(word):
+    """Three bytes g, r, b of a packed color"""
+    return bytes(((word >> 16) & 0xFF, (word >> 8) & 0xFF, word & 0xFF))
+
+
+################################################################################
+# region Receiver
+################################################################################
+class StreamReceiver:
+    """
+    Decodes packets from a byte stream into a strip and acknowledges them.
+
+    The strip needs a NeoPixel-like interface: num, ar (packed GRB words)
+    and pixels_show(). All buffers are allocated up front.
+    """
+
+    def __init__(self, stream, strip, max_payload=None):
+        """
+        Parameters:
+        - stream: Object with readinto(buf) (fills buf completely) and write()
+        - strip: NeoPixel or compatible object receiving the frames
+        - max_payload: Largest accepted payload (default: raw frame size)
+        """
+        self.stream = stream
+        self.strip = strip
+        if max_payload is None:
+            max_payload = 3 * strip.num
+        self.header = bytearray(HEADER_SIZE)
+        header_mv = memoryview(self.header)
+        self._magic0 = header_mv[0:1]
+        self._magic1 = header_mv[1:2]
+        self._rest = header_mv[2:HEADER_SIZE]
+        self.payload = bytearray(max_payload + 1)  # Payload and checksum
+        self.payload_mv = memoryview(self.payload)
+        self.palette = array.array("I", [0] * 256)
+        self.reply = bytearray(2)
+        self.expected = -1   # Next sequence number, -1 until the first key frame
+        self.frames = 0      # Frames shown
+        self.errors = 0      # Packets answered with NAK
+
+    def _sync(self):
+        # Read until the two magic bytes, then the rest of the header
+        read = self.stream.readinto
+        while True:
+            read(self._magic0)
+            if self.header[0] != MAGIC0:
+                continue
+            read(self._magic1)
+            if self.header[1] == MAGIC1:
+                break
+        read(self._rest)
+
+    def _answer(self, code, seq):
+        self.reply[0] = code
+        self.reply[1] = seq
+        self.stream.write(self.reply)
+
+    def _apply(self, frame_type, n):
+        p = self.payload
+        ar = self.strip.ar
+        num = self.strip.num
+        if frame_type == FRAME_RAW:
+            if n != 3 * num:
+                return False
+            for i in range(num):
+                ar[i] = (p[3 * i] << 16) | (p[3 * i + 1] << 8) | p[3 * i + 2]
+        elif frame_type == FRAME_PALETTE:
+            size = p[0] or 256
+            if n != 1 + 3 * size + num:
+                return False
+            palette = self.palette
+            for k in range(size):
+                palette[k] = (p[1 + 3 * k] << 16) | (p[2 + 3 * k] << 8) | p[3 + 3 * k]
+            offset = 1 + 3 * size
+            for i in range(num):
+                ar[i] = palette[p[offset + i]]
+        elif frame_type == FRAME_DELTA:
+            count = p[0] | (p[1] << 8)
+            if n != 2 + 5 * count:
+                return False
+            offset = 2
+            for _ in range(count):
+                i = p[offset] | (p[offset + 1] << 8)
+                if i < num:
+                    ar[i] = (p[offset + 2] << 16) | (p[offset + 3] << 8) | p[offset + 4]
+                offset += 5
+        else:
+            return False
+        return True
+
+    def receive(self):
+        """Receive, show and acknowledge one packet"""
+        self._sync()
+        h = self.header
+        frame_type = h[2]
+        seq = h[3]
+        n = h[4] | (h[5] << 8) | (h[6] << 16)
+        if n + 1 > len(self.payload):
+            # Not a packet we could have been sent; resynchronize
+            self.errors += 1
+            self._answer(NAK, seq)
+            return
+        self.stream.readinto(self.payload_mv[0:n + 1])
+        checksum = 0
+        p = self.payload
+        for i in range(n):
+            checksum += p[i]
+        ok = (checksum & 0xFF) == p[n]
+        if ok and frame_type == FRAME_DELTA and seq != self.expected:
+            ok = False  # A frame was lost, the delta does not apply
+        if ok:
+            ok = self._apply(frame_type, n)
+        if not ok:
+            self.errors += 1
+            self._answer(NAK, seq)
+            return
+        self.strip.pixels_show()
+        self.frames += 1
+        self.expected = (seq + 1) & 0xFF
+        self._answer(ACK, seq)
+
+    def run(self):
+        """Receive packets until the stream ends"""
+        try:
+            while True:
+                self.receive()
+        except EOFError:
+            pass
+
+
+def run_receiver(num=160, brightness=0.8):
+    """
+    Pico side: show frames streamed over USB serial (blocks forever).
+
+    Ctrl-C is disabled while streaming since 0x03 is a valid data byte;
+    reset the board to get back to the REPL.
+
+    Parameters:
+    - num: Number of LEDs
+    - brightness: LED brightness
+    """
+    import micropython
+    from neopixel import NeoPixel
+    micropython.kbd_intr(-1)
+    strip = NeoPixel(num=num, brightness=brightness)
+    StreamReceiver(sys.stdin.buffer, strip).run()
+
+
+################################################################################
+# region Host side (CPython)
+################################################################################
+class FdStream:
+    """Blocking stream on a file descriptor, in the form StreamReceiver needs"""
+
+    def __init__(self, fd):
+        self.fd = fd
+
+    def readinto(self, buf):
+        import os
+        view = memoryview(buf)
+        got = 0
+        while got < len(view):
+            try:
+                chunk = os.read(self.fd, len(view) - got)
+            except OSError:
+                chunk = b""  # EIO once the other end of a pty is closed
+            if not chunk:
+                raise EOFError
+            view[got:got + len(chunk)] = chunk
+            got += len(chunk)
+        return got
+
+    def write(self, data):
+        import os
+        view = memoryview(data)
+        while len(view):
+            view = view[os.write(self.fd, view):]
+
+
+class CorruptingStream(FdStream):
+    """FdStream flipping a bit in every n-th packet payload, to exercise NAKs"""
+
+    def __init__(self, fd, every):
+        super().__init__(fd)
+        self.every = every
+        self.payload = None  # StreamReceiver.payload, set by the owner
+        self.payloads = 0
+        self.corrupted = 0
+
+    def readinto(self, buf):
+        got = super().readinto(buf)
+        if isinstance(buf, memoryview) and buf.obj is self.payload:
+            self.payloads += 1
+            if self.payloads % self.every == 0:
+                buf[0] ^= 0x01
+                self.corrupted += 1
+        return got
+
+
+class RecordingStrip:
+    """Host stand-in for NeoPixel: keeps a copy of every shown frame"""
+
+    def __init__(self, num):
+        self.num = num
+        self.ar = array.array("I", [0] * num)
+        self.shown = []
+
+    def pixels_show(self):
+        self.shown.append(array.array("I", self.ar))
+
+
+class PtyLoopback:
+    """
+    Local stand-in for a Pico running run_receiver().
+
+    Creates a pseudo terminal whose device path (self.device) can be
+    opened like /dev/ttyACM0; a background thread decodes everything
+    written to it into a RecordingStrip (self.strip).
+    """
+
+    def __init__(self, num, corrupt_every=0):
+        """
+        Parameters:
+        - num: Number of pixels per frame
+        - corrupt_every: Flip a bit in every n-th packet payload, like a
+                         noisy line would (0: none)
+        """
+        import os
+        import threading
+        import tty
+        self.master, slave = os.openpty()
+        tty.setraw(self.master)
+        self.device = os.ttyname(slave)
+        self._slave = slave  # Keeps the pty open until the renderer connects
+        self.strip = RecordingStrip(num)
+        if corrupt_every:
+            self.stream = CorruptingStream(self.master, corrupt_every)
+        else:
+            self.stream = FdStream(self.master)
+        self.receiver = StreamReceiver(self.stream, self.strip)
+        self.stream.payload = self.receiver.payload
+        self.thread = threading.Thread(target=self.receiver.run, daemon=True)
+        self.thread.start()
+
+    def close(self):
+        """Stop the receiver thread and release the pty"""
+        import os
+        os.close(self._slave)
+        self.thread.join(timeout=1.0)
+        os.close(self.master)
@@ -0,0 +1,67 @@
+import pytest
+
+import main
+from alloctrack import AllocationTracker, CPYTHON_SLACK
+
+
+def make_garbage():
+    # About 5 KB of strings, all unreachable again when this returns
+    junk = [str(i) * 8 for i in range(250)]
+    return len(junk)
+
+
+def test_garbage_is_counted():
+    tracker = AllocationTracker()
+    tracker.start()
+    tracker.begin()
+    make_garbage()
+    allocated = tracker.end("garbage")
+    tracker.stop()
+    assert allocated > 5000
+
+
+def test_nested_measurements():
+    tracker = AllocationTracker()
+    tracker.start()
+    tracker.begin()
+    tracker.begin()
+    block = bytearray(10000)
+    inner = tracker.end("inner")
+    del block
+    outer = tracker.end("outer")
+    tracker.stop()
+    assert inner >= 10000
+    assert outer >= 10000
+    assert outer - inner < CPYTHON_SLACK  # The tracker's bookkeeping is left out
+
+
+def test_no_allocation():
+    tracker = AllocationTracker()
+    tracker.start()
+    tracker.begin()
+    allocated = tracker.end("nothing")
+    tracker.stop()
+    assert allocated < CPYTHON_SLACK
+
+
+@pytest.mark.parametrize("layered", [False, True])
+def test_show_does_not_allocate(layered):
+    main.check_allocations(layered=layered)
+
+
+def test_leaky_animation_fails(monkeypatch):
+    update = main.ChristmasTreeAnimation.update
+    advance = main.ChristmasTreeAnimation.advance
+
+    def leaky_update(self, pixels):
+        make_garbage()
+        return update(self, pixels)
+
+    def leaky_advance(self, pixels):
+        make_garbage()
+        return advance(self, pixels)
+
+    monkeypatch.setattr(main.ChristmasTreeAnimation, "update", leaky_update)
+    monkeypatch.setattr(main.ChristmasTreeAnimation, "advance", leaky_advance)
+    with pytest.raises(AssertionError, match="Christmas tree"):
+        main.check_allocations()
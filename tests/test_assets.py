@@ -0,0 +1,55 @@
+import os
+
+import pytest
+
+import assets
+import build_assets
+import main
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def test_assets_are_up_to_date():
+    assert build_assets.check(os.path.join(ROOT, "assets.py")), \
+        "assets.py is out of date, run: python build_assets.py"
+
+
+def test_check_detects_a_stale_file(tmp_path):
+    stale = tmp_path / "assets.py"
+    stale.write_text(build_assets.build().replace("TREE_SPRITE", "OLD_SPRITE"))
+    assert not build_assets.check(str(stale))
+    assert not build_assets.check(str(tmp_path / "missing.py"))
+
+
+@pytest.mark.parametrize("font", build_assets.FONTS, ids=lambda f: f.__name__)
+def test_frozen_glyphs_decode_to_the_bitmap(font):
+    name = font.__name__.upper()
+    index = getattr(assets, name + "_INDEX")
+    data = getattr(assets, name + "_DATA")
+    size = font().size
+    stride = 2 + 2 * size
+    bitmap = font.get_bitmap()
+    for char, rows in bitmap.items():
+        glyph = index[ord(char)]
+        assert glyph != 0xFF, "Glyph %r missing" % char
+        pos = glyph * stride
+        decoded = [(data[pos + 2 + 2 * r] << 8) | data[pos + 3 + 2 * r]
+                   for r in range(size)]
+        assert decoded == list(rows), "Glyph %r differs" % char
+        set_cols = [col for row in rows for col in range(size)
+                    if (row >> (size - 1 - col)) & 1]
+        if set_cols:
+            assert (data[pos], data[pos + 1]) == (min(set_cols), max(set_cols))
+    # The font uses the frozen blobs, not a compiled copy
+    loaded = font()
+    assert loaded.index is index and loaded.data is data
+
+
+def test_frozen_tree_sprite_draws_like_draw_xmas_tree():
+    sprite = assets.TREE_SPRITE
+    assert main.load_sprite("TREE_SPRITE", main.draw_xmas_tree) is sprite
+    direct = main.FrameBuffer()
+    main.draw_xmas_tree(direct)
+    frozen = main.FrameBuffer()
+    main.draw_sprite(frozen, sprite)
+    assert list(frozen.buf) == list(direct.buf)
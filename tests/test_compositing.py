@@ -0,0 +1,24 @@
+import pytest
+
+import main
+
+
+def render(manager, frames):
+    pixels = manager.create_framebuffer()
+    shown = []
+    main.random.seed(0)
+    for _ in range(frames):
+        pixels.clear(main.DARK_BLUE)
+        manager.update(pixels)
+        shown.append((bytes(pixels.buf), pixels.background))
+    return shown
+
+
+@pytest.mark.parametrize("width, height", [(16, 10), (64, 40)])
+def test_layered_show_matches_shared_buffer(width, height):
+    results = []
+    for layered in (False, True):
+        manager = main.create_xmas_manager(width, height, layered=layered)
+        results.append(render(manager, manager.duration + manager.frames_between_loops))
+    assert results[0] == results[1]
+
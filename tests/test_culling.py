@@ -0,0 +1,43 @@
+import main
+
+
+def stacked_manager(frames, culling):
+    """Animations left running below a long star explosion"""
+    manager = main.AnimationManager(loop=False)
+    manager.add_animation(main.ChristmasTreeAnimation())
+    manager.add_animation(main.SnowflakeAnimation(n=25, speed=0.5))
+    manager.add_animation(main.FireworkAnimation(background_color=main.DARK_BLUE))
+    manager.add_animation(main.TextScrollAnimation("MERRY CHRISTMAS! ", speed=1))
+    manager.add_animation(main.StarOfBethlehemAnimation(
+        wait_frames=10, growth_frames=10, explosion_frames=frames))
+    manager.culling = culling
+    return manager
+
+
+def render(manager, frames):
+    pixels = manager.create_framebuffer()
+    shown = []
+    main.random.seed(0)
+    for _ in range(frames):
+        pixels.clear(main.DARK_BLUE)
+        manager.update(pixels)
+        shown.append((bytes(pixels.buf), pixels.background))
+    return shown
+
+
+def test_culling_keeps_the_frames():
+    frames = 240
+    plain = stacked_manager(frames, culling=False)
+    culled = stacked_manager(frames, culling=True)
+    assert render(culled, frames) == render(plain, frames)
+    assert plain.culled == 0
+    assert culled.culled > 0
+
+
+def test_culling_keeps_the_show():
+    results = []
+    for culling in (False, True):
+        manager = main.create_xmas_manager()
+        manager.culling = culling
+        results.append(render(manager, manager.duration + manager.frames_between_loops))
+    assert results[0] == results[1]
@@ -0,0 +1,73 @@
+import kernels
+import main
+
+
+def show_frame(frame):
+    manager = main.create_xmas_manager()
+    pixels = manager.create_framebuffer()
+    for _ in range(frame):
+        pixels.clear(main.DARK_BLUE)
+        manager.update(pixels)
+    return pixels
+
+
+def test_subframes_average_to_the_levels():
+    pixels = show_frame(260)  # Into the explosion: many different levels
+    strip = main.FakeStateMachine()
+    renderer = main.DitheredRenderer(brightness=1.8, blend=False,
+                                     state_machine=strip)
+    renderer.start()
+    renderer.render(pixels)
+    for _ in range(15):
+        renderer.refresh()
+    levels = renderer.levels[3 * pixels.num * renderer._newer:]
+    for i in range(pixels.num):
+        for c, shift in enumerate((24, 16, 8)):
+            total = sum((frame[i] >> shift) & 0xFF for frame in strip.frames[-16:])
+            assert total == levels[3 * i + c]
+
+
+def test_dithering_is_closer_than_plain_output():
+    renderer = main.DitheredRenderer(brightness=1.8,
+                                     state_machine=main.FakeStateMachine(record=False))
+    one = 1 << kernels.DITHER_BITS
+    for v in range(9):
+        assert abs(v * 1.8 - renderer.table[v] / one) <= 1 / 16
+
+
+class WrappingClock:
+    """MicroPython's ticks: milliseconds and microseconds wrap at 2**30"""
+
+    PERIOD = 1 << 30
+
+    def __init__(self, us):
+        self.us = us
+
+    def ticks_us(self):
+        return self.us % self.PERIOD
+
+    def ticks_ms(self):
+        return (self.us // 1000) % self.PERIOD
+
+    def ticks_diff(self, end, start):
+        return ((end - start + self.PERIOD // 2) % self.PERIOD) - self.PERIOD // 2
+
+    def sleep_us(self, us):
+        self.us += us
+
+
+def test_wait_across_the_ticks_wrap(monkeypatch):
+    # 50 ms before ticks_ms wraps, the deadline 100 ms ahead has wrapped
+    clock = WrappingClock((WrappingClock.PERIOD - 50) * 1000)
+    for name in ("ticks_us", "ticks_ms", "ticks_diff", "sleep_us"):
+        monkeypatch.setattr(main, name, getattr(clock, name))
+    strip = main.FakeStateMachine(record=False)
+    renderer = main.DitheredRenderer(refresh_hz=200, state_machine=strip)
+    renderer.start()
+    renderer.render(show_frame(10))
+    deadline = (clock.ticks_ms() + 100) % WrappingClock.PERIOD
+    assert deadline < clock.ticks_ms()
+    renderer.wait(deadline)
+    assert clock.ticks_diff(clock.ticks_ms(), deadline) >= 0
+    assert clock.ticks_diff(clock.ticks_ms(), deadline) < 10
+    assert renderer.subframes >= 20
@@ -0,0 +1,49 @@
+import math
+
+import pytest
+
+import assets
+import fastmath
+
+
+def test_tables_are_frozen():
+    assert fastmath.SIN_TABLE is assets.SIN_TABLE
+    assert fastmath.SQRT_TABLE is assets.SQRT_TABLE
+    assert fastmath.SIN_TABLE == fastmath.make_sin_table()
+    assert fastmath.SQRT_TABLE == fastmath.make_sqrt_table()
+    assert len(fastmath.SIN_TABLE) == fastmath.ANGLE_STEPS
+    assert len(fastmath.SQRT_TABLE) == fastmath.SQRT_SIZE
+
+
+def test_isqrt_small_numbers():
+    for n in range(4 * fastmath.SQRT_SIZE):
+        assert fastmath.isqrt(n) == math.isqrt(n), n
+
+
+@pytest.mark.parametrize("root", [31, 32, 33, 1000, 46340, 46341, 65535])
+def test_isqrt_around_squares(root):
+    for n in (root * root - 1, root * root, root * root + 1,
+              (root + 1) * (root + 1) - 1):
+        if 0 <= n < 2 ** 32:
+            assert fastmath.isqrt(n) == math.isqrt(n), n
+
+
+def test_isqrt_up_to_32_bits():
+    for bits in range(10, 33):
+        for n in ((1 << bits) - 1, 1 << (bits - 1), (1 << (bits - 1)) + 12345):
+            assert fastmath.isqrt(n) == math.isqrt(n), n
+    assert fastmath.isqrt(2 ** 32 - 1) == 65535
+    step = 2 ** 32 // 5003  # Prime step count, hits all residues
+    for n in range(0, 2 ** 32, step):
+        assert fastmath.isqrt(n) == math.isqrt(n), n
+
+
+def test_sin8_and_cos8():
+    for angle in range(-512, 512):
+        expected = 128 + 127 * math.sin(2 * math.pi * angle / 256)
+        assert abs(fastmath.sin8(angle) - expected) <= 0.5
+        expected = 128 + 127 * math.cos(2 * math.pi * angle / 256)
+        assert abs(fastmath.cos8(angle) - expected) <= 0.5
+        assert 1 <= fastmath.sin8(angle) <= 255
+    assert [fastmath.sin8(a) for a in (0, 64, 128, 192)] == [128, 255, 128, 1]
+    assert [fastmath.cos8(a) for a in (0, 64, 128, 192)] == [255, 128, 1, 128]
@@ -0,0 +1,56 @@
+import random
+
+import pytest
+
+import main
+
+
+def all_animations():
+    """The show plus every other animation, in one manager"""
+    manager = main.create_xmas_manager()
+    for animation in (main.TextFlashAnimation("HO HO", color=main.WHITE, loop=True),
+                      main.RainbowAnimation(),
+                      main.HueCycleAnimation(),
+                      main.PlasmaAnimation(),
+                      main.FireAnimation(),
+                      main.RippleAnimation()):
+        manager.add_animation(animation, start_frame=0, duration=100)
+    return manager
+
+
+@pytest.mark.parametrize("sizes", [[(32, 20), (16, 10)], [(64, 40), (12, 8), (16, 10)]])
+def test_geometry_change_on_a_running_manager(sizes):
+    manager = all_animations()
+    pixels = manager.create_framebuffer()
+    period = manager.duration + manager.frames_between_loops
+    size_frames = period // len(sizes) + 1
+    for width, height in sizes:
+        pixels = main.FrameBuffer(width, height)
+        for _ in range(size_frames):
+            pixels.clear(main.DARK_BLUE)
+            # Writes outside the new grid raise IndexError on the array
+            manager.update(pixels)
+            assert len(pixels.buf) == width * height
+        assert manager.width == width and manager.height == height
+        for info in manager.animations:
+            animation = info["animation"]
+            assert (animation.width, animation.height) == (width, height)
+
+
+def test_snowflakes_keep_other_animations_random():
+    random.seed(1)
+    expected = [random.getrandbits(16) for _ in range(10)]
+    random.seed(1)
+    snow = main.SnowflakeAnimation()
+    random.seed(1)
+    snow.set_geometry(32, 20)
+    assert [random.getrandbits(16) for _ in range(10)] == expected
+    assert max(snow.flake_cols) < 20
+
+
+def test_snowflake_columns_for_a_grid_size_repeat():
+    first = main.SnowflakeAnimation()
+    second = main.SnowflakeAnimation()
+    first.set_geometry(32, 20)
+    second.set_geometry(32, 20)
+    assert list(first.flake_cols) == list(second.flake_cols)
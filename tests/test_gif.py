@@ -0,0 +1,231 @@
+import numpy as np
+import pytest
+
+import main
+
+pytest.importorskip("PIL")
+
+
+def make_renderer(width=main.HEIGHT, height=main.WIDTH, **kwargs):
+    return main.GIFRenderer(width=width, height=height, scale=8,
+                            output_path="/tmp/test_gif.gif", **kwargs)
+
+
+def show_frames(count=120):
+    manager = main.create_xmas_manager()
+    pixels = manager.create_framebuffer()
+    for _ in range(count):
+        pixels.clear(main.DARK_BLUE)
+        manager.update(pixels)
+        yield pixels
+
+
+def indexed_rgb(renderer, indices):
+    """RGB array of a smoothed index frame"""
+    palette = np.array(renderer.palette_rgb, dtype=np.uint8).reshape(-1, 3)
+    return palette[renderer.smooth_indices(indices)]
+
+
+def test_rgb_frames_are_smoothed_like_index_frames():
+    renderer = make_renderer(smoothing=True)
+    for pixels in show_frames():
+        indices = renderer.index_frame(pixels)
+        rgb = np.asarray(renderer.rgb_image(pixels))
+        assert (rgb == indexed_rgb(renderer, indices)).all()
+
+
+def test_corners_take_the_diagonal_color():
+    renderer = make_renderer(width=2, height=2, smoothing=True)
+    grid = np.array([[1, 2],
+                     [3, 4]], dtype=np.uint8)
+    image = renderer.smooth_grid(grid)
+    s = renderer.scale
+    # Inner corner of each cell is cut with its diagonal neighbor
+    assert image[s - 1, s - 1] == 4
+    assert image[s, s] == 1
+    assert image[s - 1, s] == 3
+    assert image[s, s - 1] == 2
+    # Outer corners stay square
+    assert image[0, 0] == 1 and image[-1, -1] == 4
+
+
+def test_smoothing_adds_no_colors():
+    renderer = make_renderer(smoothing=True)
+    for pixels in show_frames():
+        indices = renderer.index_frame(pixels)
+        assert set(np.unique(renderer.smooth_indices(indices))) <= set(indices)
+
+
+def test_palette_overflow_stops_workers_quickly():
+    import time
+    renderer = make_renderer(background=True, workers=2)
+    renderer.start()
+    pixels = main.FrameBuffer()
+    elapsed = 0.0
+    for frame in range(3):
+        for i in range(pixels.num):
+            # 160 new colors per frame, the palette overflows in frame 2
+            pixels.buf[i] = (frame << 16) | (i << 4) | 1
+        start = time.perf_counter()
+        renderer.render(pixels)
+        elapsed = max(elapsed, time.perf_counter() - start)
+    assert not renderer._workers
+    # Without a stop message the workers would each wait out the join timeout
+    assert elapsed < 0.5
+    renderer.stop()
+
+
+def write_show(path, count=60, scale=2):
+    """Write the first frames of the show, returns (renderer, RGB frames)"""
+    renderer = main.GIFRenderer(width=main.HEIGHT, height=main.WIDTH, scale=scale,
+                                output_path=str(path))
+    renderer.start()
+    expected = []
+    for pixels in show_frames(count):
+        renderer.render(pixels)
+        expected.append(np.asarray(renderer.rgb_image(pixels)))
+    renderer.stop()
+    return renderer, expected
+
+
+def read_gif(path, mode="RGB"):
+    """Decoded frames as (array, duration, box) tuples"""
+    from PIL import Image
+    frames = []
+    with Image.open(path) as im:
+        for n in range(im.n_frames):
+            im.seek(n)
+            frames.append((np.asarray(im.convert(mode) if mode else im).copy(),
+                           im.info["duration"], im.dispose_extent))
+    return frames
+
+
+def test_decoded_frames_match_the_source(tmp_path):
+    path = tmp_path / "show.gif"
+    renderer, expected = write_show(path)
+    decoded = []
+    for image, duration, _ in read_gif(path):
+        decoded += [image] * (duration // int(1000 / renderer.fps))
+    assert len(decoded) == len(expected)
+    for image, source in zip(decoded, expected):
+        assert (image == source).all()
+
+
+def test_colors_keep_their_palette_index(tmp_path, monkeypatch):
+    from PIL import GifImagePlugin
+    # Keep decoded frames in P mode, they all use the global palette
+    monkeypatch.setattr(GifImagePlugin, "LOADING_STRATEGY",
+                        GifImagePlugin.LoadingStrategy.RGB_AFTER_DIFFERENT_PALETTE_ONLY)
+    path = tmp_path / "show.gif"
+    renderer = main.GIFRenderer(width=main.HEIGHT, height=main.WIDTH, scale=1,
+                                output_path=str(path))
+    renderer.start()
+    sources = []
+    for pixels in show_frames(60):
+        renderer.render(pixels)
+        sources.append([pixels.get_word(main.p2i(u, v, main.WIDTH))
+                        for u in range(main.WIDTH) for v in range(main.HEIGHT)])
+    renderer.stop()
+    palette = dict(renderer.palette)
+    frames = read_gif(path, mode=None)
+    fps_ms = int(1000 / renderer.fps)
+    k = 0
+    for image, duration, _ in frames:
+        indices = image.reshape(-1)
+        for _ in range(duration // fps_ms):
+            assert list(indices) == [palette[word] for word in sources[k]]
+            k += 1
+    assert k == len(sources)
+    # Named colors are entered first, in the same place for every show
+    for n, color in enumerate(main.COLORS):
+        assert palette[main.pack_color(color)] <= n + 1
+
+
+def test_palette_index_is_stable_until_the_palette_is_full():
+    renderer = make_renderer()
+    first = renderer.palette_index(0x123456)
+    assert renderer.palette_index(0x123456) == first
+    assert first != renderer.TRANSPARENT_INDEX
+    word = 0
+    while renderer.palette_index(word) is not None:
+        word += 1
+    assert len(renderer.palette) == renderer.MAX_COLORS - 1
+    assert renderer.palette_index(0x123456) == first
+
+
+def solid_frame(color, cells=()):
+    """FrameBuffer in one color, with the portrait cells (u, v) in white"""
+    pixels = main.FrameBuffer(background=color)
+    for u, v in cells:
+        pixels[main.p2i(u, v, main.WIDTH)] = main.WHITE
+    return pixels
+
+
+def test_identical_frames_are_merged(tmp_path):
+    path = tmp_path / "runs.gif"
+    renderer = main.GIFRenderer(width=main.HEIGHT, height=main.WIDTH, scale=2,
+                                output_path=str(path))
+    renderer.start()
+    for color, count in ((main.RED, 3), (main.GREEN, 2), (main.RED, 1)):
+        for _ in range(count):
+            renderer.render(solid_frame(color))
+    renderer.stop()
+    fps_ms = int(1000 / renderer.fps)
+    frames = read_gif(path)
+    assert [duration for _, duration, _ in frames] == [3 * fps_ms, 2 * fps_ms, fps_ms]
+
+
+@pytest.mark.parametrize("cells", [[(3, 4)], [(0, 0), (2, 9)], [(15, 9)]])
+def test_delta_frames_are_cropped_to_the_changed_box(tmp_path, cells):
+    path = tmp_path / "delta.gif"
+    scale = 2
+    renderer = main.GIFRenderer(width=main.HEIGHT, height=main.WIDTH, scale=scale,
+                                output_path=str(path))
+    renderer.start()
+    renderer.render(solid_frame(main.RED))
+    renderer.render(solid_frame(main.RED, cells))
+    renderer.stop()
+    rows = [u for u, _ in cells]
+    cols = [v for _, v in cells]
+    box = (min(cols) * scale, min(rows) * scale,
+           (max(cols) + 1) * scale, (max(rows) + 1) * scale)
+    frames = read_gif(path)
+    assert frames[0][2] == (0, 0, main.HEIGHT * scale, main.WIDTH * scale)
+    assert frames[1][2] == box
+    expected = np.asarray(renderer.rgb_image(solid_frame(main.RED, cells)))
+    assert (frames[1][0] == expected).all()
+
+
+def test_background_stop_without_frames_writes_nothing(tmp_path):
+    path = tmp_path / "empty.gif"
+    renderer = main.GIFRenderer(output_path=str(path), background=True, workers=2)
+    renderer.start()
+    renderer.stop()
+    assert not path.exists()
+    assert not renderer._workers
+
+
+def test_background_encoding_matches_serial(tmp_path):
+    serial = tmp_path / "serial.gif"
+    background = tmp_path / "background.gif"
+    write_show(serial)
+    renderer = main.GIFRenderer(width=main.HEIGHT, height=main.WIDTH, scale=2,
+                                output_path=str(background), background=True,
+                                workers=2, batch_size=4)
+    renderer.start()
+    for pixels in show_frames(60):
+        renderer.render(pixels)
+    renderer.stop()
+    assert background.read_bytes() == serial.read_bytes()
+
+
+def test_background_write_error_is_reported(tmp_path, capsys):
+    path = tmp_path / "show.gif"
+    path.mkdir()  # Can't be opened for writing
+    renderer = main.GIFRenderer(output_path=str(path), background=True, workers=1)
+    renderer.start()
+    for pixels in show_frames(5):
+        renderer.render(pixels)
+    renderer.stop()
+    assert "Error saving GIF" in capsys.readouterr().out
+    assert not renderer._workers
@@ -0,0 +1,98 @@
+import main
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0
+
+    def __call__(self):
+        return self.now
+
+
+class Probe(main.Animation):
+    """Animation whose quality attribute shows the level the governor set"""
+
+
+def simulate(loads):
+    """
+    Run the governor against loads, the frame time at full quality per 
+    frame; lower levels take (level + 1) / (QUALITY_FULL + 1) of it.
+    Returns (governor, level after every frame).
+    """
+    clock = Clock()
+    manager = main.AnimationManager(loop=False)
+    probe = Probe()
+    manager.add_animation(probe)
+    governor = main.QualityGovernor(manager, clock=clock)
+    levels = []
+    for load in loads:
+        governor.begin()
+        clock.now += load * (probe.quality + 1) // (main.QUALITY_FULL + 1)
+        governor.end()
+        clock.now = max(clock.now, governor.start_time + 100)  # Sleep
+        levels.append(probe.quality)
+    return governor, levels
+
+
+def test_steady_load_keeps_the_level():
+    governor, levels = simulate([50] * 300)
+    assert governor.changes == 0
+    assert set(levels) == {main.QUALITY_FULL}
+
+
+def test_single_slow_frames_keep_the_level():
+    governor, _ = simulate([400 if k % 20 == 0 else 50 for k in range(300)])
+    assert governor.changes == 0
+
+
+def test_overload_lowers_the_level():
+    governor, levels = simulate([150] * 300)
+    assert levels[-1] == main.QUALITY_LOW
+    # One window per level
+    assert levels.index(main.QUALITY_LOW) < 2 * governor.window + 1
+
+
+def test_level_that_fits_is_held():
+    # Level 1 takes 80 ms: too slow to rise to, fast enough to stay
+    governor, levels = simulate([120] * 1000)
+    assert levels[-1] == main.QUALITY_FULL - 1
+    assert governor.changes <= 2
+
+
+def test_failed_raises_back_off():
+    # Level 0 takes 55 ms, level 1 110 ms: every try of level 1 fails
+    governor, _ = simulate([165] * 1000)
+    assert governor.changes <= 16
+    assert governor.recover_wait == 8 * governor.recover_frames
+
+
+def test_level_is_restored():
+    governor, levels = simulate([150] * 100 + [50] * 300)
+    assert levels[-1] == main.QUALITY_FULL
+    assert levels[100:].index(main.QUALITY_FULL) <= 2 * governor.recover_frames
+
+
+def test_lookahead_records_every_render():
+    # Frames rendered ahead must be judged by their render time, not by
+    # the near-zero time of taking them from the ring
+    clock = Clock()
+    manager = main.AnimationManager(loop=False)
+    probe = Probe()
+    manager.add_animation(probe)
+
+    class Slow(main.Animation):
+        def update(self, pixels):
+            clock.now += 150 * (probe.quality + 1) // (main.QUALITY_FULL + 1)
+            return pixels
+
+    manager.add_animation(Slow())
+    governor = main.QualityGovernor(manager, clock=clock)
+    lookahead = main.FrameLookahead(manager, depth=4, clock=clock,
+                                    governor=governor)
+    for _ in range(100):
+        start = clock.now
+        lookahead.next_frame()
+        lookahead.fill(start + 100)
+        clock.now = max(clock.now, start + 100)
+    assert probe.quality == main.QUALITY_LOW
+    assert governor.frame_ms == lookahead.frame_ms
@@ -0,0 +1,89 @@
+# The viper kernels only compile on the Pico. To compare them with the
+# pure-Python kernels on the host, their source is executed as plain
+# Python, with ptr8/ptr16/ptr32 emulated on memoryviews: 32-bit loads are
+# signed like viper ints, 8/16-bit loads unsigned, stores truncate. What
+# this cannot catch is 32-bit overflow inside the arithmetic.
+import array
+import inspect
+import textwrap
+
+import pytest
+
+import kernels
+
+
+class Ptr:
+    """Stand-in for a viper pointer into a buffer"""
+
+    def __init__(self, obj, bits):
+        raw = memoryview(obj).cast("B")
+        self.view = raw.cast({8: "B", 16: "H", 32: "i"}[bits])
+        self.mask = (1 << bits) - 1
+        self.signed = bits == 32
+
+    def __getitem__(self, i):
+        assert 0 <= i < len(self.view), "Pointer access out of bounds: %d" % i
+        return self.view[i]
+
+    def __setitem__(self, i, value):
+        assert 0 <= i < len(self.view), "Pointer access out of bounds: %d" % i
+        value &= self.mask
+        if self.signed and value >= 1 << 31:
+            value -= 1 << 32
+        self.view[i] = value
+
+
+class _Micropython:
+    @staticmethod
+    def viper(func):
+        return func
+
+
+def load_viper_kernels():
+    """Execute the viper section of kernels.py, returns its namespace"""
+    source = inspect.getsource(kernels)
+    start = source.index("# region Viper kernels")
+    start = source.index("if MICROPYTHON:\n", start) + len("if MICROPYTHON:\n")
+    end = source.index("    fill = fill_viper", start)
+    namespace = dict(vars(kernels))
+    namespace.update(
+        micropython=_Micropython,
+        ptr8=lambda obj: Ptr(obj, 8),
+        ptr16=lambda obj: Ptr(obj, 16),
+        ptr32=lambda obj: Ptr(obj, 32),
+    )
+    exec(textwrap.dedent(source[start:end]), namespace)
+    return namespace
+
+
+VIPER = load_viper_kernels()
+
+
+def test_every_kernel_has_a_viper_version():
+    for name, slow, fast, make_args in kernels._cases():
+        assert slow.__name__.replace("_py", "_viper") in VIPER, name
+
+
+@pytest.mark.parametrize("case", kernels._cases(), ids=lambda case: case[0])
+def test_viper_matches_python(case):
+    name, slow, fast, make_args = case
+    viper = VIPER[slow.__name__.replace("_py", "_viper")]
+    args_slow = make_args()
+    args_viper = make_args()
+    slow(*args_slow)
+    viper(*args_viper)
+    assert kernels._outputs(args_slow) == kernels._outputs(args_viper)
+
+
+@pytest.mark.parametrize("num", [160, 640])
+def test_public_kernels_match_python(num):
+    kernels.check(num)
+
+
+def test_pack_grb_reference():
+    table = kernels.make_channel_table(1.0)
+    src = array.array("I", [kernels.pack_color((1, 2, 3)), kernels.TRANSPARENT])
+    dst = array.array("I", [0, 0])
+    kernels.pack_grb(src, dst, table, kernels.pack_color((7, 8, 9)))
+    # The red and green bytes swap places (see make_channel_table)
+    assert list(dst) == [(1 << 16) | (2 << 8) | 3, (7 << 16) | (8 << 8) | 9]
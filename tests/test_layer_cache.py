@@ -0,0 +1,71 @@
+import array
+
+import pytest
+
+import main
+
+
+def render(manager, frames, seed=3):
+    main.random.seed(seed)
+    pixels = manager.create_framebuffer()
+    shown = []
+    for _ in range(frames):
+        pixels.clear(main.DARK_BLUE)
+        manager.update(pixels)
+        shown.append((bytes(pixels.buf), pixels.background))
+    return shown
+
+
+@pytest.mark.parametrize("cache_bytes", [8 * 1024, 128 * 1024])
+def test_cached_frames_match_uncached(cache_bytes):
+    plain = main.create_xmas_manager(layered=True)
+    cached = main.create_xmas_manager(layered=True, cache_bytes=cache_bytes)
+    frames = 2 * (plain.duration + plain.frames_between_loops)
+    assert render(cached, frames) == render(plain, frames)
+    stats = cached.cache.stats()
+    assert stats["hits"] > 0
+    assert stats["capacity"] * 4 * cached.width * cached.height <= cache_bytes
+
+
+def test_periodic_animation_hits_after_one_period():
+    manager = main.CompositingManager(loop=False, cache_bytes=64 * 1024)
+    rainbow = main.RainbowAnimation()
+    manager.add_animation(rainbow)
+    uncached = main.CompositingManager(loop=False)
+    uncached.add_animation(main.RainbowAnimation())
+    frames = 100
+    assert render(manager, frames) == render(uncached, frames)
+    period = len(rainbow.table)
+    stats = manager.cache.stats()
+    assert stats["misses"] == period
+    assert stats["hits"] == frames - period
+    assert stats["entries"] == period
+
+
+def fill(value, num=4):
+    return array.array("I", [value] * num)
+
+
+def test_lru_eviction_within_cache_bytes():
+    cache = main.LayerCache(4, 3 * 4 * 4 + 15)  # Room for three layers
+    assert cache.capacity == 3
+    for key in range(3):
+        cache.put(key, fill(key))
+    assert list(cache.get(0)) == list(fill(0))  # 0 is now the most recent
+    cache.put(3, fill(3))                       # Evicts 1, the least recent
+    assert cache.get(1) is None
+    assert list(cache.get(2)) == list(fill(2))
+    assert list(cache.get(3)) == list(fill(3))
+    cache.put(4, fill(4))                       # Evicts 0
+    assert cache.get(0) is None
+    stats = cache.stats()
+    assert stats["evictions"] == 2
+    assert stats["entries"] == 3
+    assert (stats["hits"], stats["misses"]) == (3, 2)
+
+
+def test_cache_smaller_than_a_layer_stores_nothing():
+    cache = main.LayerCache(160, 160 * 4 - 1)
+    cache.put(0, fill(1, 160))
+    assert cache.capacity == 0
+    assert cache.get(0) is None
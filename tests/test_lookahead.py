@@ -0,0 +1,107 @@
+import main
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0
+
+    def __call__(self):
+        return self.now
+
+
+class CostManager:
+    """Manager stand-in whose frames take costs[frame] on the clock"""
+
+    def __init__(self, costs, clock):
+        self.costs = costs
+        self.clock = clock
+        self.frame = 0
+        self.repeat_count = 0
+
+    def update(self, pixels):
+        if self.frame == len(self.costs):
+            self.frame = 0
+            self.repeat_count += 1
+        self.clock.now += self.costs[self.frame]
+        self.frame += 1
+        return pixels
+
+    def create_framebuffer(self):
+        return main.FrameBuffer()
+
+    def get_frame(self):
+        return self.frame
+
+    def get_repeat_count(self):
+        return self.repeat_count
+
+
+def run_show(costs, loops, depth=4, slot_ms=100):
+    """Run the main loop on a fake clock, returns (lookahead, fill overruns per loop)"""
+    clock = Clock()
+    manager = CostManager(costs, clock)
+    lookahead = main.FrameLookahead(manager, depth=depth, clock=clock,
+                                    period=len(costs))
+    overruns = [0] * loops
+    for loop in range(loops):
+        for _ in range(len(costs)):
+            start = clock.now
+            lookahead.next_frame()
+            shown = clock.now
+            lookahead.fill(start + slot_ms)
+            if shown - start <= slot_ms < clock.now - start:
+                overruns[loop] += 1
+            clock.now = max(clock.now, start + slot_ms)
+    return lookahead, overruns
+
+
+def test_expensive_frame_after_cheap_ones_is_not_started_late():
+    # The burst empties the ring, which is refilled several cheap frames 
+    # per slot; the first expensive frame must not start in such a slot
+    costs = [20] * 12 + [150] * 2
+    lookahead, overruns = run_show(costs, loops=3)
+    assert overruns[0] == 1  # Cost of the burst not known yet
+    assert overruns[1:] == [0, 0]
+    assert list(lookahead.costs) == costs
+
+
+def test_unknown_frames_use_the_slowest_recent_cost():
+    costs = [10, 50, 10, 10, 10, 10]
+    clock = Clock()
+    lookahead = main.FrameLookahead(CostManager(costs, clock), depth=4,
+                                    clock=clock, period=0)
+    for _ in range(4):
+        lookahead.next_frame()
+    # A single cheap frame after an expensive one does not lower the estimate
+    assert lookahead.frame_ms == 10
+    assert lookahead.estimate_ms() == 50
+
+
+def test_loop_length_from_the_manager():
+    manager = main.create_xmas_manager()
+    lookahead = main.FrameLookahead(manager, depth=1)
+    assert len(lookahead.costs) == manager.duration + manager.frames_between_loops
+
+
+def test_frames_match_rendering_on_demand():
+    manager = main.create_xmas_manager()
+    lookahead = main.FrameLookahead(main.create_xmas_manager(), depth=3,
+                                    clock=lambda: 0)
+    pixels = manager.create_framebuffer()
+    for _ in range(200):
+        pixels.clear(main.DARK_BLUE)
+        manager.update(pixels)
+        ahead = lookahead.next_frame()
+        lookahead.fill(100)
+        assert list(ahead.buf) == list(pixels.buf)
+        assert ahead.background == pixels.background
+        assert lookahead.get_frame() == manager.get_frame()
+
+
+def test_refreshing_renderers_leave_no_time_to_render_ahead():
+    dithered = main.DitheredRenderer(state_machine=main.FakeStateMachine())
+    plain = main.RawStreamRenderer(output="/dev/null")
+    assert dithered.refreshes
+    assert not plain.refreshes
+    assert main.MultiRenderer([dithered, plain]).refreshes
+    assert not main.MultiRenderer([plain, dithered]).refreshes
@@ -0,0 +1,71 @@
+import os
+import time
+
+import pytest
+
+import main
+
+
+def record(renderer, frames=60):
+    manager = main.create_xmas_manager()
+    pixels = manager.create_framebuffer()
+    renderer.start()
+    for _ in range(frames):
+        pixels.clear(main.DARK_BLUE)
+        manager.update(pixels)
+        renderer.render(pixels)
+    renderer.stop()
+
+
+class SlowRenderer(main.RendererBase):
+    """Takes 20 ms per frame, like an encoder on a busy host"""
+
+    count = 0
+
+    def render(self, pixels):
+        time.sleep(0.02)
+        self.count += 1
+
+
+class CountingRenderer(main.RendererBase):
+    count = 0
+
+    def render(self, pixels):
+        self.count += 1
+
+
+def test_threaded_gif_matches_direct(tmp_path):
+    pytest.importorskip("PIL")
+    direct = main.GIFRenderer(output_path=os.path.join(tmp_path, "direct.gif"))
+    record(direct)
+    gif = main.GIFRenderer(output_path=os.path.join(tmp_path, "threaded.gif"))
+    multi = main.MultiRenderer()
+    multi.add_sink(gif, threaded=True, policy=main.SINK_BLOCK)
+    record(multi)
+    assert gif.frames == direct.frames
+
+
+@pytest.mark.parametrize("policy", [main.SINK_DROP_OLDEST, main.SINK_BLOCK])
+def test_slow_sink_next_to_a_direct_sink(policy):
+    frames = 30
+    multi = main.MultiRenderer()
+    direct = multi.add_sink(CountingRenderer())
+    slow = SlowRenderer()
+    multi.add_sink(slow, threaded=True, queue_size=4, policy=policy)
+    worker = multi.workers[1]
+    record(multi, frames)
+    assert direct.count == frames
+    assert slow.count == worker.rendered
+    if policy == main.SINK_BLOCK:
+        assert slow.count == frames and worker.dropped == 0
+    else:
+        assert slow.count + worker.dropped == frames
+        assert worker.dropped > 0
+
+
+def test_sinks_after_start_are_rejected():
+    multi = main.MultiRenderer([CountingRenderer()])
+    multi.start()
+    with pytest.raises(RuntimeError):
+        multi.add_sink(CountingRenderer())
+    multi.stop()
@@ -0,0 +1,60 @@
+import array
+
+import pytest
+
+import kernels
+import main
+
+
+def render_show(segments, frames=300, width=main.WIDTH, height=main.HEIGHT):
+    """Words sent to each fake strip per frame"""
+    strips = [main.FakeStateMachine(sm_id) for sm_id in range(len(segments))]
+    renderer = main.MultiStripRenderer(segments, brightness=1.8, width=width,
+                                       height=height, state_machines=strips)
+    renderer.start()
+    manager = main.create_xmas_manager(width, height)
+    pixels = manager.create_framebuffer()
+    for _ in range(frames):
+        pixels.clear(main.DARK_BLUE)
+        manager.update(pixels)
+        renderer.render(pixels)
+    return strips
+
+
+def test_three_segments_match_one_strip():
+    single = render_show([(6, 0, 160)])[0]
+    strips = render_show([(6, 0, 60), (7, 60, 50), (8, 110, 50)])
+    for frame in range(len(single.frames)):
+        joined = []
+        for strip in strips:
+            joined += strip.frames[frame]
+        assert joined == single.frames[frame], "Frame %d differs" % frame
+
+
+def test_segments_on_a_larger_grid():
+    num = 32 * 20
+    single = render_show([(6, 0, num)], frames=50, width=32, height=20)[0]
+    strips = render_show([(6, 0, num // 2), (7, num // 2, num // 2)],
+                         frames=50, width=32, height=20)
+    for frame in range(len(single.frames)):
+        assert strips[0].frames[frame] + strips[1].frames[frame] == single.frames[frame]
+
+
+def test_matches_neopixel_output():
+    # The same words as NeoPixel.pixels_show_buffer, which puts them with
+    # shift=8 instead of using a pre-shifted table
+    strip = render_show([(6, 0, 160)], frames=260)[0]
+    manager = main.create_xmas_manager()
+    pixels = manager.create_framebuffer()
+    table = kernels.make_channel_table(1.8)
+    out = array.array("I", [0] * 160)
+    for frame in range(260):
+        pixels.clear(main.DARK_BLUE)
+        manager.update(pixels)
+        kernels.pack_grb(pixels.buf, out, table, pixels.background)
+        assert strip.frames[frame] == [(word << 8) & 0xFFFFFFFF for word in out]
+
+
+def test_segment_outside_the_grid():
+    with pytest.raises(AssertionError):
+        main.MultiStripRenderer([(6, 100, 100)], state_machines=[main.FakeStateMachine()])
@@ -0,0 +1,48 @@
+import pytest
+
+import main
+
+
+def current_ma(words, limiter):
+    """Current of a frame as sent to the strip (words shifted by 8)"""
+    total = sum(((w >> 8) & 0xFF) + ((w >> 16) & 0xFF) + (w >> 24) for w in words)
+    return limiter.idle_ma * len(words) + total * limiter.channel_ma / 255
+
+
+def run_show(budget, brightness=8.0):
+    manager = main.create_xmas_manager()
+    pixels = manager.create_framebuffer()
+    strip = main.FakeStateMachine()
+    renderer = main.MultiStripRenderer([(6, 0, pixels.num)], brightness=brightness,
+                                       state_machines=[strip], power_limit_ma=budget)
+    renderer.start()
+    for _ in range(manager.duration + manager.frames_between_loops):
+        pixels.clear(main.DARK_BLUE)
+        manager.update(pixels)
+        renderer.render(pixels)
+        yield pixels, renderer.limiter, strip.frames[-1]
+
+
+def test_sums_match_a_full_rescan():
+    for pixels, limiter, _ in run_show(450):
+        sums = [0, 0, 0]
+        for i in range(pixels.num):
+            word = pixels.get_word(i)
+            sums[0] += (word >> 8) & 0xFF
+            sums[1] += (word >> 16) & 0xFF
+            sums[2] += word & 0xFF
+        assert list(limiter.sums) == sums
+
+
+@pytest.mark.parametrize("budget", [300, 450, 1000])
+def test_frames_stay_within_the_budget(budget):
+    dimmed = 0
+    for _, limiter, words in run_show(budget):
+        assert current_ma(words, limiter) <= budget
+        dimmed += limiter.level < limiter.LEVELS
+    assert dimmed > 0  # The show exceeds these budgets at brightness 8
+
+
+def test_no_dimming_with_a_large_budget():
+    for _, limiter, _ in run_show(10**6):
+        assert limiter.level == limiter.LEVELS
@@ -0,0 +1,75 @@
+import pytest
+
+import main
+import primitives
+
+COLOR = 0x030201
+
+# (row, col, rows, cols): inside, partly off each edge, negative origins,
+# fully off the grid, zero and negative size
+RECTS = [(2, 3, 4, 5), (0, 0, 16, 10), (-2, -3, 5, 6), (13, 8, 6, 6),
+         (-5, 4, 7, 2), (6, -4, 2, 5), (-10, -10, 40, 40), (16, 0, 3, 3),
+         (0, 10, 3, 3), (-3, 2, 3, 3), (4, -3, 2, 3), (5, 5, 0, 3),
+         (5, 5, 3, 0), (5, 5, -2, 3)]
+
+
+def grid(width=main.WIDTH, height=main.HEIGHT):
+    pixels = main.FrameBuffer(width, height)
+    for i in range(pixels.num):
+        pixels.buf[i] = i  # Every pixel distinct, to see stray writes
+    return pixels
+
+
+def set_pixel(pixels, u, v, word):
+    """Reference: one pixel in portrait coordinates, ignored off the grid"""
+    if 0 <= u < pixels.width and 0 <= v < pixels.height:
+        pixels.buf[main.p2i(u, v, pixels.width)] = word
+
+
+@pytest.mark.parametrize("rect", RECTS)
+def test_fill_rect(rect):
+    row, col, rows, cols = rect
+    pixels = grid()
+    expected = grid()
+    primitives.fill_rect(pixels, row, col, rows, cols, COLOR)
+    for u in range(row, row + rows):
+        for v in range(col, col + cols):
+            set_pixel(expected, u, v, COLOR)
+    assert list(pixels.buf) == list(expected.buf)
+
+
+@pytest.mark.parametrize("rect", RECTS)
+@pytest.mark.parametrize("masked", [False, True])
+def test_blit(rect, masked):
+    row, col, rows, cols = rect
+    if rows <= 0 or cols <= 0:
+        rows, cols = 0, 0
+    src = main.FrameBuffer(rows, cols)
+    for i in range(src.num):
+        src.buf[i] = 0x100 + i
+    mask = bytes((i % 3) != 0 for i in range(src.num)) if masked else None
+    pixels = grid()
+    expected = grid()
+    primitives.blit(pixels, src, row, col, mask)
+    for u in range(rows):
+        for v in range(cols):
+            i = main.p2i(u, v, src.width)
+            if mask is None or mask[i]:
+                set_pixel(expected, row + u, col + v, src.buf[i])
+    assert list(pixels.buf) == list(expected.buf)
+
+
+@pytest.mark.parametrize("size", [(16, 10), (32, 20), (7, 3)])
+def test_lines_and_fill(size):
+    width, height = size
+    pixels = grid(width, height)
+    expected = grid(width, height)
+    primitives.hline(pixels, 1, -2, height + 4, COLOR)
+    primitives.vline(pixels, -1, 2, width, COLOR)
+    for v in range(height):
+        set_pixel(expected, 1, v, COLOR)
+    for u in range(width - 1):
+        set_pixel(expected, u, 2, COLOR)
+    assert list(pixels.buf) == list(expected.buf)
+    primitives.fill(pixels, COLOR)
+    assert set(pixels.buf) == {COLOR}
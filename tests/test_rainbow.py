@@ -0,0 +1,15 @@
+import main
+
+
+def test_rainbow_rotates_like_rainbow_cycle():
+    # LED i of frame j shows wheel position (i * 256 // num + j) & 31
+    manager = main.AnimationManager(loop=False)
+    rainbow = main.RainbowAnimation(level=31)
+    manager.add_animation(rainbow)
+    pixels = manager.create_framebuffer()
+    num = pixels.num
+    for j in range(64):
+        pixels.clear(main.DARK_BLUE)
+        manager.update(pixels)
+        assert list(pixels.buf) == [rainbow.table[((i * 256 // num) + j) & 31]
+                                    for i in range(num)]
@@ -0,0 +1,65 @@
+import pytest
+
+import main
+
+
+def small_frame():
+    """3x2 landscape grid, every pixel a different color, one left transparent"""
+    pixels = main.FrameBuffer(3, 2, background=(0, 0, 2))
+    colors = [(4, 0, 0), (0, 4, 0), (0, 0, 4), (1, 2, 3), (4, 4, 4)]
+    for idx, color in enumerate(colors):
+        pixels[idx] = color
+    return pixels
+
+
+def expected_bytes(pixels, scale, portrait, scale_colors):
+    width, height = pixels.width, pixels.height
+    if portrait:
+        grid = [[main.p2i(u, v, width) for v in range(height)] for u in range(width)]
+    else:
+        grid = [[y * width + x for x in range(width)] for y in range(height)]
+    out = bytearray()
+    for row in grid:
+        line = bytearray()
+        for idx in row:
+            color = pixels.get_color(idx)
+            if scale_colors:
+                color = [min(int(c * 255 / 4), 255) for c in color]
+            line += bytes(color) * scale
+        out += bytes(line) * scale
+    return bytes(out)
+
+
+@pytest.mark.parametrize("scale", [1, 2])
+@pytest.mark.parametrize("portrait", [True, False])
+@pytest.mark.parametrize("scale_colors", [True, False])
+def test_bytes_written(tmp_path, scale, portrait, scale_colors):
+    path = tmp_path / "frames.rgb"
+    pixels = small_frame()
+    renderer = main.RawStreamRenderer(output=str(path), scale=scale, portrait=portrait,
+                                      scale_colors=scale_colors, width=3, height=2)
+    renderer.start()
+    renderer.render(pixels)
+    renderer.render(pixels)
+    renderer.stop()
+    frame = expected_bytes(pixels, scale, portrait, scale_colors)
+    assert len(frame) == 3 * 2 * 3 * scale * scale
+    assert path.read_bytes() == frame + frame
+    assert renderer.frames_written == 2
+    assert renderer.bytes_written == 2 * len(frame)
+    cols, rows = renderer.frame_size
+    assert cols * rows * 3 == len(frame)
+
+
+def test_block_cache_holds_one_scaled_run_per_color(tmp_path):
+    pixels = small_frame()
+    renderer = main.RawStreamRenderer(output=str(tmp_path / "frames.rgb"), scale=2,
+                                      width=3, height=2)
+    renderer.start()
+    renderer.render(pixels)
+    renderer.stop()
+    words = {pixels.get_word(i) for i in range(pixels.num)}
+    assert set(renderer._blocks) == words
+    for word, block in renderer._blocks.items():
+        r, g, b = [min(int(c * 255 / 4), 255) for c in main.unpack_color(word)]
+        assert block == bytes((r, g, b)) * 2
@@ -0,0 +1,60 @@
+import numpy as np
+import pytest
+
+import main
+
+
+def manual_frames(manager, start, count, portrait, seed=7):
+    """Reference: the manager's update loop, pixel by pixel through p2i"""
+    main.random.seed(seed)
+    manager.reset()
+    pixels = manager.create_framebuffer()
+    width, height = manager.width, manager.height
+    frames = []
+    for frame in range(start + count):
+        pixels.clear(main.DARK_BLUE)
+        manager.update(pixels)
+        if frame < start:
+            continue
+        if portrait:
+            rows = [[pixels.get_color(main.p2i(u, v, width)) for v in range(height)]
+                    for u in range(width)]
+        else:
+            rows = [[pixels.get_color(y * width + x) for x in range(width)]
+                    for y in range(height)]
+        frames.append(rows)
+    return np.array(frames, dtype=np.uint8)
+
+
+@pytest.mark.parametrize("portrait", [True, False])
+@pytest.mark.parametrize("start, count, chunk", [(0, 40, 1024), (230, 50, 16)])
+def test_matches_the_update_loop(portrait, start, count, chunk):
+    manager = main.create_xmas_manager()
+    frames = main.render_frames(manager, start, count, portrait=portrait,
+                                seed=7, chunk=chunk)
+    expected = manual_frames(main.create_xmas_manager(), start, count, portrait)
+    assert frames.shape == expected.shape
+    assert (frames == expected).all()
+
+
+def test_writes_into_out():
+    manager = main.create_xmas_manager(32, 20)
+    out = np.zeros((10, 32, 20, 3), dtype=np.uint8)
+    result = main.render_frames(manager, 5, 10, out=out, seed=7, chunk=3)
+    assert result is out
+    assert (out == manual_frames(main.create_xmas_manager(32, 20), 5, 10, True)).all()
+
+
+def test_default_count_is_one_loop():
+    manager = main.create_xmas_manager()
+    frames = main.render_frames(manager, seed=7)
+    assert len(frames) == manager.duration + manager.frames_between_loops
+
+
+@pytest.mark.parametrize("shape, dtype", [((10, 10, 16, 3), np.uint8),
+                                          ((9, 16, 10, 3), np.uint8),
+                                          ((10, 16, 10, 3), np.uint16)])
+def test_wrong_out_raises(shape, dtype):
+    with pytest.raises(ValueError):
+        main.render_frames(main.create_xmas_manager(), 0, 10,
+                           out=np.zeros(shape, dtype=dtype))
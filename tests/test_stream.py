@@ -0,0 +1,72 @@
+import pytest
+
+import main
+import stream
+
+
+def stream_show(frames=150, corrupt_every=0, window=2):
+    """Stream the first frames of the show, returns (loopback, renderer, expected)"""
+    manager = main.create_xmas_manager()
+    pixels = manager.create_framebuffer()
+    loopback = stream.PtyLoopback(pixels.num, corrupt_every=corrupt_every)
+    renderer = main.SerialStreamRenderer(loopback.device, window=window)
+    expected = []
+    renderer.start()
+    for _ in range(frames):
+        pixels.clear(main.DARK_BLUE)
+        manager.update(pixels)
+        renderer.render(pixels)
+        expected.append([pixels.get_word(i) for i in range(pixels.num)])
+    renderer.stop()
+    loopback.close()
+    return loopback, renderer, expected
+
+
+def test_every_frame_shown():
+    loopback, renderer, expected = stream_show()
+    assert [list(frame) for frame in loopback.strip.shown] == expected
+    assert loopback.receiver.errors == 0
+    assert renderer.stats()["naks"] == 0
+
+
+@pytest.mark.parametrize("window", [1, 2, 4])
+def test_corrupted_frames_are_nakked_and_recovered(window):
+    frames = 150
+    loopback, renderer, expected = stream_show(frames, corrupt_every=7,
+                                               window=window)
+    receiver = loopback.receiver
+    shown = [list(frame) for frame in loopback.strip.shown]
+    assert loopback.stream.corrupted >= frames // 7 - 1
+    # Every packet is either shown or answered with a NAK, and the sender
+    # saw every NAK without running into a timeout
+    assert receiver.errors >= loopback.stream.corrupted
+    assert len(shown) + receiver.errors == frames
+    assert renderer.naks == receiver.errors
+    assert renderer.timeouts == 0
+    # Shown frames are correct frames in order: no delta was applied to a
+    # frame the receiver did not have
+    k = 0
+    for frame in shown:
+        while k < frames and expected[k] != frame:
+            k += 1
+        assert k < frames, "Receiver showed a frame that was never rendered"
+        k += 1
+
+
+def test_nak_forces_a_key_frame():
+    encoder = stream.StreamEncoder(16, keyframe_interval=1000)
+    words = [0x010203] * 16
+    encoder.encode(words)
+    words[3] = 0x040404
+    _, packet = encoder.encode(words)
+    assert packet[2] == stream.FRAME_DELTA
+    encoder.force_keyframe()
+    _, packet = encoder.encode(words)
+    assert packet[2] in (stream.FRAME_RAW, stream.FRAME_PALETTE)
+
+
+def test_latency_statistics_take_constant_space():
+    loopback, renderer, _ = stream_show(frames=120)
+    stats = renderer.stats()
+    assert renderer.acks == 120
+    assert 0 < stats["latency_mean"] <= stats["latency_max"]
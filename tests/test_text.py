@@ -0,0 +1,93 @@
+import pytest
+
+import main
+
+
+@pytest.mark.parametrize("size", [6, 7, 8, 9])
+def test_glyph_at_the_bottom_edge_is_clipped(size):
+    font = main.select_font(size)
+    pixels = main.FrameBuffer()
+    font.draw(pixels, "M", row_offset=main.WIDTH - 3, col_offset=1, color=main.WHITE)
+    drawn = [main.i2p(i, pixels.width) for i in range(pixels.num)
+             if pixels.buf[i] != main.TRANSPARENT]
+    assert drawn
+    for row, col in drawn:
+        assert row >= main.WIDTH - 3, "Glyph wrapped onto row %d" % row
+
+
+@pytest.mark.parametrize("row, col", [(2, 40), (20, 1), (-20, 1), (2, -20)])
+def test_glyph_off_the_grid_draws_nothing(row, col):
+    font = main.select_font(9)
+    pixels = main.FrameBuffer()
+    font.draw(pixels, "M", row_offset=row, col_offset=col, color=main.WHITE)
+    assert set(pixels.buf) == {main.TRANSPARENT}
+
+
+def drawn_directly(animation, width, height):
+    """Frame of a TextScrollAnimation drawn glyph by glyph with FontBase.draw"""
+    pixels = main.FrameBuffer(width, height)
+    scroll_offset = int(animation.scroll_offset)
+    for i, char in enumerate(animation.text):
+        col = animation.offset[1] + animation.starts[i] - scroll_offset - animation.offsets[i]
+        animation.font.draw(pixels, char, row_offset=animation.offset[0],
+                            col_offset=col, color=animation.color)
+    return list(pixels.buf)
+
+
+def scroll_and_compare(animation, frames, width=main.WIDTH, height=main.HEIGHT):
+    pixels = main.FrameBuffer(width, height)
+    for frame in range(frames):
+        expected = drawn_directly(animation, width, height)
+        pixels.clear()
+        animation.update(pixels)
+        assert list(pixels.buf) == expected, "Frame %d differs" % frame
+
+
+def make_scroll(speed=1, font_size=6, text="MERRY CHRISTMAS! 2024"):
+    animation = main.TextScrollAnimation(text, speed=speed, font_size=font_size)
+    animation.start()
+    return animation
+
+
+@pytest.mark.parametrize("speed", [1, 2, 3, 13])
+@pytest.mark.parametrize("font_size", [6, 9])
+def test_scroll_matches_drawn_glyphs_over_loops(speed, font_size):
+    animation = make_scroll(speed, font_size)
+    # Twice the full text, so the loop restarts at least once
+    frames = 2 * (animation.total_width + animation.offset[1]) // speed + 3
+    scroll_and_compare(animation, frames)
+    assert animation.is_running()
+
+
+@pytest.mark.parametrize("frame", [0, 5, 37, 80, 400])
+def test_scroll_after_a_seek(frame):
+    animation = make_scroll(speed=2)
+    scroll_and_compare(animation, 10)
+    animation.set_frame(frame)
+    scroll_and_compare(animation, 30)
+    animation.set_frame(frame // 2)  # Backwards
+    scroll_and_compare(animation, 30)
+
+
+def test_scroll_after_a_geometry_change():
+    animation = make_scroll(speed=1)
+    scroll_and_compare(animation, 20)
+    scroll_and_compare(animation, 60, width=32, height=20)
+    animation.set_geometry(12, 7)
+    scroll_and_compare(animation, 60, width=12, height=7)
+    scroll_and_compare(animation, 20)
+
+
+def test_scroll_in_a_manager_with_restart():
+    manager = main.AnimationManager(loop=True, frames_between_loops=5)
+    animation = main.TextScrollAnimation("HO HO HO", speed=1)
+    manager.add_animation(animation, start_frame=3, duration=40)
+    pixels = manager.create_framebuffer()
+    for _ in range(3 * 48):
+        running = animation.is_running()
+        expected = drawn_directly(animation, pixels.width, pixels.height)
+        pixels.clear()
+        manager.update(pixels)
+        if animation.is_running() and running:
+            assert list(pixels.buf) == expected
+    assert manager.get_repeat_count() >= 2